@@ -12,18 +12,24 @@ project_root = Path(__file__).resolve().parents[3]
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from src.app.domain.Comun.normalizacion import clave_texto
+from src.app.domain.Comun.tipos import aplicar_plan_tipos
 from src.app.repository.configuration_repository import INPUT_ANULADOS, OUTPUT_PACIFICO_ANULADO
+from src.app.repository.intermedio_repository import auditoria_xlsx_activa, guardar_auditoria_xlsx, guardar_intermedio
+from src.app.repository.lectura_repository import filtro_columnas
+from src.app.repository.registro_archivos_repository import registrar_lectura
 
 
 def leer_excel_anulados(path: Path) -> pd.DataFrame:
-    """Lee un Excel de anulados con el engine adecuado."""
+    """Lee un Excel de anulados con el engine adecuado (solo las columnas requeridas, salvo lectura completa)."""
     ext = path.suffix.lower()
+    usecols = filtro_columnas("anulados")
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         if ext == ".xls":
-            return pd.read_excel(path, dtype=str, engine="xlrd")
+            return pd.read_excel(path, dtype=str, engine="xlrd", usecols=usecols)
         else:
-            return pd.read_excel(path, dtype=str, engine="openpyxl")
+            return pd.read_excel(path, dtype=str, engine="openpyxl", usecols=usecols)
 
 
 def preparar_anulados():
@@ -31,7 +37,8 @@ def preparar_anulados():
     Prepara el archivo de Anulados:
       - Lee desde INPUT_ANULADOS (Anulados.xlsx)
       - Elimina duplicados (cada póliza solo una vez, mantiene el último registro)
-      - Guarda el resultado en OUTPUT_PACIFICO_ANULADO
+      - Guarda el resultado en OUTPUT_PACIFICO_ANULADO (Parquet; .xlsx solo en auditoría)
+      - Devuelve el DataFrame preparado (None si hubo error)
     """
     print("\n[INICIO] Preparación de Anulados")
     print("-" * 70)
@@ -50,6 +57,7 @@ def preparar_anulados():
         print(f"[ERROR] No se pudo leer el archivo de Anulados: {e}")
         return
 
+    registrar_lectura(INPUT_ANULADOS, len(df))
     print(f"[INFO] Filas leídas: {len(df)}")
 
     # 3. Normalizar columnas
@@ -60,6 +68,8 @@ def preparar_anulados():
         print("[ERROR] El archivo no contiene la columna 'Nro de Poliza/Contrato'")
         return
 
+    df["Nro de Poliza/Contrato"] = clave_texto(df["Nro de Poliza/Contrato"])
+
     # 5. Eliminar duplicados - cada póliza solo una vez (mantener el último registro)
     filas_antes = len(df)
     df_limpio = df.drop_duplicates(subset=["Nro de Poliza/Contrato"], keep="last")
@@ -69,15 +79,11 @@ def preparar_anulados():
     print(f"[INFO] Pólizas únicas: {filas_despues}")
     print(f"[INFO] Duplicados eliminados: {duplicados_eliminados}")
 
-    # 6. Guardar en OUTPUT_PACIFICO_ANULADO
-    OUTPUT_PACIFICO_ANULADO.mkdir(parents=True, exist_ok=True)
-    output_path = OUTPUT_PACIFICO_ANULADO / "Anulados_preparado.xlsx"
+    df_limpio = aplicar_plan_tipos(df_limpio.copy(), "anulados")
 
+    # 6. Guardar en OUTPUT_PACIFICO_ANULADO (formato columnar)
     try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-                df_limpio.to_excel(writer, index=False, sheet_name="Anulados")
+        output_path = guardar_intermedio(df_limpio, OUTPUT_PACIFICO_ANULADO, "Anulados_preparado", hoja="Anulados")
         print(f"[OK] Archivo preparado guardado: {output_path}")
     except Exception as e:
         print(f"[ERROR] No se pudo guardar el archivo preparado: {e}")
@@ -86,6 +92,14 @@ def preparar_anulados():
     print("[OK] Preparación de Anulados completada")
     print("-" * 70)
 
+    return df_limpio
+
+
+def guardar_copias(resultado) -> None:
+    """Copia .xlsx de auditoría (--audit-xlsx) de Anulados recuperados de la caché."""
+    if auditoria_xlsx_activa():
+        guardar_auditoria_xlsx(resultado, OUTPUT_PACIFICO_ANULADO, "Anulados_preparado", hoja="Anulados")
+
 
 if __name__ == "__main__":
     preparar_anulados()
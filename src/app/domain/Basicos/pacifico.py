@@ -1,11 +1,26 @@
-import warnings
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.app.domain.Comun.tipos import aplicar_plan_tipos
+from src.app.domain.Comun.coercion import a_fecha, a_monto, formatear_fecha
+from src.app.domain.Comun.normalizacion import clave_texto, quitar_espacios
 from src.app.repository.configuration_repository import (
     get_pacifico_files,
     OUTPUT_PACIFICO
 )
+from src.app.repository.bloques_repository import (
+    AlmacenBloques,
+    BaseEnBloques,
+    ControlMemoria,
+    bloques_activos,
+    carpeta_bloques,
+)
+from src.app.repository.cache_repository import ENTRADAS_POR_ETAPA, calcular_clave
+from src.app.repository.carga_paralela_repository import cargar_en_paralelo
+from src.app.repository.intermedio_repository import auditoria_xlsx_activa, guardar_auditoria_xlsx, guardar_intermedio
+from src.app.repository.lectura_repository import columnas_requeridas, iterar_filas_texto
+from src.app.repository.registro_archivos_repository import registrar_lectura
 
 
 # ====================================================================================
@@ -14,56 +29,128 @@ from src.app.repository.configuration_repository import (
 
 def normalizar_fecha(serie: pd.Series):
     """Convierte valores a fecha estándar YYYY-MM-DD."""
-    try:
-        return pd.to_datetime(serie, errors="coerce").dt.strftime("%Y-%m-%d")
-    except:
-        return serie
+    return formatear_fecha(a_fecha(serie), "%Y-%m-%d")
 
 
 def limpiar_monto(serie: pd.Series):
-    """Normaliza montos tipo 1,234.56 o '--' a float."""
-    return (
-        serie.astype(str)
-        .str.replace(",", "", regex=False)
-        .str.replace("—", "0")
-        .str.replace("--", "0")
-        .str.replace("-", "0")
-        .astype(float)
-    )
-
-
-def limpiar_encabezado(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza montos tipo 1,234.56, -643.61 o '--' (sin monto → 0) a float."""
+    return a_monto(serie)
+
+
+def leer_reporte_pacifico(path: Path, columnas=None, max_filas_encabezado: int = 10) -> pd.DataFrame:
+    """
+    Lee un reporte Pacífico en una sola pasada, fila a fila (solo lectura),
+    sin cargar la hoja completa ni copiar el DataFrame en cada paso:
+      - detecta la fila de encabezado ("Contratante") entre las primeras filas
+      - conserva solo `columnas` (todas si es None) y descarta las "Unnamed"
+      - omite las filas basura "TipoReporte"
     """
-    Detecta la fila real del encabezado en los archivos Pacífico,
-    la establece como encabezado del DataFrame y elimina filas/columnas basura.
+    return next(iterar_bloques_reporte(path, columnas, max_filas_encabezado=max_filas_encabezado))
+
+
+def iterar_bloques_reporte(path: Path, columnas=None, filas_por_bloque=None, max_filas_encabezado: int = 10):
+    """
+    Igual que `leer_reporte_pacifico`, pero entrega el reporte en DataFrames
+    de a lo sumo `filas_por_bloque` filas (un número, o una función que se
+    consulta antes de cada bloque). Con None entrega un solo DataFrame.
+    Si no se detecta el encabezado, el reporte se entrega tal cual en un bloque.
     """
-    header_row = None
+    filas = iterar_filas_texto(path)
+    previas = []
+    encabezado = None
 
-    # Buscar la fila donde aparece "Contratante" (encabezado real)
-    for i in range(min(10, len(df))):
-        row = df.iloc[i].astype(str).str.lower().tolist()
-        if "contratante" in row:
-            header_row = i
+    for fila in filas:
+        if "contratante" in [str(v).lower() for v in fila]:
+            encabezado = fila
+            break
+        previas.append(fila)
+        if len(previas) >= max_filas_encabezado:
             break
 
-    if header_row is None:
+    if encabezado is None:
         print("[WARN] No se pudo detectar el encabezado real. Se deja tal cual.")
-        return df
+        resto = previas + list(filas)
+        ancho = max((len(f) for f in resto), default=0)
+        yield pd.DataFrame(
+            [[v if v is not None else np.nan for v in f] + [np.nan] * (ancho - len(f)) for f in resto],
+            dtype=object,
+        )
+        return
+
+    # Posiciones a conservar (primera aparición de cada nombre)
+    posiciones = {}
+    primera_valida = None
+    for i, nombre in enumerate(encabezado):
+        if nombre is not None and "unnamed" in nombre.lower():
+            continue
+        if primera_valida is None:
+            primera_valida = i
+        if nombre is None or nombre in posiciones:
+            continue
+        if columnas is None or nombre in columnas:
+            posiciones[nombre] = i
+
+    def limite():
+        return filas_por_bloque() if callable(filas_por_bloque) else filas_por_bloque
+
+    datos = {nombre: [] for nombre in posiciones}
+    cantidad, maximo = 0, limite()
+    for fila in filas:
+        if primera_valida is not None and primera_valida < len(fila):
+            primera = fila[primera_valida]
+            if primera is not None and primera.lower() == "tiporeporte":
+                continue
+        for nombre, i in posiciones.items():
+            valor = fila[i] if i < len(fila) else None
+            datos[nombre].append(valor if valor is not None else np.nan)
+        cantidad += 1
+        if maximo and cantidad >= maximo:
+            yield pd.DataFrame(datos, dtype=object)
+            datos = {nombre: [] for nombre in posiciones}
+            cantidad, maximo = 0, limite()
+
+    if cantidad or not maximo:
+        yield pd.DataFrame(datos, dtype=object)
+
+
+def tipo_reporte(archivo: Path) -> str:
+    """Clasifica el reporte según el nombre del archivo (VIGENTE / NO VIGENTE / DESCONOCIDO)."""
+    f = archivo.name.lower()
+    if "vig" in f and not "no" in f:
+        return "VIGENTE"
+    elif "no" in f:
+        return "NO VIGENTE"
+    return "DESCONOCIDO"
+
+
+def limpiar_base_pacifico(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza fechas, montos, espacios y número de póliza. Cada valor se
+    limpia por sí solo: da lo mismo aplicarla a la base unificada o a cada
+    bloque de filas (ver preparar_pacifico_por_bloques).
+    """
+    columnas_fecha = ["Inicio de Vigencia", "Fin de Vigencia"]
+    columnas_monto = ["Prima Bruta Dolares", "Prima Bruta Soles"]
 
-    # Redefinir encabezados
-    df.columns = df.iloc[header_row]
+    # Normalizar fechas
+    for col in columnas_fecha:
+        if col in df.columns:
+            df[col] = normalizar_fecha(df[col])
 
-    # Eliminar filas anteriores al encabezado
-    df = df.drop(index=range(0, header_row + 1))
+    # Normalizar montos
+    for col in columnas_monto:
+        if col in df.columns:
+            df[col] = limpiar_monto(df[col])
 
-    # Quitar columnas basura (Unnamed)
-    df = df.loc[:, ~df.columns.astype(str).str.contains("unnamed", case=False)]
+    # Limpiar espacios solo en columnas de texto
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = quitar_espacios(df[col])
 
-    # Eliminar filas basura como "TipoReporte"
-    first_col = df.columns[0]
-    df = df[df[first_col].astype(str).str.lower() != "tiporeporte"]
+    # Asegurar limpieza de póliza
+    if "Nro de Poliza/Contrato" in df.columns:
+        df["Nro de Poliza/Contrato"] = clave_texto(df["Nro de Poliza/Contrato"])
 
-    df = df.reset_index(drop=True)
     return df
 
 
@@ -87,29 +174,25 @@ def preparar_pacifico():
         return pd.DataFrame()
 
     frames = []
-
-    for file in archivos:
-        print(f"[OK] Leyendo archivo: {file.name}")
-
-        try:
-            raw_df = pd.read_excel(file, header=None, dtype=str, engine="openpyxl")
-        except Exception as e:
-            print(f"[ERROR] No se pudo leer {file.name}: {e}")
+    # Solo las columnas requeridas; en lectura completa (None) todas las del reporte
+    columnas = columnas_requeridas("pacifico")
+
+    # Bases muy grandes: bloques de filas con memoria acotada (ver bloques_repository)
+    if bloques_activos():
+        return preparar_pacifico_por_bloques(archivos, columnas)
+
+    # Cada reporte se lee en su propio proceso (lectura en streaming:
+    # encabezado, columnas y filas basura en una pasada)
+    for carga in cargar_en_paralelo(leer_reporte_pacifico, archivos, columnas=columnas):
+        file = carga.archivo
+        if not carga.ok:
             continue
-
-        # Limpieza de encabezado
-        df = limpiar_encabezado(raw_df)
+        print(f"[OK] Archivo leído: {file.name}")
+        df = carga.df
+        registrar_lectura(file, len(df))
 
         # Clasificar tipo de reporte según el nombre del archivo
-        f = file.name.lower()
-        if "vig" in f and not "no" in f:
-            tipo = "VIGENTE"
-        elif "no" in f:
-            tipo = "NO VIGENTE"
-        else:
-            tipo = "DESCONOCIDO"
-
-        df["TipoReporte"] = tipo
+        df["TipoReporte"] = tipo_reporte(file)
 
         frames.append(df)
 
@@ -125,38 +208,17 @@ def preparar_pacifico():
     # LIMPIEZA Y NORMALIZACIÓN FINAL
     # ====================================================================================
 
-    columnas_fecha = ["Inicio de Vigencia", "Fin de Vigencia"]
-    columnas_monto = ["Prima Bruta Dolares", "Prima Bruta Soles"]
-
-    # Normalizar fechas
-    for col in columnas_fecha:
-        if col in df.columns:
-            df[col] = normalizar_fecha(df[col])
-
-    # Normalizar montos
-    for col in columnas_monto:
-        if col in df.columns:
-            df[col] = limpiar_monto(df[col])
-
-    # Limpiar espacios solo en columnas de texto
-    for col in df.columns:
-        if df[col].dtype == object:
-            df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
-
-    # Asegurar limpieza de póliza
-    if "Nro de Poliza/Contrato" in df.columns:
-        df["Nro de Poliza/Contrato"] = df["Nro de Poliza/Contrato"].astype(str).str.strip()
+    df = limpiar_base_pacifico(df)
 
     # ====================================================================================
     # GUARDAR ARCHIVO BASE
     # ====================================================================================
 
-    OUTPUT_PACIFICO.mkdir(parents=True, exist_ok=True)
-    output_path = OUTPUT_PACIFICO / "Base_Pacifico.xlsx"
+    # Columnas de baja cardinalidad como categóricas (MAPEO["Columnas_Categoricas"])
+    df = aplicar_plan_tipos(df, "pacifico")
 
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        df.to_excel(output_path, index=False)
+    # Formato columnar (Parquet): la integración lo lee sin pasar por Excel
+    output_path = guardar_intermedio(df, OUTPUT_PACIFICO, "Base_Pacifico")
 
     print(f"\n[OK] Archivo unificado y limpio guardado en:")
     print(f"     {output_path.resolve()}")
@@ -165,6 +227,62 @@ def preparar_pacifico():
     return df
 
 
+def preparar_pacifico_por_bloques(archivos, columnas) -> BaseEnBloques:
+    """
+    Preparación con memoria acotada: los reportes se leen uno tras otro y
+    cada bloque de filas se limpia y se guarda en disco, sin armar nunca la
+    base completa. Devuelve la BaseEnBloques que usa la integración.
+    """
+    control = ControlMemoria("Preparación Pacífico")
+    # Una carpeta por entradas: cada BaseEnBloques de la caché apunta a sus propios bloques
+    clave = calcular_clave(archivos, "tablero_PACIFICO", columnas, "bloques", fuente="pacifico")
+    carpeta = carpeta_bloques(OUTPUT_PACIFICO / "Base_Pacifico_bloques", clave, ENTRADAS_POR_ETAPA)
+    almacen = AlmacenBloques(carpeta, vaciar=True)
+    columnas_base = {}   # en orden de aparición, como pd.concat
+    leidos = 0
+
+    for file in archivos:
+        partes, filas = almacen.partes, almacen.filas
+        try:
+            for df in iterar_bloques_reporte(file, columnas, lambda: control.filas):
+                df["TipoReporte"] = tipo_reporte(file)
+                df = limpiar_base_pacifico(df)
+                columnas_base.update(dict.fromkeys(df.columns))
+                almacen.agregar(df)
+                control.revisar()
+        except Exception as e:
+            print(f"[ERROR] No se pudo leer {file.name}: {e}")
+            almacen.recortar(partes)
+            continue
+        print(f"[OK] Archivo leído: {file.name}")
+        registrar_lectura(file, almacen.filas - filas)
+        leidos += 1
+
+    if not leidos:
+        print("[ERROR] No hay archivos Pacífico válidos para procesar.")
+        return pd.DataFrame()
+
+    print(f"[INFO] Total registros unificados: {almacen.filas} en {almacen.partes} bloques")
+    control.resumen()
+    base = BaseEnBloques(almacen.carpeta, almacen.filas, tuple(columnas_base), almacen.partes)
+    guardar_copias(base)
+
+    print(f"\n[OK] Base limpia guardada por bloques en:")
+    print(f"     {almacen.carpeta.resolve()}")
+    print("[OK] Preparación Pacífico completada exitosamente.\n")
+
+    return base
+
+
+def guardar_copias(resultado) -> None:
+    """
+    Copia .xlsx de auditoría de la base (--audit-xlsx) cuando no la escribe
+    guardar_intermedio: base por bloques o resultado recuperado de la caché.
+    """
+    if auditoria_xlsx_activa():
+        guardar_auditoria_xlsx(resultado, OUTPUT_PACIFICO, "Base_Pacifico")
+
+
 # ====================================================================================
 # EJECUCIÓN DIRECTA
 # ====================================================================================
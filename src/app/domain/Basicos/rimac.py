@@ -1,10 +1,29 @@
-import pandas as pd
 from datetime import datetime
-import warnings
-from src.app.repository.configuration_repository import get_rimac_file
+from src.app.domain.Comun.coercion import a_fecha, formatear_fecha
+from src.app.domain.Comun.normalizacion import clave_texto
+from src.app.domain.Comun.tipos import aplicar_plan_tipos
+from src.app.repository.lectura_repository import (
+    abrir_libro,
+    columnas_requeridas,
+    filtro_columnas,
+    resolver_hoja,
+)
+from src.app.repository.configuration_repository import get_rimac_file, OUTPUT_RIMAC_PREPARADO
 from src.app.repository.mapping_repository import MAPEO
+from src.app.repository.persistencia_repository import persistencia_activa, persistir_en_segundo_plano
+from src.app.repository.registro_archivos_repository import registrar_lectura
 
-def preparar_rimac():
+# Palabras clave para elegir la hoja del libro
+PALABRAS_HOJA = ["pagosvencidos", "pagos", "rimac"]
+
+
+def preparar_rimac(persistir: bool = None):
+    """
+    Prepara el reporte de pagos vencidos Rimac en memoria (no modifica el
+    archivo de entrada): ordena por VENCIMIENTO y elimina duplicados.
+    Con `persistir` (o la persistencia global activa) guarda además una copia
+    en OUTPUT_RIMAC_PREPARADO en segundo plano.
+    """
     # ---------------------------------------------------------
     # 1️⃣ Obtener el archivo más reciente
     # ---------------------------------------------------------
@@ -19,20 +38,16 @@ def preparar_rimac():
     # 2️⃣ Detección de hoja correcta
     # ---------------------------------------------------------
     try:
-        ext = file_path.suffix.lower()
-        engine = "xlrd" if ext == ".xls" else "openpyxl"
-
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            xls = pd.ExcelFile(file_path, engine=engine)
-            sheet_candidates = [s for s in xls.sheet_names if any(k in s.lower() for k in ["pagosvencidos", "pagos", "rimac"])]
-            target_sheet = sheet_candidates[0] if sheet_candidates else xls.sheet_names[0]
-
-        print(f"[INFO] Hoja detectada: '{target_sheet}'")
-
-        # lEER HOJA SELECCIONADA
-        df = pd.read_excel(file_path, sheet_name=target_sheet, dtype=str, engine=engine)
+        # Un solo libro abierto: se elige la hoja por sus metadatos y se lee esa hoja
+        with abrir_libro(file_path) as xls:
+            hoja = resolver_hoja(xls, PALABRAS_HOJA)
+            target_sheet = hoja.nombre
+            print(f"[INFO] Hoja detectada: '{target_sheet}' ({hoja.dimension or 'sin dimensión'})")
+
+            # Leer la hoja seleccionada (solo las columnas requeridas, salvo lectura completa)
+            df = xls.parse(sheet_name=target_sheet, usecols=filtro_columnas("rimac"), dtype=str)
         df.columns = df.columns.map(str).str.strip()
+        registrar_lectura(file_path, len(df))
         print(f"[OK] Archivo leído correctamente ({len(df)} filas, {len(df.columns)} columnas)")
 
     except Exception as e:
@@ -41,7 +56,7 @@ def preparar_rimac():
     # ---------------------------------------------------------
     # 3️⃣ Validación de columnas esperadas
     # ---------------------------------------------------------
-    columnas_esperadas = MAPEO.get("Tablero_RIMAC", [])
+    columnas_esperadas = columnas_requeridas("rimac") or MAPEO.get("Tablero_RIMAC", [])
     columnas_faltantes = [c for c in columnas_esperadas if c not in df.columns]
 
     if columnas_faltantes:
@@ -60,14 +75,14 @@ def preparar_rimac():
         # Convertir 'VENCIMIENTO' a datetime para poder ordenar correctamente
         if "VENCIMIENTO" in df_base.columns:
             # Solo aplicar el ordenamiento si existe la columna y al menos una fecha
-            df_base["VENCIMIENTO"] = pd.to_datetime(df_base["VENCIMIENTO"], errors="coerce")
+            df_base["VENCIMIENTO"] = a_fecha(df_base["VENCIMIENTO"])
             if df_base["VENCIMIENTO"].notna().any():
                 # Ordenar por fecha de más antiguo a más reciente ANTES de aplicar las siguientes condiciones
                 df_base = df_base.sort_values(by="VENCIMIENTO", ascending=True, na_position="last")
 
         # Normalizar nro de póliza (espacios)
         if "NRO. POLIZA" in df_base.columns:
-            df_base["NRO. POLIZA"] = df_base["NRO. POLIZA"].astype(str).str.strip()
+            df_base["NRO. POLIZA"] = clave_texto(df_base["NRO. POLIZA"])
 
         # Eliminar duplicados SOLO si los 3 campos son idénticos: RESPONSABLE DE PAGO, NRO. POLIZA y CATEGORÍA
         campos_duplicados = ["RESPONSABLE DE PAGO", "NRO. POLIZA", "CATEGORÍA"]
@@ -94,9 +109,8 @@ def preparar_rimac():
 
         # Formatear fecha para escritura/export (si existen valores)
         if "VENCIMIENTO" in df_base.columns:
-            # Asegurar que es datetime y luego formatear; no reordenamos aquí para evitar cambiar la prioridad original
-            df_base["VENCIMIENTO"] = pd.to_datetime(df_base["VENCIMIENTO"], errors="coerce")
-            df_base["VENCIMIENTO"] = df_base["VENCIMIENTO"].dt.strftime("%Y-%m-%d")
+            # Ya es datetime (se convirtió una sola vez arriba); no reordenamos aquí para evitar cambiar la prioridad original
+            df_base["VENCIMIENTO"] = formatear_fecha(df_base["VENCIMIENTO"], "%Y-%m-%d")
 
         print(f"[OK] Datos limpiados y ordenados. Total final: {len(df_base)} filas.")
 
@@ -104,23 +118,15 @@ def preparar_rimac():
         print(f"[ERROR] Error durante la limpieza o normalización: {e}")
         return
     # ---------------------------------------------------------
-    # 5️⃣ Guardar los cambios en el mismo archivo
+    # 5️⃣ Verificación en memoria y copia opcional (el input no se modifica)
     # ---------------------------------------------------------
-    try:
-        print(f"[INFO] Guardando los cambios en: {file_path.resolve()}")
-        with pd.ExcelWriter(file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            # ⬅️ aquí usamos la misma hoja desde la que leímos
-            df_base.to_excel(writer, index=False, sheet_name=target_sheet)
-
-        print(f"✅ Archivo actualizado correctamente en: {file_path.resolve()}")
-
-        # Verificación post-escritura
-        check_df = pd.read_excel(file_path, sheet_name=target_sheet, engine="openpyxl")
-        print(f"[VERIFICACIÓN] Hoja '{target_sheet}' guardada correctamente con {len(check_df)} filas y {len(check_df.columns)} columnas.")
+    print(f"[VERIFICACIÓN] Hoja '{target_sheet}' preparada con {len(df_base)} filas y {len(df_base.columns)} columnas.")
+    df_base = aplicar_plan_tipos(df_base, "rimac")
 
-    except Exception as e:
-        print(f"❌ Error al guardar los cambios en el archivo: {e}")
-        return
+    if persistir is None:
+        persistir = persistencia_activa()
+    if persistir:
+        _persistir(df_base, file_path, target_sheet)
 
     # ---------------------------------------------------------
     # 6️⃣ Resumen del proceso
@@ -132,6 +138,23 @@ def preparar_rimac():
     print("--------------------------------------------------------------")
     print("✅ Proceso de preparación Rimac finalizado correctamente.\n")
 
+    return df_base
+
+
+def _persistir(df, file_path, hoja: str) -> None:
+    output_path = OUTPUT_RIMAC_PREPARADO / f"{file_path.stem}_preparado.xlsx"
+    print(f"[INFO] Guardando copia del preparado (segundo plano) en: {output_path}")
+    persistir_en_segundo_plano(df, output_path, sheet_name=hoja)
+
+
+def guardar_copias(resultado) -> None:
+    """Copia del preparado (--persist-prepared) cuando Rimac se recupera de la caché."""
+    if persistencia_activa():
+        file_path = get_rimac_file()
+        with abrir_libro(file_path) as xls:
+            hoja = resolver_hoja(xls, PALABRAS_HOJA).nombre
+        _persistir(resultado, file_path, hoja)
+
 
 # Punto de ejecución directa
 if __name__ == "__main__":
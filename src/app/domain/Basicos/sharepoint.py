@@ -1,11 +1,28 @@
-import warnings
-
-import pandas as pd
 from datetime import datetime
-from src.app.repository.configuration_repository import get_sharepoint_file
+from src.app.domain.Comun.normalizacion import clave_texto, sufijo_tras_guion
+from src.app.domain.Comun.tipos import aplicar_plan_tipos
+from src.app.repository.lectura_repository import (
+    abrir_libro,
+    columnas_requeridas,
+    filtro_columnas,
+    resolver_hoja,
+)
+from src.app.repository.configuration_repository import get_sharepoint_file, OUTPUT_SHAREPOINT
 from src.app.repository.mapping_repository import MAPEO
+from src.app.repository.persistencia_repository import persistencia_activa, persistir_en_segundo_plano
+from src.app.repository.registro_archivos_repository import registrar_lectura
+
+# Palabras clave para elegir la hoja del libro
+PALABRAS_HOJA = ["tablero", "renovaciones", "poliza"]
+
 
-def preparar_sharepoint():
+def preparar_sharepoint(persistir: bool = None):
+    """
+    Prepara el tablero SharePoint en memoria (no modifica el archivo de entrada)
+    y devuelve el DataFrame con las columnas derivadas Pacifico y Rimac.
+    Con `persistir` (o la persistencia global activa) guarda además una copia
+    en OUTPUT_SHAREPOINT en segundo plano.
+    """
 
     try:
         file_path = get_sharepoint_file()
@@ -18,21 +35,16 @@ def preparar_sharepoint():
     # 2️⃣ Detección de hoja correcta
     # ---------------------------------------------------------
     try:
-        ext = file_path.suffix.lower()
-        engine = "xlrd" if ext == ".xls" else "openpyxl"
-
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            xls = pd.ExcelFile(file_path, engine=engine)
-            sheet_candidates = [s for s in xls.sheet_names if
-                                any(k in s.lower() for k in ["tablero", "renovaciones", "poliza"])]
-            target_sheet = sheet_candidates[0] if sheet_candidates else xls.sheet_names[0]
-
-        print(f"[INFO] Hoja detectada: '{target_sheet}'")
-
-        # Leer hoja seleccionada
-        df = pd.read_excel(file_path, sheet_name=target_sheet, dtype=str, engine=engine)
+        # Un solo libro abierto: se elige la hoja por sus metadatos y se lee esa hoja
+        with abrir_libro(file_path) as xls:
+            hoja = resolver_hoja(xls, PALABRAS_HOJA)
+            target_sheet = hoja.nombre
+            print(f"[INFO] Hoja detectada: '{target_sheet}' ({hoja.dimension or 'sin dimensión'})")
+
+            # Leer la hoja seleccionada (solo las columnas requeridas, salvo lectura completa)
+            df = xls.parse(sheet_name=target_sheet, usecols=filtro_columnas("sharepoint"), dtype=str)
         df.columns = df.columns.map(str).str.strip()
+        registrar_lectura(file_path, len(df))
         print(f"[OK] Archivo leído correctamente ({len(df)} filas, {len(df.columns)} columnas)")
 
     except Exception as e:
@@ -41,7 +53,9 @@ def preparar_sharepoint():
     # ---------------------------------------------------------
     # 3️⃣ Validación de columnas esperadas
     # ---------------------------------------------------------
-    columnas_esperadas = MAPEO.get("Tablero_sharepoint", [])
+    columnas_esperadas = columnas_requeridas("sharepoint") or [
+        c for c in MAPEO.get("Tablero_Sharepoint", []) if c not in ["Pacifico", "Rimac"]
+    ]
     columnas_faltantes = [c for c in columnas_esperadas if c not in df.columns]
 
     if columnas_faltantes:
@@ -57,7 +71,7 @@ def preparar_sharepoint():
             print("No se encontró columna 'Pólizafinal'. No se puede generar pacifico/rimac.")
             return
 
-        df["Pólizafinal"] = df["Pólizafinal"].astype(str).str.strip()
+        df["Pólizafinal"] = clave_texto(df["Pólizafinal"])
 
         # Eliminar versiones viejas de columnas
         for col in ["Pacifico", "Rimac"]:
@@ -70,9 +84,7 @@ def preparar_sharepoint():
 
         # Rimac
         # Reemplazo de prefijos
-        df["Rimac"] = df["Pólizafinal"].apply(
-            lambda x: x.split("-")[-1] if "-" in x else x
-        )
+        df["Rimac"] = sufijo_tras_guion(df["Pólizafinal"])
 
         print("[OK] columnas derivadas creadas/actualizadas correctamente: Pacifico, Rimac")
 
@@ -80,23 +92,16 @@ def preparar_sharepoint():
         print(f"[ERROR] Error durante la creación de columnas derivadas: {e}")
         return
     # ---------------------------------------------------------
-    # 5️⃣ Guardar los cambios en el mismo archivo
+    # 5️⃣ Verificación en memoria y copia opcional (el input no se modifica)
     # ---------------------------------------------------------
-    try:
-        print(f"[INFO] Guardando los cambios en: {file_path.resolve()}")
-        with pd.ExcelWriter(file_path, engine="openpyxl", mode="w") as writer:
-            df.to_excel(writer, index=False, sheet_name=target_sheet)
-        print(f"Archivo actualizado correctamente en: {file_path.resolve()}")
+    added_cols = [c for c in ["Pacifico", "Rimac"] if c in df.columns]
+    print(f"[VERIFICACIÓN] Columnas en el DataFrame preparado: {added_cols}")
+    df = aplicar_plan_tipos(df, "sharepoint")
 
-
-        # Verificacion post - escritura
-        check_df = pd.read_excel(file_path, sheet_name=target_sheet, engine="openpyxl")
-        added_cols = [c for c in ["Pacifico", "Rimac"] if c in check_df.columns]
-        print(f"[VERIFICACIÓN] Columnas en el archivo guardado: {added_cols}")
-
-    except Exception as e:
-        print(f"Error al guardar los cambios en el archivo SharePoint: {e}")
-        return
+    if persistir is None:
+        persistir = persistencia_activa()
+    if persistir:
+        _persistir(df, file_path, target_sheet)
 
     # ---------------------------------------------------------
     # 6️⃣ Resumen del proceso
@@ -109,6 +114,23 @@ def preparar_sharepoint():
     print("--------------------------------------------------------------")
     print("✅ Proceso de preparación SharePoint finalizado correctamente.\n")
 
+    return df
+
+
+def _persistir(df, file_path, hoja: str) -> None:
+    output_path = OUTPUT_SHAREPOINT / f"{file_path.stem}_preparado.xlsx"
+    print(f"[INFO] Guardando copia del preparado (segundo plano) en: {output_path}")
+    persistir_en_segundo_plano(df, output_path, sheet_name=hoja)
+
+
+def guardar_copias(resultado) -> None:
+    """Copia del preparado (--persist-prepared) cuando SharePoint se recupera de la caché."""
+    if persistencia_activa():
+        file_path = get_sharepoint_file()
+        with abrir_libro(file_path) as xls:
+            hoja = resolver_hoja(xls, PALABRAS_HOJA).nombre
+        _persistir(resultado, file_path, hoja)
+
 
 # Punto de ejecución directa
 if __name__ == "__main__":
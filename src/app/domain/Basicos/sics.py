@@ -1,10 +1,22 @@
 import pandas as pd
 from datetime import datetime
 import warnings
-from src.app.repository.configuration_repository import get_sics_file
+from src.app.domain.Comun.coercion import a_fecha, formatear_fecha
+from src.app.domain.Comun.normalizacion import clave_texto, sufijo_tras_guion
+from src.app.domain.Comun.tipos import aplicar_plan_tipos
+from src.app.repository.configuration_repository import get_sics_file, OUTPUT_SICS
+from src.app.repository.lectura_repository import columnas_requeridas, filtro_columnas, tipos_requeridos
 from src.app.repository.mapping_repository import MAPEO
+from src.app.repository.persistencia_repository import persistencia_activa, persistir_en_segundo_plano
+from src.app.repository.registro_archivos_repository import registrar_lectura
 
-def preparar_sics():
+def preparar_sics(persistir: bool = None):
+    """
+    Prepara el reporte SICS en memoria (no modifica el archivo de entrada)
+    y devuelve el DataFrame con las columnas derivadas Pacifico, Rimac y Fin Vig.
+    Con `persistir` (o la persistencia global activa) guarda además una copia
+    en OUTPUT_SICS en segundo plano.
+    """
 
     try:
         file_path = get_sics_file()
@@ -19,18 +31,23 @@ def preparar_sics():
 
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            # Leer sin dtype=str para que las fechas se lean correctamente
-            df = pd.read_excel(file_path, engine=engine)
+            # Solo las columnas requeridas; sin dtype=str en las fechas para que se lean correctamente
+            df = pd.read_excel(
+                file_path, engine=engine, usecols=filtro_columnas("sics"), dtype=tipos_requeridos("sics")
+            )
 
         df.columns = df.columns.map(str).str.strip()
+        registrar_lectura(file_path, len(df))
         print(f"[OK] Archivo leído correctamente ({len(df)} filas, {len(df.columns)} columnas)")
 
     except Exception as e:
         print(f"[ERROR] No se pudo leer el archivo de SICS: {e}")
         return
 
-    # Obtener columnas esperadas del mapeo (sin incluir las columnas derivadas)
-    columnas_esperadas = [c for c in MAPEO["Tablero_SICS"] if c not in ["Pacifico", "Rimac", "Fin Vig"]]
+    # Columnas esperadas: las requeridas o, en lectura completa, las del mapeo (sin las derivadas)
+    columnas_esperadas = columnas_requeridas("sics") or [
+        c for c in MAPEO["Tablero_SICS"] if c not in ["Pacifico", "Rimac", "Fin Vig"]
+    ]
     columnas_faltantes = [c for c in columnas_esperadas if c not in df.columns]
 
     if columnas_faltantes:
@@ -44,7 +61,7 @@ def preparar_sics():
             print("❌ No se encontró la columna base 'Póliza'. No se puede generar Pacifico/Rimac.")
             return
 
-        df["Póliza"] = df["Póliza"].astype(str).str.strip()
+        df["Póliza"] = clave_texto(df["Póliza"])
 
         # Eliminar versiones viejas de las columnas (para evitar conflictos)
         for col in ["Pacifico", "Rimac", "Fin Vig"]:
@@ -57,15 +74,13 @@ def preparar_sics():
 
         # --- Rimac ---
         # Toma la parte después del guion (-), si no lo tiene quedaría igual
-        df["Rimac"] = df["Póliza"].apply(
-            lambda x: x.split("-")[-1] if "-" in x else x
-        )
+        df["Rimac"] = sufijo_tras_guion(df["Póliza"])
 
         # --- Fin Vig ---
         # Convierte el formato de fecha de "01/09/2025" a "2025-09"
         if "Vig Hasta Póliza" in df.columns:
-            # Convertir a datetime con diferentes formatos posibles
-            fecha_convertida = pd.to_datetime(df["Vig Hasta Póliza"], errors="coerce", dayfirst=True)
+            # Convertir a datetime (formatos explícitos dd/mm/aaaa, ISO o serie de Excel)
+            fecha_convertida = a_fecha(df["Vig Hasta Póliza"], dayfirst=True)
 
             # Verificar cuántas fechas se convirtieron exitosamente
             fechas_validas = fecha_convertida.notna().sum()
@@ -73,7 +88,7 @@ def preparar_sics():
             print(f"[INFO] Fechas válidas convertidas: {fechas_validas}/{fechas_totales}")
 
             # Formatear a "YYYY-MM"
-            df["Fin Vig"] = fecha_convertida.dt.strftime("%Y-%m").fillna("")
+            df["Fin Vig"] = formatear_fecha(fecha_convertida, "%Y-%m").fillna("")
 
             # Mostrar muestra de conversión
             if fechas_validas < fechas_totales:
@@ -87,20 +102,15 @@ def preparar_sics():
         print(f"[ERROR] Error durante la creación de columnas derivadas: {e}")
         return
 
-    try:
-        print(f"[INFO] Guardando los cambios en: {file_path.resolve()}")
-        with pd.ExcelWriter(file_path, engine="openpyxl", mode="w") as writer:
-            df.to_excel(writer, index=False)
-        print(f"✅ Archivo actualizado correctamente en: {file_path.resolve()}")
+    # Verificación en memoria (el archivo de entrada no se modifica)
+    added_cols = [c for c in ["Pacifico", "Rimac", "Fin Vig"] if c in df.columns]
+    print(f"[VERIFICACIÓN] Columnas en el DataFrame preparado: {added_cols}")
+    df = aplicar_plan_tipos(df, "sics")
 
-        # Verificación post-escritura
-        check_df = pd.read_excel(file_path, engine="openpyxl")
-        added_cols = [c for c in ["Pacifico", "Rimac", "Fin Vig"] if c in check_df.columns]
-        print(f"[VERIFICACIÓN] Columnas en el archivo guardado: {added_cols}")
-
-    except Exception as e:
-        print(f"❌ Error al guardar los cambios en el archivo: {e}")
-        return
+    if persistir is None:
+        persistir = persistencia_activa()
+    if persistir:
+        _persistir(df, file_path)
 
     print("\n📋 Resumen del proceso SICS:")
     print(f"   Total de filas: {len(df)}")
@@ -110,6 +120,20 @@ def preparar_sics():
     print("--------------------------------------------------------------")
     print("✅ Proceso de preparación SICS finalizado correctamente.\n")
 
+    return df
+
+
+def _persistir(df: pd.DataFrame, file_path) -> None:
+    output_path = OUTPUT_SICS / f"{file_path.stem}_preparado.xlsx"
+    print(f"[INFO] Guardando copia del preparado (segundo plano) en: {output_path}")
+    persistir_en_segundo_plano(df, output_path)
+
+
+def guardar_copias(resultado) -> None:
+    """Copia del preparado (--persist-prepared) cuando SICS se recupera de la caché."""
+    if persistencia_activa():
+        _persistir(resultado, get_sics_file())
+
 
 if __name__ == "__main__":
     preparar_sics()
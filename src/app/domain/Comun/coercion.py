@@ -0,0 +1,162 @@
+"""
+coercion.py
+-----------
+Conversión de columnas a fechas y montos, compartida por todas las
+preparaciones (las llaves de póliza están en normalizacion.py).
+
+Cada conversión trabaja sobre los valores DISTINTOS de la columna
+(`pd.factorize`) y reparte el resultado a las filas por código, así que un
+mismo texto ("2025-09-30", "1,234.56") se interpreta una sola vez.
+
+Fechas, en este orden:
+  1. valores que ya son fecha (datetime / Timestamp)
+  2. números de serie de Excel (días desde 1899-12-30)
+  3. formatos explícitos (ISO y dd/mm/aaaa o mm/dd/aaaa según `dayfirst`),
+     cada uno en una sola pasada vectorizada
+  4. texto con forma de número de serie ("45930")
+  5. lo que quede, con la inferencia de pandas valor por valor
+Lo que no se pueda interpretar queda como NaT.
+"""
+
+import re
+import warnings
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from src.app.domain.Comun.normalizacion import por_valores_unicos
+
+FORMATOS_ISO = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+FORMATOS_DIA_PRIMERO = ("%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%d-%m-%Y")
+FORMATOS_MES_PRIMERO = ("%m/%d/%Y", "%m/%d/%Y %H:%M:%S", "%m-%d-%Y")
+
+# Números de serie de Excel válidos (1900-01-01 .. 9999-12-31)
+_ORIGEN_EXCEL = pd.Timestamp("1899-12-30")
+_SERIAL_MIN = 1
+_SERIAL_MAX = 2_958_465
+_PATRON_SERIAL = re.compile(r"^\d+(\.\d+)?$")
+
+# Marcadores de "sin monto" que se leen como 0
+MARCADORES_MONTO_CERO = ("-", "--", "---", "—", "–")
+
+
+# ===================================================================
+# Utilidades
+# ===================================================================
+
+def _es_numero(valor) -> bool:
+    return isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, (bool, np.bool_))
+
+
+def _desde_serial(seriales: np.ndarray) -> pd.DatetimeIndex:
+    """Números de serie de Excel → fechas (NaT fuera de rango)."""
+    dias = pd.to_numeric(pd.Series(seriales), errors="coerce")
+    dias = dias.where(dias.between(_SERIAL_MIN, _SERIAL_MAX))
+    return pd.DatetimeIndex(_ORIGEN_EXCEL + pd.to_timedelta(dias, unit="D"))
+
+
+# ===================================================================
+# Fechas
+# ===================================================================
+
+def _fechas_unicas(valores: np.ndarray, formatos: tuple, dayfirst: bool) -> np.ndarray:
+    n = len(valores)
+    fechas = pd.Series(pd.NaT, index=range(n), dtype="datetime64[ns]")
+    pendiente = np.ones(n, dtype=bool)
+
+    # 1) Ya son fechas
+    ya_fecha = np.array([isinstance(v, (datetime, date)) for v in valores], dtype=bool)
+    if ya_fecha.any():
+        fechas[ya_fecha] = pd.to_datetime(pd.Series(valores[ya_fecha]), errors="coerce").to_numpy()
+        pendiente &= ~ya_fecha
+
+    # 2) Números: serie de Excel
+    numero = np.array([_es_numero(v) for v in valores], dtype=bool) & pendiente
+    if numero.any():
+        fechas[numero] = _desde_serial(valores[numero]).to_numpy()
+        pendiente &= ~numero
+
+    if not pendiente.any():
+        return fechas.to_numpy()
+
+    textos = pd.Series(valores, dtype=object).where(pendiente).astype(str).str.strip()
+
+    # 3) Formatos explícitos, uno por pasada
+    for formato in formatos:
+        if not pendiente.any():
+            break
+        convertidas = pd.to_datetime(textos[pendiente], format=formato, errors="coerce")
+        ok = convertidas.notna()
+        if ok.any():
+            idx = convertidas.index[ok]
+            fechas[idx] = convertidas[ok].to_numpy()
+            pendiente[idx] = False
+
+    # 4) Texto con forma de número de serie
+    serial = pendiente & textos.str.match(_PATRON_SERIAL).to_numpy()
+    if serial.any():
+        convertidas = _desde_serial(textos[serial].to_numpy())
+        fechas[serial] = convertidas.to_numpy()
+        pendiente[np.flatnonzero(serial)[~convertidas.isna()]] = False
+
+    # 5) Resto: inferencia valor por valor
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in np.flatnonzero(pendiente):
+            fechas[i] = pd.to_datetime(textos[i], errors="coerce", dayfirst=dayfirst)
+
+    return fechas.to_numpy()
+
+
+def a_fecha(serie: pd.Series, dayfirst: bool = False, formatos: tuple = None) -> pd.Series:
+    """
+    Convierte la columna a datetime64 (NaT si un valor no se puede interpretar).
+    `dayfirst` decide si "01/09/2025" es 1 de septiembre (True) o 9 de enero.
+    `formatos` reemplaza la lista de formatos explícitos que se prueban primero.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if formatos is None:
+        formatos = FORMATOS_ISO + (FORMATOS_DIA_PRIMERO if dayfirst else FORMATOS_MES_PRIMERO)
+
+    valores = por_valores_unicos(
+        serie,
+        lambda unicos: _fechas_unicas(unicos, formatos, dayfirst),
+        np.datetime64("NaT", "ns"),
+    )
+    return pd.Series(valores, index=serie.index, dtype="datetime64[ns]")
+
+
+def formatear_fecha(fechas: pd.Series, formato: str) -> pd.Series:
+    """`dt.strftime(formato)` calculado una vez por fecha distinta (NaT → NaN)."""
+    valores = por_valores_unicos(
+        fechas,
+        lambda unicos: pd.DatetimeIndex(unicos).strftime(formato).to_numpy(dtype=object),
+        np.nan,
+    )
+    return pd.Series(valores, index=fechas.index, dtype=object)
+
+
+# ===================================================================
+# Montos
+# ===================================================================
+
+def _montos_unicos(valores: np.ndarray) -> np.ndarray:
+    textos = pd.Series(valores, dtype=object).astype(str).str.strip()
+    cero = textos.isin(MARCADORES_MONTO_CERO)
+    # Una sola pasada: se quitan separadores de miles y espacios
+    limpios = textos.str.replace(r"[,\s]", "", regex=True)
+    montos = pd.to_numeric(limpios, errors="coerce").astype(float)
+    return montos.mask(cero, 0.0).to_numpy()
+
+
+def a_monto(serie: pd.Series) -> pd.Series:
+    """
+    Convierte montos como "1,234.56", "-643.61" o "--" (sin monto → 0) a float.
+    Los valores vacíos o que no son un número quedan como NaN.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+    valores = por_valores_unicos(serie, _montos_unicos, np.nan)
+    return pd.Series(valores, index=serie.index, dtype=float)
@@ -0,0 +1,52 @@
+"""
+dataframes.py
+-------------
+Utilidades compartidas para pasar DataFrames preparados entre etapas
+sin tener que volver a escribirlos y leerlos desde Excel.
+"""
+
+import pandas as pd
+
+
+def como_texto_excel(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replica en memoria el resultado de guardar un DataFrame preparado en Excel
+    y volver a leerlo con `pd.read_excel(..., dtype=str)`:
+      - los valores no nulos quedan como texto
+      - las celdas vacías ("" o NaN) quedan como NaN
+      - el índice se reinicia (0..n-1)
+
+    Así las integraciones reciben los datos con la misma forma que antes,
+    cuando releían los archivos desde disco. Las columnas categóricas se
+    conservan como categóricas (con categorías de texto).
+    """
+    out = df.reset_index(drop=True).copy()
+    out.columns = out.columns.map(str).str.strip()
+
+    for col in out.columns:
+        serie = out[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorica = _categorica_como_texto(serie)
+            if categorica is not None:
+                out[col] = categorica
+                continue
+        nulos = serie.isna()
+        texto = serie.astype(object).where(nulos, serie.astype(str))
+        out[col] = texto.mask(nulos | (texto == ""))
+
+    return out
+
+
+def _categorica_como_texto(serie: pd.Series):
+    """
+    Versión categórica de la conversión: renombra las categorías a texto y
+    quita la categoría "" (esas filas quedan como NaN). Devuelve None si dos
+    categorías distintas terminan con el mismo texto.
+    """
+    nombres = [str(c) for c in serie.cat.categories]
+    if len(set(nombres)) != len(nombres):
+        return None
+    serie = serie.cat.rename_categories(nombres)
+    if "" in nombres:
+        serie = serie.cat.remove_categories([""])
+    return serie
@@ -0,0 +1,94 @@
+"""
+normalizacion.py
+----------------
+Núcleo de normalización de texto para columnas de llaves y etiquetas.
+
+Cada columna se deduplica con `pd.factorize`: cada valor DISTINTO se
+normaliza una sola vez y el resultado se reparte a todas las filas por
+código. En columnas como Producto, Situacion o la póliza (con muchas filas
+repetidas) esto evita repetir el mismo strip / upper / split miles de veces.
+
+Operaciones disponibles (se combinan en `normalizar`):
+  - quitar espacios a los extremos
+  - pasar a mayúsculas
+  - quitar acentos ("Pacífico" → "Pacifico")
+  - quedarse con lo que sigue al último guion ("123-456" → "456")
+"""
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+def por_valores_unicos(serie: pd.Series, convertir, vacio):
+    """
+    Aplica `convertir` (array de valores distintos → array de resultados) una
+    vez por valor distinto y reparte a las filas. Los nulos reciben `vacio`.
+    Devuelve un array de numpy alineado con `serie`.
+    """
+    codigos, unicos = pd.factorize(serie)
+    resultados = np.asarray(convertir(np.asarray(unicos, dtype=object)))
+    if (codigos == -1).any():
+        resultados = np.append(resultados, np.array([vacio], dtype=resultados.dtype))
+    return resultados[codigos]
+
+
+def quitar_acentos(texto: str) -> str:
+    """Quita tildes y diéresis (la ñ también pasa a n)."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _normalizar_valor(valor, mayusculas: bool, sin_acentos: bool, sufijo_guion: bool) -> str:
+    texto = str(valor).strip()
+    if sufijo_guion:
+        texto = texto.split("-")[-1]
+    if mayusculas:
+        texto = texto.upper()
+    if sin_acentos:
+        texto = quitar_acentos(texto)
+    return texto
+
+
+def normalizar(
+    serie: pd.Series,
+    mayusculas: bool = False,
+    sin_acentos: bool = False,
+    sufijo_guion: bool = False,
+    nulos_como_texto: bool = False,
+) -> pd.Series:
+    """
+    Normaliza la columna como texto: siempre quita espacios a los extremos y,
+    según los parámetros, pasa a mayúsculas, quita acentos o se queda con lo
+    que sigue al último guion.
+
+    Con `nulos_como_texto` los nulos se tratan como el texto "nan" (igual que
+    `astype(str)`); si no, quedan como NaN.
+    """
+    def convertir(unicos):
+        return np.array(
+            [_normalizar_valor(v, mayusculas, sin_acentos, sufijo_guion) for v in unicos],
+            dtype=object,
+        )
+
+    vacio = _normalizar_valor(np.nan, mayusculas, sin_acentos, sufijo_guion) if nulos_como_texto else np.nan
+    return pd.Series(por_valores_unicos(serie, convertir, vacio), index=serie.index, dtype=object)
+
+
+def clave_texto(serie: pd.Series) -> pd.Series:
+    """Llave de póliza: equivale a `astype(str).str.strip()` (los nulos quedan como "nan")."""
+    return normalizar(serie, nulos_como_texto=True)
+
+
+def sufijo_tras_guion(serie: pd.Series) -> pd.Series:
+    """Parte después del último guion ("AB-123" → "123"); sin guion, el valor tal cual."""
+    return normalizar(serie, sufijo_guion=True, nulos_como_texto=True)
+
+
+def quitar_espacios(serie: pd.Series) -> pd.Series:
+    """Quita espacios a los extremos solo de los textos; el resto de valores no cambia."""
+    def convertir(unicos):
+        return np.array([v.strip() if isinstance(v, str) else v for v in unicos], dtype=object)
+
+    return pd.Series(por_valores_unicos(serie, convertir, np.nan), index=serie.index, dtype=object)
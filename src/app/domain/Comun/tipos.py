@@ -0,0 +1,75 @@
+"""
+tipos.py
+--------
+Plan de tipos de dato basado en MAPEO["Columnas_Categoricas"].
+
+Las columnas de baja cardinalidad (Linea de Negocio, Producto, Situacion,
+CATEGORÍA, Responsable, STATUS RENOVACION, Observaciones, DentroRango, ...)
+se convierten a `category`: cada valor distinto se guarda una sola vez y las
+filas solo guardan un código entero. Las reglas que trabajan sobre texto
+usan `por_categoria()` para evaluar cada categoría una vez y repartir el
+resultado por código.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.app.repository.mapping_repository import MAPEO
+
+PLAN_CATEGORICAS = MAPEO.get("Columnas_Categoricas", {})
+
+
+def es_categorica(serie: pd.Series) -> bool:
+    return isinstance(serie.dtype, pd.CategoricalDtype)
+
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    """Memoria ocupada por el DataFrame (incluye el contenido de los textos), en MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def aplicar_plan_tipos(df: pd.DataFrame, fuente: str) -> pd.DataFrame:
+    """
+    Convierte a `category` las columnas del plan de la fuente indicada
+    (las que existan en el DataFrame) e informa la memoria antes y después.
+    Modifica y devuelve el mismo DataFrame.
+    """
+    columnas = [
+        c for c in PLAN_CATEGORICAS.get(fuente, [])
+        if c in df.columns and not es_categorica(df[c])
+    ]
+    if not columnas:
+        return df
+
+    antes = memoria_mb(df)
+    for col in columnas:
+        df[col] = df[col].astype("category")
+    despues = memoria_mb(df)
+
+    print(
+        f"[MEMORIA] {fuente}: {antes:.2f} MB → {despues:.2f} MB "
+        f"({len(columnas)} columnas categóricas)"
+    )
+    return df
+
+
+def por_categoria(serie: pd.Series, funcion) -> pd.Series:
+    """
+    Aplica `funcion` (Series → Series) a una columna. Si la columna es
+    categórica, la función se evalúa solo sobre sus categorías (más un NaN
+    para los nulos) y el resultado se reparte a las filas por código.
+    """
+    if not es_categorica(serie):
+        return funcion(serie)
+
+    dominio = pd.Series(list(serie.cat.categories) + [np.nan], dtype=object)
+    resultado = funcion(dominio).to_numpy()
+    # El código -1 (nulo) apunta al último elemento: el resultado del NaN
+    return pd.Series(resultado[serie.cat.codes.to_numpy()], index=serie.index)
+
+
+def rellenar_nulos(serie: pd.Series, valor) -> pd.Series:
+    """`fillna(valor)` que también funciona en columnas categóricas sin esa categoría."""
+    if es_categorica(serie) and valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    return serie.fillna(valor)
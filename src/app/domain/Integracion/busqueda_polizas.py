@@ -0,0 +1,71 @@
+"""
+busqueda_polizas.py
+-------------------
+Búsqueda de Fin Vig (SICS) y STATUS RENOVACION (SharePoint) por póliza.
+
+Las integraciones reciben SICS y SharePoint como DataFrame preparado o, si
+el índice de pólizas está vigente, como IndicePolizas (ver
+repository/indice_polizas_repository.py). Las funciones de este módulo
+ocultan esa diferencia:
+
+  - `fuente_de_polizas` normaliza el DataFrame (texto como en Excel y llaves
+    Pacifico / Rimac con clave_texto); el índice se usa tal cual.
+  - `buscar_por_poliza` resuelve el valor de cada llave: con un DataFrame,
+    con la primera fila de cada póliza (drop_duplicates + map); con el
+    índice, con una consulta por lote. `buscador_por_poliza` hace lo mismo
+    para varios lotes sobre la misma fuente.
+  - `indexar_fuente` guarda en el índice el resultado de una preparación.
+"""
+
+import pandas as pd
+
+from src.app.domain.Comun.dataframes import como_texto_excel
+from src.app.domain.Comun.normalizacion import clave_texto
+from src.app.repository.indice_polizas_repository import IndicePolizas, actualizar_indice
+
+# Llaves de póliza por las que se busca en SICS y SharePoint
+SISTEMAS = ("Pacifico", "Rimac")
+
+
+def fuente_de_polizas(fuente):
+    """DataFrame de SICS / SharePoint listo para buscar por póliza (el índice no cambia)."""
+    if isinstance(fuente, IndicePolizas):
+        return fuente
+    df = como_texto_excel(fuente)
+    for sistema in SISTEMAS:
+        if sistema in df.columns:
+            df[sistema] = clave_texto(df[sistema])
+    return df
+
+
+def valores_por_poliza(df: pd.DataFrame, sistema: str, columna: str) -> pd.Series:
+    """Series llave -> valor con la primera fila de cada póliza."""
+    return df.drop_duplicates(sistema).set_index(sistema)[columna]
+
+
+def buscar_por_poliza(fuente, sistema: str, columna: str, llaves: pd.Series) -> pd.Series:
+    """Valor de `columna` para cada llave de `llaves` (NaN si la póliza no está)."""
+    return buscador_por_poliza(fuente, sistema, columna)(llaves)
+
+
+def buscador_por_poliza(fuente, sistema: str, columna: str):
+    """
+    Función llaves -> valores para buscar varias veces en la misma fuente
+    (p. ej. bloque a bloque): con un DataFrame, la Series llave -> valor se
+    arma una sola vez.
+    """
+    if isinstance(fuente, IndicePolizas):
+        return lambda llaves: fuente.buscar(sistema, llaves)
+    valores = valores_por_poliza(fuente, sistema, columna)
+    return lambda llaves: llaves.map(valores)
+
+
+def indexar_fuente(nombre: str, clave: str, df: pd.DataFrame, columna: str) -> None:
+    """Actualiza el índice de pólizas con el DataFrame preparado de la fuente."""
+    df = fuente_de_polizas(df)
+    faltantes = [c for c in (*SISTEMAS, columna) if c not in df.columns]
+    if faltantes:
+        print(f"[WARN] '{nombre}': faltan columnas {faltantes}, no se actualiza el índice de pólizas")
+        return
+    valores = {sistema: valores_por_poliza(df, sistema, columna).astype(object) for sistema in SISTEMAS}
+    actualizar_indice(nombre, clave, columna, valores, len(df))
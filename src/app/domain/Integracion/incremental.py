@@ -0,0 +1,222 @@
+"""
+incremental.py
+--------------
+Integración incremental: recalcula solo las pólizas que cambiaron.
+
+Entre dos ejecuciones diarias casi todas las pólizas de las bases Rimac y
+Pacífico son iguales. En modo incremental (ver incremental_repository.py):
+
+  1. Se calcula una huella por póliza con sus filas de origen y los valores
+     SICS / Tablero (y Anulados) que les tocaron en el match. La huella tiene
+     en cuenta el orden de las filas dentro de la póliza.
+  2. El contexto (ventana de meses de DentroRango, secciones de MAPEO y
+     versión de las reglas) tiene su propia clave: si cambia, se recalcula todo.
+  3. Solo las pólizas nuevas o con huella distinta pasan por Responsable, OBS,
+     Observaciones y DentroRango; el resto se copia del resultado anterior.
+  4. El delta compara la salida por póliza con la ejecución anterior y marca
+     cada póliza como NUEVA, MODIFICADA o ELIMINADA.
+
+Se recalculan siempre pólizas completas (todas sus filas), así que las reglas
+por grupo de póliza (reconciliar_duplicados_pacifico) dan el mismo resultado
+que un cálculo completo.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.app.repository.incremental_repository import cargar_estado, guardar_estado
+
+# Subir este número cuando cambien las reglas de la integración: invalida los estados guardados
+VERSION_INCREMENTAL = 1
+
+COLUMNA_CAMBIO = "Cambio"
+
+# Llave para las filas sin número de póliza (se tratan como un solo grupo)
+_SIN_POLIZA = "\x00sin poliza"
+
+
+@dataclass
+class PlanIncremental:
+    """Qué filas recalcular y con qué resultado anterior combinar las demás."""
+    nombre: str
+    llave: str                      # columna de póliza (presente en la entrada y en la salida)
+    clave: str                      # huella del contexto
+    huellas: pd.Series              # póliza -> huella de entrada (uint64)
+    recalcular: np.ndarray          # máscara por fila de la base
+    previo: pd.DataFrame = None     # resultado anterior (None si se recalcula todo)
+    posiciones_previas: np.ndarray = None   # fila del resultado anterior para cada fila reutilizada
+    salida_previa: pd.Series = None         # póliza -> huella de salida anterior
+
+    @property
+    def recalculadas(self) -> int:
+        return int(self.recalcular.sum())
+
+
+# ===================================================================
+# Huellas
+# ===================================================================
+
+def _llaves(serie: pd.Series) -> pd.Series:
+    return serie.astype(object).where(serie.notna(), _SIN_POLIZA)
+
+
+def huellas_por_poliza(df: pd.DataFrame, llave: str, columnas: list) -> pd.Series:
+    """
+    Huella (uint64) de las filas de cada póliza en `columnas`, sensible al
+    orden de las filas dentro de la póliza. Devuelve Series póliza -> huella.
+    """
+    llaves = _llaves(df[llave])
+    if df.empty:
+        return pd.Series(dtype="uint64")
+    por_fila = pd.util.hash_pandas_object(df[columnas], index=False).to_numpy()
+    orden = llaves.groupby(llaves, sort=False).cumcount().to_numpy()
+    con_orden = pd.util.hash_pandas_object(
+        pd.DataFrame({"fila": por_fila, "orden": orden}), index=False
+    ).to_numpy()
+    # Suma módulo 2**64 por póliza (el orden ya está incluido en cada término)
+    with np.errstate(over="ignore"):
+        return pd.Series(con_orden, index=llaves.to_numpy()).groupby(level=0, sort=False).sum()
+
+
+def _clave_contexto(contexto: dict, columnas: list) -> str:
+    texto = json.dumps(
+        {"version": VERSION_INCREMENTAL, "columnas": list(columnas), "contexto": contexto},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _cambiadas(actuales: pd.Series, previas: pd.Series) -> pd.Index:
+    """Pólizas nuevas o con huella distinta a la anterior."""
+    nuevas = ~actuales.index.isin(previas.index)
+    comunes = actuales.index[~nuevas]
+    distintas = actuales.loc[comunes].to_numpy() != previas.loc[comunes].to_numpy()
+    return actuales.index[nuevas].append(comunes[distintas])
+
+
+def _posiciones(llaves: pd.Series) -> pd.MultiIndex:
+    """(póliza, número de fila dentro de la póliza) de cada fila."""
+    orden = llaves.groupby(llaves, sort=False).cumcount()
+    return pd.MultiIndex.from_arrays([llaves.to_numpy(), orden.to_numpy()])
+
+
+# ===================================================================
+# Plan, combinación y delta
+# ===================================================================
+
+def planificar_incremental(nombre: str, base: pd.DataFrame, llave: str, columnas: list, contexto: dict) -> PlanIncremental:
+    """
+    Compara las huellas de `base` con las de la ejecución anterior de la
+    integración `nombre` y decide qué filas recalcular.
+    """
+    clave = _clave_contexto(contexto, columnas)
+    huellas = huellas_por_poliza(base, llave, columnas)
+    todo = np.ones(len(base), dtype=bool)
+
+    estado = cargar_estado(nombre)
+    if estado is None:
+        print("[INCREMENTAL] Sin ejecución anterior: se calculan todas las pólizas")
+        return PlanIncremental(nombre, llave, clave, huellas, todo)
+
+    previo = estado["resultado"]
+    salida_previa = estado["huellas_salida"]
+    if estado.get("clave") != clave:
+        print("[INCREMENTAL] Cambió la ventana de fechas, el MAPEO o las reglas: se recalculan todas las pólizas")
+        return PlanIncremental(nombre, llave, clave, huellas, todo, previo=previo, salida_previa=salida_previa)
+
+    llaves = _llaves(base[llave])
+    recalcular = llaves.isin(_cambiadas(huellas, estado["huellas_entrada"])).to_numpy()
+
+    # Filas reutilizadas: misma póliza y misma posición dentro de la póliza
+    posiciones = _posiciones(_llaves(previo[llave])).get_indexer(_posiciones(llaves)[~recalcular])
+    if (posiciones < 0).any():
+        # No debería ocurrir con huellas iguales; por seguridad se recalculan esas pólizas
+        faltantes = llaves[~recalcular].iloc[np.flatnonzero(posiciones < 0)].unique()
+        recalcular |= llaves.isin(faltantes).to_numpy()
+        posiciones = _posiciones(_llaves(previo[llave])).get_indexer(_posiciones(llaves)[~recalcular])
+
+    plan = PlanIncremental(
+        nombre, llave, clave, huellas, recalcular,
+        previo=previo, posiciones_previas=posiciones, salida_previa=salida_previa,
+    )
+    print(
+        f"[INCREMENTAL] Pólizas: {len(huellas)} | sin cambios: {len(huellas) - llaves[recalcular].nunique()}"
+        f" | a recalcular: {llaves[recalcular].nunique()} ({plan.recalculadas} filas)"
+    )
+    return plan
+
+
+def combinar_incremental(plan: PlanIncremental, base: pd.DataFrame, calculado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Une las filas recalculadas (`calculado`, solo las filas marcadas en el plan)
+    con las copiadas del resultado anterior, en el orden de `base`.
+    """
+    if plan.recalcular.all():
+        return calculado
+
+    reutilizado = plan.previo.iloc[plan.posiciones_previas][list(calculado.columns)]
+    combinado = pd.concat(
+        [
+            reutilizado.set_axis(np.flatnonzero(~plan.recalcular)),
+            calculado.set_axis(np.flatnonzero(plan.recalcular)),
+        ]
+    ).sort_index()
+    # Las categóricas del resultado anterior vuelven a texto (el plan de tipos se aplica después)
+    for col in combinado.columns:
+        if isinstance(combinado[col].dtype, pd.CategoricalDtype):
+            combinado[col] = combinado[col].astype(object)
+    return combinado.set_axis(base.index)
+
+
+def delta_incremental(plan: PlanIncremental, resultado: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filas de las pólizas cuya salida cambió respecto de la ejecución anterior,
+    con la columna COLUMNA_CAMBIO: NUEVA / MODIFICADA (filas actuales) o
+    ELIMINADA (filas anteriores de pólizas que ya no están).
+    """
+    columnas = list(resultado.columns)
+    salida = huellas_por_poliza(resultado, plan.llave, columnas)
+    llaves = _llaves(resultado[plan.llave])
+
+    if plan.salida_previa is None:
+        cambio = pd.Series("NUEVA", index=salida.index)
+        eliminadas = pd.Index([])
+    else:
+        cambiadas = _cambiadas(salida, plan.salida_previa)
+        nuevas = ~cambiadas.isin(plan.salida_previa.index)
+        cambio = pd.Series(np.where(nuevas, "NUEVA", "MODIFICADA"), index=cambiadas)
+        eliminadas = plan.salida_previa.index.difference(salida.index)
+
+    actuales = resultado[llaves.isin(cambio.index).to_numpy()].copy()
+    actuales[COLUMNA_CAMBIO] = _llaves(actuales[plan.llave]).map(cambio).to_numpy()
+    partes = [actuales]
+    if len(eliminadas) and plan.previo is not None:
+        previas = plan.previo[_llaves(plan.previo[plan.llave]).isin(eliminadas).to_numpy()]
+        previas = previas.reindex(columns=columnas).copy()
+        previas[COLUMNA_CAMBIO] = "ELIMINADA"
+        partes.append(previas)
+
+    delta = pd.concat(partes, ignore_index=True) if len(partes) > 1 else actuales.reset_index(drop=True)
+    resumen = delta[COLUMNA_CAMBIO].value_counts() if not delta.empty else {}
+    print(
+        f"[INCREMENTAL] Delta: {len(delta)} filas"
+        f" | nuevas: {int(resumen.get('NUEVA', 0))} filas"
+        f" | modificadas: {int(resumen.get('MODIFICADA', 0))} filas"
+        f" | eliminadas: {int(resumen.get('ELIMINADA', 0))} filas"
+    )
+    return delta
+
+
+def guardar_incremental(plan: PlanIncremental, resultado: pd.DataFrame) -> None:
+    """Guarda resultado y huellas para la próxima ejecución incremental."""
+    guardar_estado(plan.nombre, {
+        "version": VERSION_INCREMENTAL,
+        "clave": plan.clave,
+        "huellas_entrada": plan.huellas,
+        "huellas_salida": huellas_por_poliza(resultado, plan.llave, list(resultado.columns)),
+        "resultado": resultado,
+    })
@@ -1,8 +1,8 @@
 # integracion_pacifico.py
 
 import sys
-import warnings
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
@@ -15,14 +15,34 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from src.app.repository.configuration_repository import (
-    get_sics_file,
-    get_sharepoint_file,
-    get_pacifico_file,
+    get_anulados_preparado_file,
     OUTPUT_PACIFICO_INTEGRADO,
-    OUTPUT_PACIFICO_ANULADO,    # carpeta donde deja el anulados limpio
-    get_latest_file             # para leer el último anulados preparado
 )
+from src.app.repository.bloques_repository import AlmacenBloques, BaseEnBloques, ControlMemoria
+from src.app.repository.intermedio_repository import leer_intermedio
 from src.app.repository.mapping_repository import MAPEO
+from src.app.domain.Comun.dataframes import como_texto_excel
+from src.app.domain.Comun.normalizacion import clave_texto
+from src.app.domain.Comun.tipos import aplicar_plan_tipos, rellenar_nulos
+from src.app.domain.Integracion.busqueda_polizas import buscador_por_poliza, fuente_de_polizas
+from src.app.repository.incremental_repository import incremental_activo
+from src.app.repository.reporte_repository import escribir_libro, escribir_reporte, escribir_reporte_por_bloques
+from src.app.domain.Integracion.incremental import (
+    combinar_incremental,
+    delta_incremental,
+    guardar_incremental,
+    planificar_incremental,
+)
+from src.app.domain.Integracion.reglas import (
+    aplicar_estado_duplicados,
+    calc_obs_pacifico_vectorizado,
+    combinar_estados_duplicados,
+    dentro_rango_pacifico,
+    estado_duplicados_pacifico,
+    reconciliar_duplicados_pacifico,
+    VentanaRango,
+)
+from src.app.domain.Integracion.responsables import asignar_responsables_pacifico
 
 from src.app.domain.Basicos.sics import preparar_sics
 from src.app.domain.Basicos.sharepoint import preparar_sharepoint
@@ -31,159 +51,261 @@ from src.app.domain.Basicos.anulados import preparar_anulados
 
 
 # ===================================================================
-# 1. Utilidades
+# Proceso principal de integración Pacífico
 # ===================================================================
 
-def leer_excel(path: Path) -> pd.DataFrame:
-    """Lee un Excel con engine según extensión, retornando todo como texto."""
-    ext = path.suffix.lower()
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        if ext == ".xls":
-            return pd.read_excel(path, dtype=str, engine="xlrd")
-        else:
-            return pd.read_excel(path, dtype=str, engine="openpyxl")
-
-
-# ---------- Asignación de responsable Pacífico ----------
-
-_RESP_PAC_ENTRIES = MAPEO.get("Responsables_Pacifico", [])
-
-_RESP_PAC_MAP = {
-    (
-        str(item.get("Linea", "")).strip().upper(),
-        str(item.get("Producto", "")).strip().upper(),
-    ): str(item.get("Responsable", "")).strip()
-    for item in _RESP_PAC_ENTRIES
-}
-
-
-def asignar_responsable_pacifico(linea: str, producto: str) -> str:
-    """Devuelve el responsable según (Linea de Negocio, Producto)."""
-    key = (str(linea).strip().upper(), str(producto).strip().upper())
-    return _RESP_PAC_MAP.get(key, "")
-
-
-# ---------- Cálculo de OBS Pacífico ----------
-
-def calc_obs_pacifico(fin_vigencia, sics_val, tablero_val) -> int:
+def _preparar_fuentes_pacifico():
     """
-    Lógica OBS Pacífico:
-
-      1 -> SICS y Tablero = 'No Encontrado' (o vacío/nan)
-      3 -> SICS(YYYY-MM) >= FinVigencia(YYYY-MM)
-      2 -> resto de casos
-
-    Se inspira en la fórmula de Excel:
-        =SI(G30>=TEXTO(M30;"YYYY-MM");3;2)
-    con el caso especial 1 igual que en Rimac.
+    Flujo autónomo: ejecuta las preparaciones y usa sus DataFrames en memoria.
+    Devuelve (sics_df, share_df, pac_df, anul_df) o None si alguna etapa falla.
+    `anul_df` puede ser None (se intenta leer el último Anulados preparado).
     """
-    s = str(sics_val).strip() if pd.notna(sics_val) else ""
-    t = str(tablero_val).strip() if pd.notna(tablero_val) else ""
-    fv = str(fin_vigencia).strip() if pd.notna(fin_vigencia) else ""
-
-    def es_no_encontrado(x: str) -> bool:
-        xl = x.lower()
-        return xl in ("", "no encontrado", "nan")
-
-    # 1️⃣ No está en SICS ni en Tablero
-    if es_no_encontrado(s) and es_no_encontrado(t):
-        return 1
-
-    # 2️⃣ Si no hay SICS, no se puede comparar: se considera 2
-    if es_no_encontrado(s):
-        return 2
-
-    # 3️⃣ Comparar YYYY-MM entre SICS y Fin de Vigencia
-    s_ym = s[:7]  # asume 'YYYY-MM' o 'YYYY-MM-DD'
-    fv_ym = fv[:7]
-
-    try:
-        if s_ym and fv_ym and s_ym >= fv_ym:
-            return 3
-        return 2
-    except Exception:
-        return 2
-
-
-# ===================================================================
-# 2. Proceso principal de integración Pacífico
-# ===================================================================
-
-def integracion_pacifico():
-    print("\n" + "=" * 70)
-    print("[INICIO] Proceso Completo de Integración Pacífico")
-    print("=" * 70)
-
     # ---------------------------------------------------------------
-    # Paso 0: Preparaciones (SICS, SharePoint, Pacífico)
+    # Paso 0: Preparaciones (SICS, SharePoint, Pacífico, Anulados)
     # ---------------------------------------------------------------
-    print("\n[ETAPA 1/4] Preparación de datos SICS")
+    print("\n[ETAPA 1/5] Preparación de datos SICS")
     print("-" * 70)
     try:
-        preparar_sics()
+        sics_df = preparar_sics()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de SICS: {e}")
-        return
+        return None
 
-    print("\n[ETAPA 2/4] Preparación de datos SharePoint")
+    print("\n[ETAPA 2/5] Preparación de datos SharePoint")
     print("-" * 70)
     try:
-        preparar_sharepoint()
+        share_df = preparar_sharepoint()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de SharePoint: {e}")
-        return
+        return None
 
     print("\n[ETAPA 3/5] Preparación de datos Pacífico")
     print("-" * 70)
     try:
-        preparar_pacifico()
+        pac_df = preparar_pacifico()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de Pacífico: {e}")
-        return
+        return None
 
     print("\n[ETAPA 4/5] Preparación de Anulados")
     print("-" * 70)
     try:
-        preparar_anulados()
+        anul_df = preparar_anulados()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de Anulados: {e}")
-        return
+        return None
+
+    if sics_df is None or share_df is None or pac_df is None or pac_df.empty:
+        print("[ERROR] No se pudieron preparar todas las fuentes (SICS, SharePoint, Pacífico).")
+        return None
 
     # ---------------------------------------------------------------
-    # Paso 1: Localizar archivos preparados
+    # Paso 1: Integración con los datos preparados
     # ---------------------------------------------------------------
     print("\n[ETAPA 5/5] Integración y Match de datos Pacífico")
     print("-" * 70)
 
+    return sics_df, share_df, pac_df, anul_df
+
+
+# Columnas de la base que pasan a la integración
+BASE_COLS = [
+    "Contratante",
+    "Nro de Documento",
+    "Linea de Negocio",
+    "Producto",
+    "Nro de Poliza/Contrato",
+    "Fin de Vigencia",
+    "Situacion",
+    "Pacifico",
+]
+
+# Columnas finales del reporte
+COLS_FINAL = [
+    "Contratante",
+    "Nro de Documento",
+    "Linea de Negocio",
+    "Producto",
+    "Nro de Poliza/Contrato",
+    "SICS",
+    "Tablero",
+    "Observaciones",
+    "Responsable",
+    "Fin de Vigencia",
+    "Situacion",
+    "OBS",
+    "DentroRango",
+    "Polizas Anulada",
+]
+
+
+@dataclass(frozen=True)
+class ReportePorBloques:
+    """Resultado de la integración por bloques: el reporte escrito, sin el DataFrame en memoria."""
+    ruta: Path
+    filas: int
+    en_rango: int
+    columns: tuple = tuple(COLS_FINAL)
+
+    def __len__(self) -> int:
+        return self.filas
+
+    @property
+    def empty(self) -> bool:
+        return self.filas == 0
+
+
+def _mapa_anulados(anul_df):
+    """
+    Series póliza -> Situacion de los Anulados (preparados en memoria o el
+    último archivo preparado), o None si no se pueden integrar.
+    """
     try:
-        path_sics = get_sics_file()
-        path_sharepoint = get_sharepoint_file()
-        path_pacifico = get_pacifico_file()
-        print("[OK] Archivos detectados:")
-        print(f"   SICS       → {path_sics.name}")
-        print(f"   SharePoint → {path_sharepoint.name}")
-        print(f"   Pacífico   → {path_pacifico.name}")
-    except Exception as e:
-        print(f"[ERROR] Localizando archivos: {e}")
-        return
+        if anul_df is None:
+            anulados_path = get_anulados_preparado_file()
+            print(f"[INFO] Integrando Anulados desde: {anulados_path.name}")
+            anul_df = como_texto_excel(leer_intermedio(anulados_path))
+        else:
+            print("[INFO] Integrando Anulados preparados en memoria")
+            anul_df = como_texto_excel(anul_df)
+        anul_df.columns = anul_df.columns.map(str).str.strip()
 
-    # ---------------------------------------------------------------
-    # Paso 2: Lectura de Excels
-    # ---------------------------------------------------------------
-    try:
-        sics_df = leer_excel(path_sics)
-        share_df = leer_excel(path_sharepoint)
-        pac_df = leer_excel(path_pacifico)
+        if "Nro de Poliza/Contrato" in anul_df.columns and "Situacion" in anul_df.columns:
+            anul_df["Nro de Poliza/Contrato"] = clave_texto(anul_df["Nro de Poliza/Contrato"])
+            anul_df["Situacion"] = clave_texto(anul_df["Situacion"])
+
+            return (
+                anul_df.dropna(subset=["Nro de Poliza/Contrato"])
+                .drop_duplicates("Nro de Poliza/Contrato", keep="last")
+                .set_index("Nro de Poliza/Contrato")["Situacion"]
+            )
+        print("[WARN] El archivo de Anulados no contiene las columnas esperadas.")
+    except FileNotFoundError:
+        print("[WARN] No se encontró archivo de Anulados preparado. 'Polizas Anulada' quedará vacía.")
     except Exception as e:
-        print(f"[ERROR] Leyendo Excels: {e}")
-        return
+        print(f"[WARN] Error integrando Anulados: {e}")
+    return None
 
-    print(f"[INFO] Filas: SICS={len(sics_df)} | SharePoint={len(share_df)} | Pacífico={len(pac_df)}")
 
-    # Normalizar nombres de columnas
-    for df in (sics_df, share_df, pac_df):
-        df.columns = df.columns.map(str).str.strip()
+class _Cruce:
+    """Búsquedas en SICS, SharePoint y Anulados (pasos 5 y 6), preparadas una vez."""
+
+    def __init__(self, sics_df, share_df, anul_df):
+        self.sics = None
+        if "Pacifico" in sics_df.columns and "Fin Vig" in sics_df.columns:
+            self.sics = buscador_por_poliza(sics_df, "Pacifico", "Fin Vig")
+        self.share = None
+        if "Pacifico" in share_df.columns and "STATUS RENOVACION" in share_df.columns:
+            self.share = buscador_por_poliza(share_df, "Pacifico", "STATUS RENOVACION")
+        self.anulados = _mapa_anulados(anul_df)
+
+    def base(self, pac_df: pd.DataFrame) -> pd.DataFrame:
+        """Pasos 4 a 6 sobre la base Pacífico (o un bloque de ella) ya convertida con como_texto_excel."""
+        pac_df["Pacifico"] = clave_texto(pac_df["Nro de Poliza/Contrato"])
+        base = pac_df[BASE_COLS].copy()
+
+        if self.sics is not None:
+            base["SICS"] = rellenar_nulos(self.sics(base["Pacifico"]), "No Encontrado")
+        else:
+            base["SICS"] = "No Encontrado"
+
+        if self.share is not None:
+            base["Tablero"] = rellenar_nulos(self.share(base["Pacifico"]), "No Encontrado")
+        else:
+            base["Tablero"] = "No Encontrado"
+
+        if self.anulados is not None:
+            base["Polizas Anulada"] = base["Nro de Poliza/Contrato"].map(self.anulados).fillna("")
+        else:
+            base["Polizas Anulada"] = ""
+        return base
+
+
+def _aplicar_reglas(base: pd.DataFrame, ventana: VentanaRango) -> pd.DataFrame:
+    """Paso 7: Responsable, OBS, Observaciones y DentroRango."""
+    base["Responsable"] = asignar_responsables_pacifico(base["Linea de Negocio"], base["Producto"])
+
+    # OBS por columnas (reglas.calc_obs_pacifico queda como referencia fila a fila)
+    base["OBS"] = calc_obs_pacifico_vectorizado(base["Fin de Vigencia"], base["SICS"], base["Tablero"])
+
+    comentarios_pac = MAPEO.get("Comentario_Pacifico", {})
+    base["Observaciones"] = base["OBS"].map(comentarios_pac).fillna("")
+
+    # DentroRango: reglas de Situacion, año de Fin de Vigencia y ventana de meses
+    # evaluadas como máscaras sobre columnas completas
+    base["DentroRango"] = dentro_rango_pacifico(
+        base["SICS"],
+        base["Tablero"],
+        base["Responsable"],
+        base["Situacion"],
+        base["Fin de Vigencia"],
+        ventana,
+    )
+    return base
+
+
+def _columnas_finales(base: pd.DataFrame) -> pd.DataFrame:
+    # Aseguramos que todas existan
+    for col in COLS_FINAL:
+        if col not in base.columns:
+            base[col] = ""
+    return base.reindex(columns=COLS_FINAL)
+
+
+def _imprimir_resumen(total: int, en_rango: int, output_path: Path) -> None:
+    print("\n" + "=" * 70)
+    print("[RESUMEN FINAL] Integración Pacífico Completada")
+    print("=" * 70)
+    print(f"  Total de pólizas procesadas: {total}")
+    print(f"  Pólizas en rango de vigencia: {en_rango}")
+    print(f"  Pólizas fuera de rango: {total - en_rango}")
+    print(f"  Archivo generado: {output_path.name}")
+    print("=" * 70)
+    print("✅ Proceso completo Pacífico finalizado exitosamente.\n")
+
+
+def _ruta_reporte() -> Path:
+    OUTPUT_PACIFICO_INTEGRADO.mkdir(parents=True, exist_ok=True)
+    return OUTPUT_PACIFICO_INTEGRADO / f"Reporte-polizas_Pacifico_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+
+
+def integracion_pacifico(sics_df=None, share_df=None, pac_df=None, anul_df=None):
+    """
+    Ejecuta el proceso completo de integración Pacífico.
+
+    Si se reciben los DataFrames ya preparados (SICS, SharePoint y Base
+    Pacífico), se usan directamente en memoria; si no, se ejecutan antes las
+    preparaciones. `anul_df` es opcional: si no se entrega, los Anulados se
+    leen desde el último archivo preparado en OUTPUT_PACIFICO_ANULADO.
+
+    En modo incremental (ver incremental.py) solo se recalculan las pólizas
+    que cambiaron desde la ejecución anterior y el reporte lleva además la
+    hoja "Delta" con las pólizas nuevas, modificadas y eliminadas.
+
+    Si la base Pacífico llega por bloques (BaseEnBloques, ver
+    bloques_repository.py), se integra bloque a bloque con memoria acotada
+    (ver _integrar_por_bloques) y se devuelve un ReportePorBloques.
+    """
+    print("\n" + "=" * 70)
+    print("[INICIO] Proceso Completo de Integración Pacífico")
+    print("=" * 70)
+
+    if sics_df is None or share_df is None or pac_df is None:
+        fuentes = _preparar_fuentes_pacifico()
+        if fuentes is None:
+            return
+        sics_df, share_df, pac_df, anul_df = fuentes
+    else:
+        print("[INFO] Usando datos preparados en memoria (SICS, SharePoint, Pacífico)")
+
+    # SICS y SharePoint pueden llegar como índice de pólizas (ver busqueda_polizas.py)
+    sics_df = fuente_de_polizas(sics_df)
+    share_df = fuente_de_polizas(share_df)
+    por_bloques = isinstance(pac_df, BaseEnBloques)
+    if not por_bloques:
+        pac_df = como_texto_excel(pac_df)
+
+    print(f"[INFO] Filas: SICS={len(sics_df)} | SharePoint={len(share_df)} | Pacífico={len(pac_df)}")
 
     # ---------------------------------------------------------------
     # Paso 3: Validación mínima de columnas
@@ -200,9 +322,12 @@ def integracion_pacifico():
         "Situacion",
     ]
 
+    # Normalizar nombres de columnas
+    columnas_pac = [str(c).strip() for c in pac_df.columns]
+
     falt_sics = [c for c in req_sics if c not in sics_df.columns]
     falt_share = [c for c in req_share if c not in share_df.columns]
-    falt_pac = [c for c in req_pac if c not in pac_df.columns]
+    falt_pac = [c for c in req_pac if c not in columnas_pac]
 
     if falt_sics:
         print(f"[WARN] SICS: faltan columnas {falt_sics}")
@@ -212,240 +337,146 @@ def integracion_pacifico():
         print(f"[WARN] Base Pacífico: faltan columnas {falt_pac}")
 
     # ---------------------------------------------------------------
-    # Paso 4: Normalización de llaves y columnas base
+    # Pasos 4 a 6: llaves, match con SICS / SharePoint y Anulados
     # ---------------------------------------------------------------
-    pac_df["Pacifico"] = pac_df["Nro de Poliza/Contrato"].astype(str).str.strip()
+    # (las llaves de SICS y SharePoint ya vienen normalizadas por fuente_de_polizas)
+    cruce = _Cruce(sics_df, share_df, anul_df)
+    ventana = VentanaRango.desde(datetime.today())
 
-    if "Pacifico" in sics_df.columns:
-        sics_df["Pacifico"] = sics_df["Pacifico"].astype(str).str.strip()
-    if "Pacifico" in share_df.columns:
-        share_df["Pacifico"] = share_df["Pacifico"].astype(str).str.strip()
+    if por_bloques:
+        return _integrar_por_bloques(pac_df, cruce, ventana)
 
-    base_cols = [
-        "Contratante",
-        "Nro de Documento",
-        "Linea de Negocio",
-        "Producto",
-        "Nro de Poliza/Contrato",
-        "Fin de Vigencia",
-        "Situacion",
-        "Pacifico",
-    ]
-    base = pac_df[base_cols].copy()
-
-    # ---------------------------------------------------------------
-    # Paso 5: Match con SICS y SharePoint
-    # ---------------------------------------------------------------
     print("[INFO] Realizando match Pacífico ↔ SICS/SharePoint...")
+    base = cruce.base(pac_df)
+    print("[OK] Match completado")
 
-    if "Pacifico" in sics_df.columns and "Fin Vig" in sics_df.columns:
-        sics_map = sics_df.dropna(subset=["Pacifico"]).drop_duplicates("Pacifico").set_index("Pacifico")["Fin Vig"]
-        base["SICS"] = base["Pacifico"].map(sics_map).fillna("No Encontrado")
-    else:
-        base["SICS"] = "No Encontrado"
-
-    if "Pacifico" in share_df.columns and "STATUS RENOVACION" in share_df.columns:
-        shp_map = (
-            share_df.dropna(subset=["Pacifico"])
-            .drop_duplicates("Pacifico")
-            .set_index("Pacifico")["STATUS RENOVACION"]
+    # Modo incremental: solo las pólizas que cambiaron pasan por los pasos 7 y 8
+    plan = None
+    base_completa = base
+    if incremental_activo():
+        plan = planificar_incremental(
+            "integracion_pacifico",
+            base,
+            "Nro de Poliza/Contrato",
+            BASE_COLS + ["SICS", "Tablero", "Polizas Anulada"],
+            contexto={
+                "ventana": ventana,
+                "responsables": MAPEO.get("Responsables_Pacifico"),
+                "comentario": MAPEO.get("Comentario_Pacifico"),
+            },
         )
-        base["Tablero"] = base["Pacifico"].map(shp_map).fillna("No Encontrado")
-    else:
-        base["Tablero"] = "No Encontrado"
-
-    print("[OK] Match completado")
+        base = base_completa[plan.recalcular].copy()
 
     # ---------------------------------------------------------------
-    # Paso 6: Responsable, OBS, Observaciones y DentroRango
+    # Paso 7: Responsable, OBS, Observaciones y DentroRango
     # ---------------------------------------------------------------
-    base["Responsable"] = base.apply(
-        lambda r: asignar_responsable_pacifico(r["Linea de Negocio"], r["Producto"]),
-        axis=1,
-    )
-
-    base["OBS"] = base.apply(
-        lambda r: calc_obs_pacifico(r["Fin de Vigencia"], r["SICS"], r["Tablero"]),
-        axis=1,
-    )
-
-    comentarios_pac = MAPEO.get("Comentario_Pacifico", {})
-    base["Observaciones"] = base["OBS"].map(comentarios_pac).fillna("")
-
-    hoy = datetime.today()
-    ano_actual = hoy.year
-    ano_siguiente = ano_actual + 1
-    mes_actual = hoy.strftime("%Y-%m")
-    mes_anterior = (hoy - timedelta(days=30)).strftime("%Y-%m")
-    mes_siguiente = (hoy + timedelta(days=30)).strftime("%Y-%m")
-
-    def dentro_de_rango_pacifico(row) -> str:
-        s = str(row["SICS"]).strip()
-        t = str(row["Tablero"]).strip()
-        responsable = str(row["Responsable"]).strip().upper()
-        situacion = str(row["Situacion"]).strip().upper()
-        fin_vig = str(row["Fin de Vigencia"]).strip()
-
-        # 0️⃣ Filtrado por Situacion: anulada / no renovada / vigencia anterior → NO
-        if situacion in {"ANULADA", "NO RENOVADA", "VIGENCIA ANTERIOR"}:
-            return "No"
-
-        # 0.1️⃣ Filtrado por año de Fin de Vigencia: solo año actual y siguiente
-        try:
-            ano_fv = int(fin_vig[:4])
-            if ano_fv not in (ano_actual, ano_siguiente):
-                return "No"
-        except Exception:
-            # si no se puede leer el año, juega a lo seguro
-            return "No"
-
-        # 1️⃣ Si SICS y Tablero son "No Encontrado" → Sí (se deben revisar)
-        if s == "No Encontrado" and t == "No Encontrado":
-            return "Sí"
-
-        # 2️⃣ Si SICS vacío o "No Encontrado" → No
-        if s in ("", "No Encontrado", "nan"):
-            return "No"
-
-        # 3️⃣ Rango por meses según responsable (igual que Rimac)
-        s_ym = s[:7]
-
-        if responsable == "JESUS":
-            return "Sí" if s_ym in (mes_anterior, mes_actual) else "No"
-
-        return "Sí" if s_ym in (mes_anterior, mes_actual, mes_siguiente) else "No"
-
-    base["DentroRango"] = base.apply(dentro_de_rango_pacifico, axis=1)
-
-    # ---------------------------------------------------------------
-    # Paso 7: Integrar Anulados → Polizas Anulada
-    # ---------------------------------------------------------------
-    try:
-        anulados_path = get_latest_file(OUTPUT_PACIFICO_ANULADO)
-        print(f"[INFO] Integrando Anulados desde: {anulados_path.name}")
-        anul_df = leer_excel(anulados_path)
-        anul_df.columns = anul_df.columns.map(str).str.strip()
-
-        if "Nro de Poliza/Contrato" in anul_df.columns and "Situacion" in anul_df.columns:
-            anul_df["Nro de Poliza/Contrato"] = anul_df["Nro de Poliza/Contrato"].astype(str).str.strip()
-            anul_df["Situacion"] = anul_df["Situacion"].astype(str).str.strip()
-
-            anul_map = (
-                anul_df.dropna(subset=["Nro de Poliza/Contrato"])
-                .drop_duplicates("Nro de Poliza/Contrato", keep="last")
-                .set_index("Nro de Poliza/Contrato")["Situacion"]
-            )
-
-            base["Polizas Anulada"] = base["Nro de Poliza/Contrato"].map(anul_map).fillna("")
-        else:
-            print("[WARN] El archivo de Anulados no contiene las columnas esperadas.")
-            base["Polizas Anulada"] = base.get("Polizas Anulada", "")
-    except FileNotFoundError:
-        print("[WARN] No se encontró archivo de Anulados preparado. 'Polizas Anulada' quedará vacía.")
-        base["Polizas Anulada"] = base.get("Polizas Anulada", "")
-    except Exception as e:
-        print(f"[WARN] Error integrando Anulados: {e}")
-        base["Polizas Anulada"] = base.get("Polizas Anulada", "")
+    base = _aplicar_reglas(base, ventana)
 
     # ---------------------------------------------------------------
     # Paso 8: Reglas adicionales sobre OBS y DentroRango (duplicados)
     # ---------------------------------------------------------------
-    if (
-        "Nro de Poliza/Contrato" in base.columns
-        and "OBS" in base.columns
-        and "DentroRango" in base.columns
-    ):
-        grupos = base.groupby("Nro de Poliza/Contrato", sort=False)
-
-        for _, idx in grupos.groups.items():
-            g = base.loc[idx]
-
-            # Normalizar OBS a enteros (1, 2, 3)
-            vals = []
-            for o in g["OBS"]:
-                try:
-                    vals.append(int(str(o)))
-                except ValueError:
-                    pass
-            obs_vals = set(vals)
-
-            # 1️⃣ Si en la misma póliza hay OBS = 2 y OBS = 3:
-            #     - prevalece el 2
-            #     - los registros con OBS = 3 se marcan como "No" en DentroRango
-            if 2 in obs_vals and 3 in obs_vals:
-                mask_3 = (base.index.isin(idx)) & (base["OBS"].astype(str) == "3")
-                base.loc[mask_3, "DentroRango"] = "No"
-
-            # 2️⃣ Si la póliza está repetida y TODOS los OBS son 1:
-            #     - solo actuamos si AL MENOS UNA ya estaba en "Sí"
-            #       (para no revivir pólizas fuera de rango de año)
-            if obs_vals == {1} and len(idx) > 1:
-                dentro_si = base.loc[idx, "DentroRango"] == "Sí"
-
-                # Si ninguna está en "Sí" (todas "No"), no tocamos nada
-                if dentro_si.any():
-                    # marcamos todas como "No"...
-                    base.loc[idx, "DentroRango"] = "No"
-                    # y dejamos solo UNA en "Sí" (la primera que ya tenía "Sí")
-                    idx_si = list(idx[dentro_si.values])
-                    primer_si = idx_si[0]
-                    base.loc[primer_si, "DentroRango"] = "Sí"
+    # Reglas por grupo de póliza con transformaciones (una sola pasada)
+    base["DentroRango"] = reconciliar_duplicados_pacifico(
+        base["Nro de Poliza/Contrato"], base["OBS"], base["DentroRango"]
+    )
 
     # ---------------------------------------------------------------
     # Paso 9: Preparar columnas finales y exportar
     # ---------------------------------------------------------------
     # Nota: Mantenemos todas las columnas incluyendo Situacion
+    df_final = _columnas_finales(base)
+    if plan is not None:
+        df_final = combinar_incremental(plan, base_completa, df_final)
+    df_final = aplicar_plan_tipos(df_final, "integracion_pacifico")
 
-    # Columnas finales
-    cols_final = [
-        "Contratante",
-        "Nro de Documento",
-        "Linea de Negocio",
-        "Producto",
-        "Nro de Poliza/Contrato",
-        "SICS",
-        "Tablero",
-        "Observaciones",
-        "Responsable",
-        "Fin de Vigencia",
-        "Situacion",
-        "OBS",
-        "DentroRango",
-        "Polizas Anulada",
-    ]
-
-    # Aseguramos que todas existan
-    for col in cols_final:
-        if col not in base.columns:
-            base[col] = ""
-
-    df_final = base.reindex(columns=cols_final)
-
-    OUTPUT_PACIFICO_INTEGRADO.mkdir(parents=True, exist_ok=True)
-    output_path = OUTPUT_PACIFICO_INTEGRADO / f"Reporte-polizas_Pacifico_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    output_path = _ruta_reporte()
 
     try:
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            df_final.to_excel(writer, index=False, sheet_name="MatchPacifico")
+        if plan is not None:
+            delta = delta_incremental(plan, df_final)
+            escribir_libro({"MatchPacifico": df_final, "Delta": delta}, output_path)
+        else:
+            escribir_reporte(df_final, output_path, hoja="MatchPacifico")
         print(f"[OK] Archivo generado: {output_path}")
     except Exception as e:
         print(f"[ERROR] Guardando archivo final: {e}")
         return
 
+    # El estado se guarda solo si el reporte se escribió
+    if plan is not None:
+        guardar_incremental(plan, df_final)
+
     # ---------------------------------------------------------------
     # Paso 10: Resumen
     # ---------------------------------------------------------------
-    total = len(df_final)
-    en_rango = (df_final["DentroRango"] == "Sí").sum()
-    print("\n" + "=" * 70)
-    print("[RESUMEN FINAL] Integración Pacífico Completada")
-    print("=" * 70)
-    print(f"  Total de pólizas procesadas: {total}")
-    print(f"  Pólizas en rango de vigencia: {en_rango}")
-    print(f"  Pólizas fuera de rango: {total - en_rango}")
-    print(f"  Archivo generado: {output_path.name}")
-    print("=" * 70)
-    print("✅ Proceso completo Pacífico finalizado exitosamente.\n")
+    _imprimir_resumen(len(df_final), (df_final["DentroRango"] == "Sí").sum(), output_path)
+
+    return df_final
+
+
+def _integrar_por_bloques(base_pac: BaseEnBloques, cruce: _Cruce, ventana: VentanaRango):
+    """
+    Integración con memoria acotada, en dos pasadas sobre los bloques:
+
+      1. Cada bloque pasa por los pasos 4 a 7; el resultado se guarda en disco
+         y de cada póliza se acumula solo un estado compacto (conteos de OBS
+         y posición del primer "Sí", ver reglas.estado_duplicados_pacifico).
+      2. Con el estado de toda la base se aplican a cada bloque las reglas de
+         duplicados (paso 8) y las filas se escriben directo en el reporte.
+
+    En memoria quedan SICS / SharePoint / Anulados (o el índice), el estado
+    por póliza y un bloque a la vez. Devuelve un ReportePorBloques.
+    """
+    if incremental_activo():
+        print("[WARN] El modo incremental no se aplica a la integración por bloques: se recalcula todo")
+
+    control = ControlMemoria("Integración Pacífico")
+    print(f"[INFO] Integración por bloques: {len(base_pac)} filas en {base_pac.partes} bloques")
+    print("[INFO] Realizando match Pacífico ↔ SICS/SharePoint...")
+
+    with AlmacenBloques.temporal() as integrados:
+        # 1️⃣ Pasos 4 a 7 por bloque + estado de duplicados
+        estado = None
+        for bloque in base_pac.bloques():
+            while len(bloque):
+                parte, bloque = bloque.iloc[:control.filas], bloque.iloc[control.filas:]
+                base = _aplicar_reglas(cruce.base(como_texto_excel(parte)), ventana)
+                estado = combinar_estados_duplicados(estado, estado_duplicados_pacifico(
+                    base["Nro de Poliza/Contrato"], base["OBS"], base["DentroRango"], inicio=integrados.filas
+                ))
+                integrados.agregar(_columnas_finales(base))
+                del base, parte
+                control.revisar()
+        print(f"[OK] Match completado ({0 if estado is None else len(estado)} pólizas distintas)")
+
+        # 2️⃣ Paso 8 con el estado de toda la base, y exportar
+        en_rango = 0
+
+        def bloques_finales():
+            nonlocal en_rango
+            inicio = 0
+            for df in integrados.leer():
+                if estado is not None:
+                    df["DentroRango"] = aplicar_estado_duplicados(
+                        df["Nro de Poliza/Contrato"], df["OBS"], df["DentroRango"], estado, inicio=inicio
+                    )
+                inicio += len(df)
+                en_rango += int((df["DentroRango"] == "Sí").sum())
+                yield df
+                control.revisar()
+
+        output_path = _ruta_reporte()
+        try:
+            escribir_reporte_por_bloques(bloques_finales(), integrados.filas, output_path, hoja="MatchPacifico")
+            print(f"[OK] Archivo generado: {output_path}")
+        except Exception as e:
+            print(f"[ERROR] Guardando archivo final: {e}")
+            return
+        total = integrados.filas
+
+    control.resumen()
+    _imprimir_resumen(total, en_rango, output_path)
+    return ReportePorBloques(output_path, total, en_rango)
 
 
 if __name__ == "__main__":
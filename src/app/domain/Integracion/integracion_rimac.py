@@ -1,17 +1,24 @@
 # Integración de Rimac
-import pandas as pd
-from datetime import datetime, timedelta
-import warnings
+from datetime import datetime
 from pathlib import Path
 import sys
 
-from src.app.repository.configuration_repository import (
-    get_sics_file,
-    get_sharepoint_file,
-    get_rimac_file,
-    OUTPUT_RIMAC
-)
+from src.app.repository.configuration_repository import OUTPUT_RIMAC
 from src.app.repository.mapping_repository import MAPEO
+from src.app.domain.Comun.dataframes import como_texto_excel
+from src.app.domain.Comun.normalizacion import clave_texto
+from src.app.domain.Comun.tipos import aplicar_plan_tipos, rellenar_nulos
+from src.app.domain.Integracion.busqueda_polizas import buscar_por_poliza, fuente_de_polizas
+from src.app.repository.incremental_repository import incremental_activo
+from src.app.repository.reporte_repository import escribir_libro, escribir_reporte
+from src.app.domain.Integracion.incremental import (
+    combinar_incremental,
+    delta_incremental,
+    guardar_incremental,
+    planificar_incremental,
+)
+from src.app.domain.Integracion.reglas import calc_obs_vectorizado, dentro_rango_rimac, VentanaRango
+from src.app.domain.Integracion.responsables import asignar_responsables_rimac
 
 # Importar funciones de preparación
 from src.app.domain.Basicos.sics import preparar_sics
@@ -24,89 +31,44 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 # ============================================================
-# Funciones auxiliares
+# Proceso principal de integración
 # ============================================================
 
-def asignar_responsable(categoria: str) -> str:
-    """Devuelve el responsable según la categoría usando el mapeo de responsables."""
-    categoria = str(categoria).strip().upper()
-    for responsable, categorias in MAPEO.get("Responsables", {}).items():
-        if categoria in [c.upper() for c in categorias]:
-            return responsable
-    return ""
-
-
-def calc_obs(vencimiento, sics_val, tablero_val):
+def _preparar_fuentes_rimac():
     """
-    Reglas del OBS:
-      1 -> sics no encontrado y tablero no encontrado
-      2 -> sics(YYYY-MM) <= vencimiento(YYYY-MM)
-      6 -> resto de casos
+    Flujo autónomo: ejecuta las preparaciones y usa sus DataFrames en memoria.
+    Devuelve (sics_df, share_df, rimac_df) o None si alguna etapa falla.
     """
-    # Normalizar valores
-    s = str(sics_val).strip() if pd.notna(sics_val) else ""
-    t = str(tablero_val).strip() if pd.notna(tablero_val) else ""
-
-    def es_no_encontrado(x: str) -> bool:
-        xl = x.strip().lower()
-        return xl in ("", "no encontrado", "nan")
-
-    # 1️⃣ Caso OBS = 1
-    if es_no_encontrado(s) and es_no_encontrado(t):
-        return 1
-
-    # 2️⃣ Si SICS está vacío → OBS = 6
-    if es_no_encontrado(s):
-        return 6
-
-    # Preparar YYYY-MM
-    v_ym = str(vencimiento)[:7] if pd.notna(vencimiento) else ""
-    s_ym = s[:7]
-
-    # 3️⃣ Condición exacta:
-    #     sics <= vencimiento
-    try:
-        return 2 if s_ym and s_ym <= v_ym else 6
-    except:
-        return 6
-
-
-# ============================================================
-# Proceso principal de integración
-# ============================================================
-
-def integracion_rimac():
-    """Ejecuta el proceso completo de integración Rimac."""
-    print("\n" + "="*70)
-    print("[INICIO] Proceso Completo de Integración Rimac")
-    print("="*70)
-
     # ============================================================
     # PASO 0: Ejecutar scripts de preparación secuencialmente
     # ============================================================
     print("\n[ETAPA 1/4] Preparación de datos SICS")
     print("-" * 70)
     try:
-        preparar_sics()
+        sics_df = preparar_sics()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de SICS: {e}")
-        return
+        return None
 
     print("\n[ETAPA 2/4] Preparación de datos SharePoint")
     print("-" * 70)
     try:
-        preparar_sharepoint()
+        share_df = preparar_sharepoint()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de SharePoint: {e}")
-        return
+        return None
 
     print("\n[ETAPA 3/4] Preparación de datos Rimac")
     print("-" * 70)
     try:
-        preparar_rimac()
+        rimac_df = preparar_rimac()
     except Exception as e:
         print(f"[ERROR] Fallo en la preparación de Rimac: {e}")
-        return
+        return None
+
+    if sics_df is None or share_df is None or rimac_df is None:
+        print("[ERROR] No se pudieron preparar todas las fuentes (SICS, SharePoint, Rimac).")
+        return None
 
     # ============================================================
     # PASO 1: Integración de datos
@@ -114,34 +76,38 @@ def integracion_rimac():
     print("\n[ETAPA 4/4] Integración y Match de datos")
     print("-" * 70)
 
-    # 1) Localizar archivos
-    try:
-        path_sics = get_sics_file()
-        path_sharepoint = get_sharepoint_file()
-        path_rimac = get_rimac_file()
-        print("[OK] Archivos detectados:")
-        print(f"   SICS       → {path_sics.name}")
-        print(f"   SharePoint → {path_sharepoint.name}")
-        print(f"   Rimac      → {path_rimac.name}")
-    except Exception as e:
-        print(f"[ERROR] Localizando archivos: {e}")
-        return
+    return sics_df, share_df, rimac_df
 
-    # 2) Lectura
-    def leer_excel(path: Path):
-        ext = path.suffix.lower()
-        engine = "xlrd" if ext == ".xls" else "openpyxl"
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            return pd.read_excel(path, dtype=str, engine=engine)
 
-    try:
-        sics_df = leer_excel(path_sics)
-        share_df = leer_excel(path_sharepoint)
-        rimac_df = leer_excel(path_rimac)
-    except Exception as e:
-        print(f"[ERROR] Leyendo Excels: {e}")
-        return
+def integracion_rimac(sics_df=None, share_df=None, rimac_df=None):
+    """
+    Ejecuta el proceso completo de integración Rimac.
+
+    Si se reciben los DataFrames ya preparados (SICS, SharePoint y Rimac),
+    se usan directamente en memoria y no se vuelven a ejecutar las
+    preparaciones. Sin argumentos, el proceso es autónomo: ejecuta antes
+    cada preparación.
+
+    En modo incremental (ver incremental.py) solo se recalculan las pólizas
+    que cambiaron desde la ejecución anterior y el reporte lleva además la
+    hoja "Delta" con las pólizas nuevas, modificadas y eliminadas.
+    """
+    print("\n" + "="*70)
+    print("[INICIO] Proceso Completo de Integración Rimac")
+    print("="*70)
+
+    if sics_df is None or share_df is None or rimac_df is None:
+        fuentes = _preparar_fuentes_rimac()
+        if fuentes is None:
+            return
+        sics_df, share_df, rimac_df = fuentes
+    else:
+        print("[INFO] Usando datos preparados en memoria (SICS, SharePoint, Rimac)")
+
+    # SICS y SharePoint pueden llegar como índice de pólizas (ver busqueda_polizas.py)
+    sics_df = fuente_de_polizas(sics_df)
+    share_df = fuente_de_polizas(share_df)
+    rimac_df = como_texto_excel(rimac_df)
 
     print(f"[INFO] Filas: SICS={len(sics_df)} | SharePoint={len(share_df)} | Rimac={len(rimac_df)}")
 
@@ -156,66 +122,51 @@ def integracion_rimac():
         if faltantes:
             print(f"[WARN] {name}: faltan columnas {faltantes}")
 
-    # 4) Normalización de llaves y columnas
-    for df in (sics_df, share_df, rimac_df):
-        df.columns = df.columns.map(str).str.strip()
-
-    sics_df["Rimac"] = sics_df["Rimac"].astype(str).str.strip()
-    share_df["Rimac"] = share_df["Rimac"].astype(str).str.strip()
-    rimac_df["NRO. POLIZA"] = rimac_df["NRO. POLIZA"].astype(str).str.strip()
+    # 4) Normalización de llaves y columnas (las llaves de SICS y SharePoint
+    # ya vienen normalizadas por fuente_de_polizas)
+    rimac_df.columns = rimac_df.columns.map(str).str.strip()
+    rimac_df["NRO. POLIZA"] = clave_texto(rimac_df["NRO. POLIZA"])
 
     # 5) Match
     print("[INFO] Match de datos...")
     base = rimac_df.copy()
 
     # SICS: NRO. POLIZA (Rimac) -> Fin Vig (YYYY-MM)
-    sics_map = sics_df.drop_duplicates("Rimac").set_index("Rimac")["Fin Vig"]
-    base["SICS"] = base["NRO. POLIZA"].map(sics_map).fillna("No Encontrado")
+    sics_val = buscar_por_poliza(sics_df, "Rimac", "Fin Vig", base["NRO. POLIZA"])
+    base["SICS"] = rellenar_nulos(sics_val, "No Encontrado")
 
     # Tablero: NRO. POLIZA (Rimac) -> STATUS RENOVACION
-    shp_map = share_df.drop_duplicates("Rimac").set_index("Rimac")["STATUS RENOVACION"]
-    base["Tablero"] = base["NRO. POLIZA"].map(shp_map).fillna("No Encontrado")
+    shp_val = buscar_por_poliza(share_df, "Rimac", "STATUS RENOVACION", base["NRO. POLIZA"])
+    base["Tablero"] = rellenar_nulos(shp_val, "No Encontrado")
 
     print("[OK] Match completado")
 
+    ventana = VentanaRango.desde(datetime.today())
+
+    # Modo incremental: solo las pólizas que cambiaron pasan por los pasos 6 y 7
+    plan = None
+    base_completa = base
+    if incremental_activo():
+        plan = planificar_incremental(
+            "integracion_rimac",
+            base,
+            "NRO. POLIZA",
+            ["RESPONSABLE DE PAGO", "NRO. POLIZA", "CATEGORÍA", "VENCIMIENTO", "SICS", "Tablero"],
+            contexto={"ventana": ventana, "responsables": MAPEO.get("Responsables"), "comentario": MAPEO.get("Comentario")},
+        )
+        base = base_completa[plan.recalcular].copy()
+
     # 6) Columnas calculadas
     # Responsable primero (para excepción de rango con Jesús)
-    base["Responsable"] = base["CATEGORÍA"].apply(asignar_responsable)
-    # Obs por regla de fechas
-    base["Obs"] = base.apply(lambda r: calc_obs(r["VENCIMIENTO"], r["SICS"], r["Tablero"]), axis=1)
+    base["Responsable"] = asignar_responsables_rimac(base["CATEGORÍA"])
+    # Obs por regla de fechas (por columnas; reglas.calc_obs queda como referencia fila a fila)
+    base["Obs"] = calc_obs_vectorizado(base["VENCIMIENTO"], base["SICS"], base["Tablero"])
     # Observaciones según mapeo de Comentario (1, 2, 6 → texto)
     comentarios = MAPEO.get("Comentario", {})
     base["Observaciones"] = base["Obs"].map(comentarios).fillna("")
 
-    # 7) Rango temporal (marcar, no filtrar)
-    hoy = datetime.today()
-    mes_actual = hoy.strftime("%Y-%m")
-    mes_anterior = (hoy - timedelta(days=30)).strftime("%Y-%m")
-    mes_siguiente = (hoy + timedelta(days=30)).strftime("%Y-%m")
-
-    def dentro_de_rango(row):
-        s = str(row["SICS"]).strip()
-        t = str(row["Tablero"]).strip()
-
-        # Si tanto SICS como Tablero son "No Encontrado", marcar como "Sí"
-        if s == "No Encontrado" and t == "No Encontrado":
-            return "Sí"
-
-        # Si SICS está vacío o es "No Encontrado", marcar como "No"
-        if s in ("", "No Encontrado", "nan"):
-            return "No"
-
-        # Tomar solo YYYY-MM de SICS
-        s = s[:7]
-
-        # Aplicar regla especial para Jesús (mes anterior y actual)
-        if str(row["Responsable"]).strip().upper() == "JESUS":
-            return "Sí" if s in (mes_anterior, mes_actual) else "No"
-
-        # Para otros responsables (mes anterior, actual y siguiente)
-        return "Sí" if s in (mes_anterior, mes_actual, mes_siguiente) else "No"
-
-    base["DentroRango"] = base.apply(dentro_de_rango, axis=1)
+    # 7) Rango temporal (marcar, no filtrar): máscaras sobre columnas completas
+    base["DentroRango"] = dentro_rango_rimac(base["SICS"], base["Tablero"], base["Responsable"], ventana)
 
     # 8) Reordenar y exportar
     columnas_finales = [
@@ -231,18 +182,28 @@ def integracion_rimac():
         "DentroRango",
     ]
     df_final = base[columnas_finales].copy()
+    if plan is not None:
+        df_final = combinar_incremental(plan, base_completa, df_final)
+    df_final = aplicar_plan_tipos(df_final, "integracion_rimac")
 
     OUTPUT_RIMAC.mkdir(parents=True, exist_ok=True)
     output_path = OUTPUT_RIMAC / f"Reporte-polizas_Rimac_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
 
     try:
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            df_final.to_excel(writer, index=False, sheet_name="MatchRimac")
+        if plan is not None:
+            delta = delta_incremental(plan, df_final)
+            escribir_libro({"MatchRimac": df_final, "Delta": delta}, output_path)
+        else:
+            escribir_reporte(df_final, output_path, hoja="MatchRimac")
         print(f"[OK] Archivo generado: {output_path}")
     except Exception as e:
         print(f"[ERROR] Guardando archivo final: {e}")
         return
 
+    # El estado se guarda solo si el reporte se escribió
+    if plan is not None:
+        guardar_incremental(plan, df_final)
+
     # 9) Resumen
     total = len(df_final)
     en_rango = (df_final["DentroRango"] == "Sí").sum()
@@ -256,6 +217,8 @@ def integracion_rimac():
     print("="*70)
     print("✅ Proceso completo finalizado exitosamente.\n")
 
+    return df_final
+
 
 # Ejecución directa
 if __name__ == "__main__":
@@ -0,0 +1,524 @@
+"""
+reglas.py
+---------
+Versiones vectorizadas (por columna) de las reglas de integración.
+
+Cada función recibe Series completas y devuelve una Series con el mismo
+índice, con resultados idénticos a las funciones fila a fila que se
+conservan como referencia al final del módulo (calc_obs, calc_obs_pacifico,
+regla_dentro_de_rango, regla_dentro_de_rango_pacifico,
+reconciliar_duplicados_referencia).
+La equivalencia se comprueba con src/benchmarks/verificacion_reglas.py.
+
+DentroRango se evalúa como composición de máscaras booleanas; los meses de
+la ventana se calculan una sola vez como códigos enteros de periodo.
+
+Si las columnas son categóricas, el trabajo de texto se hace una vez por
+categoría (ver Comun/tipos.por_categoria).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.app.domain.Comun.normalizacion import clave_texto, normalizar
+from src.app.domain.Comun.tipos import por_categoria
+
+# Valores que cuentan como "sin dato" al comparar SICS / Tablero
+_NO_ENCONTRADO = ("", "no encontrado", "nan")
+
+
+def texto(serie: pd.Series) -> pd.Series:
+    """Equivale a `str(x) if pd.notna(x) else ""` para cada valor."""
+    return por_categoria(serie, lambda x: x.where(x.notna(), "").astype(str))
+
+
+def _limpio(serie: pd.Series) -> pd.Series:
+    return texto(serie).str.strip()
+
+
+def es_no_encontrado(serie_texto: pd.Series) -> pd.Series:
+    """Máscara de valores vacíos, 'No Encontrado' o 'nan' (sin distinguir mayúsculas)."""
+    return serie_texto.str.strip().str.lower().isin(_NO_ENCONTRADO)
+
+
+# ===================================================================
+# OBS
+# ===================================================================
+
+def calc_obs_vectorizado(vencimiento: pd.Series, sics: pd.Series, tablero: pd.Series) -> pd.Series:
+    """
+    OBS Rimac por columnas (misma lógica que calc_obs):
+      1 -> SICS y Tablero no encontrados
+      6 -> SICS no encontrado
+      2 -> SICS(YYYY-MM) <= VENCIMIENTO(YYYY-MM)
+      6 -> resto de casos
+    """
+    # Cálculos de texto una vez por categoría cuando las columnas son categóricas
+    s_ne = por_categoria(sics, lambda x: es_no_encontrado(_limpio(x)))
+    t_ne = por_categoria(tablero, lambda x: es_no_encontrado(_limpio(x)))
+
+    s_ym = por_categoria(sics, lambda x: _limpio(x).str[:7])
+    v_ym = por_categoria(vencimiento, lambda x: texto(x).str[:7])
+    sics_menor_igual = (s_ym != "") & (s_ym <= v_ym)
+
+    obs = np.select([s_ne & t_ne, s_ne, sics_menor_igual], [1, 6, 2], default=6)
+    return pd.Series(obs, index=sics.index, dtype="int64")
+
+
+def calc_obs_pacifico_vectorizado(fin_vigencia: pd.Series, sics: pd.Series, tablero: pd.Series) -> pd.Series:
+    """
+    OBS Pacífico por columnas (misma lógica que calc_obs_pacifico):
+      1 -> SICS y Tablero no encontrados
+      2 -> SICS no encontrado
+      3 -> SICS(YYYY-MM) >= FinVigencia(YYYY-MM)
+      2 -> resto de casos
+    """
+    s_ne = por_categoria(sics, lambda x: es_no_encontrado(_limpio(x)))
+    t_ne = por_categoria(tablero, lambda x: es_no_encontrado(_limpio(x)))
+
+    s_ym = por_categoria(sics, lambda x: _limpio(x).str[:7])
+    fv_ym = por_categoria(fin_vigencia, lambda x: _limpio(x).str[:7])
+    sics_mayor_igual = (s_ym != "") & (fv_ym != "") & (s_ym >= fv_ym)
+
+    obs = np.select([s_ne & t_ne, s_ne, sics_mayor_igual], [1, 2, 3], default=2)
+    return pd.Series(obs, index=sics.index, dtype="int64")
+
+
+# ===================================================================
+# DentroRango
+# ===================================================================
+
+_SITUACIONES_EXCLUIDAS = ("ANULADA", "NO RENOVADA", "VIGENCIA ANTERIOR")
+
+
+def codigo_periodo(serie_ym: pd.Series) -> pd.Series:
+    """
+    Convierte textos 'YYYY-MM' a un código entero de periodo (año * 12 + mes - 1).
+    Los valores que no tienen ese formato exacto (o un mes fuera de 01-12) quedan en -1.
+    El cálculo se hace una vez por valor distinto.
+    """
+    if serie_ym.empty:
+        return pd.Series(index=serie_ym.index, dtype="int64")
+    unicos = pd.Series(serie_ym.unique(), dtype=object)
+    partes = unicos.str.extract(r"^([0-9]{4})-([0-9]{2})$")
+    ano = pd.to_numeric(partes[0], errors="coerce")
+    mes = pd.to_numeric(partes[1], errors="coerce")
+    codigos = (ano * 12 + mes - 1).where(mes.between(1, 12), -1).fillna(-1).astype("int64")
+    return serie_ym.map(dict(zip(unicos, codigos))).astype("int64")
+
+
+def _codigo_fecha(fecha: datetime) -> int:
+    return fecha.year * 12 + fecha.month - 1
+
+
+@dataclass(frozen=True)
+class VentanaRango:
+    """Meses (como códigos de periodo) y años que cuentan como 'dentro de rango'."""
+    mes_anterior: int
+    mes_actual: int
+    mes_siguiente: int
+    ano_actual: int
+    ano_siguiente: int
+
+    @classmethod
+    def desde(cls, hoy: datetime) -> "VentanaRango":
+        """Ventana para la fecha `hoy`: ±30 días para los meses, año actual y siguiente."""
+        return cls(
+            mes_anterior=_codigo_fecha(hoy - timedelta(days=30)),
+            mes_actual=_codigo_fecha(hoy),
+            mes_siguiente=_codigo_fecha(hoy + timedelta(days=30)),
+            ano_actual=hoy.year,
+            ano_siguiente=hoy.year + 1,
+        )
+
+    @property
+    def meses_jesus(self) -> tuple:
+        return (self.mes_anterior, self.mes_actual)
+
+    @property
+    def meses_general(self) -> tuple:
+        return (self.mes_anterior, self.mes_actual, self.mes_siguiente)
+
+
+def _mascara_rango_sics(sics: pd.Series, tablero: pd.Series, responsable: pd.Series, ventana: VentanaRango) -> pd.Series:
+    """
+    Regla común Rimac / Pacífico:
+      - SICS y Tablero "No Encontrado"        → Sí
+      - SICS vacío / "No Encontrado" / "nan"  → No
+      - Responsable JESUS                     → SICS en mes anterior o actual
+      - Resto                                 → SICS en mes anterior, actual o siguiente
+    """
+    limpio = clave_texto
+
+    ambos_no_encontrados = (
+        por_categoria(sics, lambda x: limpio(x) == "No Encontrado")
+        & por_categoria(tablero, lambda x: limpio(x) == "No Encontrado")
+    )
+    sin_sics = por_categoria(sics, lambda x: limpio(x).isin(("", "No Encontrado", "nan")))
+
+    periodo = por_categoria(sics, lambda x: codigo_periodo(limpio(x).str[:7]))
+    es_jesus = por_categoria(responsable, lambda x: limpio(x).str.upper() == "JESUS")
+    en_ventana = periodo.isin(ventana.meses_general) & (~es_jesus | periodo.isin(ventana.meses_jesus))
+
+    return ambos_no_encontrados | (~sin_sics & en_ventana)
+
+
+def _si_no(mascara: pd.Series) -> pd.Series:
+    return pd.Series(np.where(mascara, "Sí", "No"), index=mascara.index, dtype=object)
+
+
+def dentro_rango_rimac(sics: pd.Series, tablero: pd.Series, responsable: pd.Series, ventana: VentanaRango) -> pd.Series:
+    """DentroRango Rimac ("Sí" / "No") calculado con máscaras sobre columnas completas."""
+    return _si_no(_mascara_rango_sics(sics, tablero, responsable, ventana))
+
+
+def dentro_rango_pacifico(
+    sics: pd.Series,
+    tablero: pd.Series,
+    responsable: pd.Series,
+    situacion: pd.Series,
+    fin_vigencia: pd.Series,
+    ventana: VentanaRango,
+) -> pd.Series:
+    """
+    DentroRango Pacífico ("Sí" / "No"): la regla común de SICS, excepto que
+    siempre es "No" si la Situacion es ANULADA / NO RENOVADA / VIGENCIA ANTERIOR
+    o si el año de Fin de Vigencia no es el actual o el siguiente.
+    """
+    anos = (str(ventana.ano_actual), str(ventana.ano_siguiente))
+    excluida = por_categoria(
+        situacion, lambda x: normalizar(x, mayusculas=True, nulos_como_texto=True).isin(_SITUACIONES_EXCLUIDAS)
+    )
+    ano_valido = por_categoria(fin_vigencia, lambda x: clave_texto(x).str[:4].isin(anos))
+
+    return _si_no(~excluida & ano_valido & _mascara_rango_sics(sics, tablero, responsable, ventana))
+
+
+# ===================================================================
+# Pólizas duplicadas (Pacífico)
+# ===================================================================
+
+# Estado compacto por póliza: permite aplicar las reglas de duplicados cuando
+# la base se procesa por bloques (ver Integracion/integracion_pacifico.py).
+# Cada fila del estado resume todos los registros de una póliza:
+#   validos  → registros con OBS numérico
+#   unos / doses / treses → registros con OBS = 1 / 2 / 3
+#   filas    → registros de la póliza
+#   primer_si → posición (en toda la base) del primer DentroRango "Sí"
+_AGREGACION_ESTADO = {
+    "validos": "sum", "unos": "sum", "doses": "sum", "treses": "sum",
+    "filas": "sum", "primer_si": "min",
+}
+
+
+def estado_duplicados_pacifico(
+    poliza: pd.Series,
+    obs: pd.Series,
+    dentro_rango: pd.Series,
+    inicio: int = 0,
+) -> pd.DataFrame:
+    """
+    Estado por póliza de un bloque de registros cuya primera fila ocupa la
+    posición `inicio` de la base. Los estados de varios bloques se juntan con
+    `combinar_estados_duplicados`.
+    """
+    valida = (poliza.notna()).to_numpy()
+    obs_num = pd.to_numeric(obs, errors="coerce").to_numpy()[valida]
+    si = (dentro_rango == "Sí").to_numpy()[valida]
+    posicion = np.arange(inicio, inicio + len(poliza))[valida]
+
+    datos = pd.DataFrame({
+        "validos": ~np.isnan(obs_num),
+        "unos": obs_num == 1,
+        "doses": obs_num == 2,
+        "treses": obs_num == 3,
+        "filas": 1,
+        "primer_si": np.where(si, posicion, np.nan),
+    }, index=pd.Index(poliza.to_numpy()[valida], name="poliza"))
+    return datos.groupby(level=0, sort=False).agg(_AGREGACION_ESTADO)
+
+
+def combinar_estados_duplicados(*estados: pd.DataFrame) -> pd.DataFrame:
+    """Junta estados de bloques distintos en uno solo (una fila por póliza)."""
+    estados = [e for e in estados if e is not None]
+    if len(estados) == 1:
+        return estados[0]
+    return pd.concat(estados).groupby(level=0, sort=False).agg(_AGREGACION_ESTADO)
+
+
+def aplicar_estado_duplicados(
+    poliza: pd.Series,
+    obs: pd.Series,
+    dentro_rango: pd.Series,
+    estado: pd.DataFrame,
+    inicio: int = 0,
+) -> pd.Series:
+    """
+    Aplica a un bloque (primera fila en la posición `inicio`) las reglas de
+    duplicados según el estado de TODA la base. Devuelve el nuevo DentroRango.
+    """
+    resultado = dentro_rango.copy()
+    valida = poliza.notna().to_numpy()
+    if not valida.any():
+        return resultado
+
+    fila = estado.index.get_indexer(poliza.to_numpy()[valida])
+    grupo = estado.iloc[fila]
+    validos = grupo["validos"].to_numpy()
+    unos = grupo["unos"].to_numpy()
+
+    # 1️⃣ OBS 2 le gana a OBS 3 dentro de la misma póliza
+    es_3 = (obs.astype(str) == "3").to_numpy()[valida]
+    regla_1 = (grupo["doses"].to_numpy() > 0) & (grupo["treses"].to_numpy() > 0) & es_3
+
+    # 2️⃣ Todos los OBS en 1 → solo el primer "Sí" sobrevive
+    primer_si = grupo["primer_si"].to_numpy()
+    regla_2 = (validos > 0) & (unos == validos) & (grupo["filas"].to_numpy() > 1) & ~np.isnan(primer_si)
+    posicion = np.arange(inicio, inicio + len(poliza))[valida]
+    si = (dentro_rango == "Sí").to_numpy()[valida]
+
+    nuevos = resultado.to_numpy(dtype=object, copy=True)
+    sub = nuevos[valida]
+    sub[regla_1] = "No"
+    sub[regla_2] = np.where(si[regla_2] & (posicion[regla_2] == primer_si[regla_2]), "Sí", "No")
+    nuevos[valida] = sub
+    return pd.Series(nuevos, index=dentro_rango.index, name=dentro_rango.name)
+
+
+def reconciliar_duplicados_pacifico(
+    poliza: pd.Series,
+    obs: pd.Series,
+    dentro_rango: pd.Series,
+) -> pd.Series:
+    """
+    Ajusta DentroRango de las pólizas repetidas:
+
+      1. Si una póliza tiene OBS = 2 y OBS = 3, prevalece el 2: los registros
+         con OBS = 3 pasan a "No".
+      2. Si la póliza está repetida y TODOS sus OBS son 1, y al menos un
+         registro estaba en "Sí", solo el primero de esos "Sí" se conserva.
+
+    Las filas sin número de póliza no se agrupan (igual que groupby). Es el
+    estado de toda la base aplicado de una vez (ver estado_duplicados_pacifico).
+    Devuelve la nueva Series de DentroRango.
+    """
+    estado = estado_duplicados_pacifico(poliza, obs, dentro_rango)
+    return aplicar_estado_duplicados(poliza, obs, dentro_rango, estado)
+
+
+# ===================================================================
+# Referencia fila a fila
+# ===================================================================
+# Versiones originales (una llamada por fila). La integración no las usa:
+# quedan como referencia de las reglas y como oráculo de verificacion_reglas.py.
+
+def calc_obs(vencimiento, sics_val, tablero_val):
+    """
+    Versión fila a fila (referencia). La integración usa calc_obs_vectorizado.
+
+    Reglas del OBS:
+      1 -> sics no encontrado y tablero no encontrado
+      2 -> sics(YYYY-MM) <= vencimiento(YYYY-MM)
+      6 -> resto de casos
+    """
+    # Normalizar valores
+    s = str(sics_val).strip() if pd.notna(sics_val) else ""
+    t = str(tablero_val).strip() if pd.notna(tablero_val) else ""
+
+    def es_no_encontrado(x: str) -> bool:
+        xl = x.strip().lower()
+        return xl in ("", "no encontrado", "nan")
+
+    # 1️⃣ Caso OBS = 1
+    if es_no_encontrado(s) and es_no_encontrado(t):
+        return 1
+
+    # 2️⃣ Si SICS está vacío → OBS = 6
+    if es_no_encontrado(s):
+        return 6
+
+    # Preparar YYYY-MM
+    v_ym = str(vencimiento)[:7] if pd.notna(vencimiento) else ""
+    s_ym = s[:7]
+
+    # 3️⃣ Condición exacta:
+    #     sics <= vencimiento
+    try:
+        return 2 if s_ym and s_ym <= v_ym else 6
+    except:
+        return 6
+
+
+def calc_obs_pacifico(fin_vigencia, sics_val, tablero_val) -> int:
+    """
+    Versión fila a fila (referencia). La integración usa calc_obs_pacifico_vectorizado.
+
+    Lógica OBS Pacífico:
+
+      1 -> SICS y Tablero = 'No Encontrado' (o vacío/nan)
+      3 -> SICS(YYYY-MM) >= FinVigencia(YYYY-MM)
+      2 -> resto de casos
+
+    Se inspira en la fórmula de Excel:
+        =SI(G30>=TEXTO(M30;"YYYY-MM");3;2)
+    con el caso especial 1 igual que en Rimac.
+    """
+    s = str(sics_val).strip() if pd.notna(sics_val) else ""
+    t = str(tablero_val).strip() if pd.notna(tablero_val) else ""
+    fv = str(fin_vigencia).strip() if pd.notna(fin_vigencia) else ""
+
+    def es_no_encontrado(x: str) -> bool:
+        xl = x.lower()
+        return xl in ("", "no encontrado", "nan")
+
+    # 1️⃣ No está en SICS ni en Tablero
+    if es_no_encontrado(s) and es_no_encontrado(t):
+        return 1
+
+    # 2️⃣ Si no hay SICS, no se puede comparar: se considera 2
+    if es_no_encontrado(s):
+        return 2
+
+    # 3️⃣ Comparar YYYY-MM entre SICS y Fin de Vigencia
+    s_ym = s[:7]  # asume 'YYYY-MM' o 'YYYY-MM-DD'
+    fv_ym = fv[:7]
+
+    try:
+        if s_ym and fv_ym and s_ym >= fv_ym:
+            return 3
+        return 2
+    except Exception:
+        return 2
+
+
+def regla_dentro_de_rango(hoy: datetime):
+    """
+    Versión fila a fila (referencia) de DentroRango Rimac para la fecha `hoy`.
+    La integración usa dentro_rango_rimac. Uso: `base.apply(regla_dentro_de_rango(hoy), axis=1)`.
+    """
+    mes_actual = hoy.strftime("%Y-%m")
+    mes_anterior = (hoy - timedelta(days=30)).strftime("%Y-%m")
+    mes_siguiente = (hoy + timedelta(days=30)).strftime("%Y-%m")
+
+    def dentro_de_rango(row):
+        s = str(row["SICS"]).strip()
+        t = str(row["Tablero"]).strip()
+
+        # Si tanto SICS como Tablero son "No Encontrado", marcar como "Sí"
+        if s == "No Encontrado" and t == "No Encontrado":
+            return "Sí"
+
+        # Si SICS está vacío o es "No Encontrado", marcar como "No"
+        if s in ("", "No Encontrado", "nan"):
+            return "No"
+
+        # Tomar solo YYYY-MM de SICS
+        s = s[:7]
+
+        # Aplicar regla especial para Jesús (mes anterior y actual)
+        if str(row["Responsable"]).strip().upper() == "JESUS":
+            return "Sí" if s in (mes_anterior, mes_actual) else "No"
+
+        # Para otros responsables (mes anterior, actual y siguiente)
+        return "Sí" if s in (mes_anterior, mes_actual, mes_siguiente) else "No"
+
+    return dentro_de_rango
+
+
+def regla_dentro_de_rango_pacifico(hoy: datetime):
+    """
+    Versión fila a fila (referencia) de DentroRango Pacífico para la fecha `hoy`.
+    La integración usa dentro_rango_pacifico.
+    """
+    ano_actual = hoy.year
+    ano_siguiente = ano_actual + 1
+    mes_actual = hoy.strftime("%Y-%m")
+    mes_anterior = (hoy - timedelta(days=30)).strftime("%Y-%m")
+    mes_siguiente = (hoy + timedelta(days=30)).strftime("%Y-%m")
+
+    def dentro_de_rango_pacifico(row) -> str:
+        s = str(row["SICS"]).strip()
+        t = str(row["Tablero"]).strip()
+        responsable = str(row["Responsable"]).strip().upper()
+        situacion = str(row["Situacion"]).strip().upper()
+        fin_vig = str(row["Fin de Vigencia"]).strip()
+
+        # 0️⃣ Filtrado por Situacion: anulada / no renovada / vigencia anterior → NO
+        if situacion in {"ANULADA", "NO RENOVADA", "VIGENCIA ANTERIOR"}:
+            return "No"
+
+        # 0.1️⃣ Filtrado por año de Fin de Vigencia: solo año actual y siguiente
+        try:
+            ano_fv = int(fin_vig[:4])
+            if ano_fv not in (ano_actual, ano_siguiente):
+                return "No"
+        except Exception:
+            # si no se puede leer el año, juega a lo seguro
+            return "No"
+
+        # 1️⃣ Si SICS y Tablero son "No Encontrado" → Sí (se deben revisar)
+        if s == "No Encontrado" and t == "No Encontrado":
+            return "Sí"
+
+        # 2️⃣ Si SICS vacío o "No Encontrado" → No
+        if s in ("", "No Encontrado", "nan"):
+            return "No"
+
+        # 3️⃣ Rango por meses según responsable (igual que Rimac)
+        s_ym = s[:7]
+
+        if responsable == "JESUS":
+            return "Sí" if s_ym in (mes_anterior, mes_actual) else "No"
+
+        return "Sí" if s_ym in (mes_anterior, mes_actual, mes_siguiente) else "No"
+
+    return dentro_de_rango_pacifico
+
+
+def reconciliar_duplicados_referencia(base: pd.DataFrame) -> pd.Series:
+    """
+    Versión por grupos (referencia) del Paso 8 de la integración Pacífico,
+    O(filas × pólizas). La integración usa reconciliar_duplicados_pacifico.
+    Trabaja sobre una copia de `base` y devuelve la nueva Series de DentroRango.
+    """
+    base = base.copy()
+    grupos = base.groupby("Nro de Poliza/Contrato", sort=False)
+
+    for _, idx in grupos.groups.items():
+        g = base.loc[idx]
+
+        # Normalizar OBS a enteros (1, 2, 3)
+        vals = []
+        for o in g["OBS"]:
+            try:
+                vals.append(int(str(o)))
+            except ValueError:
+                pass
+        obs_vals = set(vals)
+
+        # 1️⃣ Si en la misma póliza hay OBS = 2 y OBS = 3:
+        #     - prevalece el 2
+        #     - los registros con OBS = 3 se marcan como "No" en DentroRango
+        if 2 in obs_vals and 3 in obs_vals:
+            mask_3 = (base.index.isin(idx)) & (base["OBS"].astype(str) == "3")
+            base.loc[mask_3, "DentroRango"] = "No"
+
+        # 2️⃣ Si la póliza está repetida y TODOS los OBS son 1:
+        #     - solo actuamos si AL MENOS UNA ya estaba en "Sí"
+        #       (para no revivir pólizas fuera de rango de año)
+        if obs_vals == {1} and len(idx) > 1:
+            dentro_si = base.loc[idx, "DentroRango"] == "Sí"
+
+            # Si ninguna está en "Sí" (todas "No"), no tocamos nada
+            if dentro_si.any():
+                # marcamos todas como "No"...
+                base.loc[idx, "DentroRango"] = "No"
+                # y dejamos solo UNA en "Sí" (la primera que ya tenía "Sí")
+                idx_si = list(idx[dentro_si.values])
+                primer_si = idx_si[0]
+                base.loc[primer_si, "DentroRango"] = "Sí"
+
+    return base["DentroRango"]
@@ -0,0 +1,107 @@
+"""
+responsables.py
+---------------
+Tablas de búsqueda de responsables compiladas una sola vez desde MAPEO.
+
+  - Rimac:    CATEGORÍA                      → Responsable  (MAPEO["Responsables"])
+  - Pacífico: (Linea de Negocio, Producto)   → Responsable  (MAPEO["Responsables_Pacifico"])
+
+Las llaves se normalizan (strip + mayúsculas) al cargar el módulo, y la
+asignación sobre un DataFrame completo es un único `map` sobre las llaves
+normalizadas. Las entradas repetidas o en conflicto del mapeo se informan
+una sola vez, al compilar las tablas.
+"""
+
+import pandas as pd
+
+from src.app.domain.Comun.normalizacion import normalizar
+from src.app.repository.mapping_repository import MAPEO
+
+# Separador para unir (Linea, Producto) en una sola llave de texto
+_SEP = "\x1f"
+
+
+def _normalizar(valor) -> str:
+    return str(valor).strip().upper()
+
+
+def _normalizar_serie(serie: pd.Series) -> pd.Series:
+    """`_normalizar` sobre toda la columna, una sola vez por valor distinto."""
+    return normalizar(serie, mayusculas=True, nulos_como_texto=True)
+
+
+def _compilar_rimac(responsables: dict):
+    """
+    CATEGORÍA normalizada → responsable. Si una categoría aparece en varios
+    responsables gana el primero (mismo orden que el recorrido original).
+    Las categorías del mapeo también se recortan (strip): antes solo se
+    pasaban a mayúsculas, y una con espacios sobrantes nunca coincidía.
+    """
+    tabla = {}
+    avisos = []
+    for responsable, categorias in responsables.items():
+        for categoria in categorias:
+            clave = _normalizar(categoria)
+            previo = tabla.get(clave)
+            if previo is None:
+                tabla[clave] = responsable
+            elif previo == responsable:
+                avisos.append(f"Categoría repetida para {responsable}: '{categoria}'")
+            else:
+                avisos.append(
+                    f"Categoría '{categoria}' asignada a {previo} y a {responsable} (se usa {previo})"
+                )
+    return tabla, avisos
+
+
+def _compilar_pacifico(entradas: list):
+    """
+    (Linea, Producto) normalizados → responsable. Si un par se repite gana la
+    última entrada (mismo comportamiento que el dict original).
+    """
+    tabla = {}
+    avisos = []
+    for item in entradas:
+        linea = str(item.get("Linea", ""))
+        producto = str(item.get("Producto", ""))
+        responsable = str(item.get("Responsable", "")).strip()
+        clave = _normalizar(linea) + _SEP + _normalizar(producto)
+        previo = tabla.get(clave)
+        if previo is not None:
+            if previo == responsable:
+                avisos.append(f"Par repetido para {responsable}: ('{linea}', '{producto}')")
+            else:
+                avisos.append(
+                    f"Par ('{linea}', '{producto}') asignado a {previo} y a {responsable} (se usa {responsable})"
+                )
+        tabla[clave] = responsable
+    return tabla, avisos
+
+
+def reportar_avisos_responsables(avisos: list, seccion: str) -> None:
+    """Imprime las entradas duplicadas o en conflicto de una sección de MAPEO."""
+    for aviso in avisos:
+        print(f"[WARN] MAPEO['{seccion}']: {aviso}")
+
+
+TABLA_RESPONSABLES_RIMAC, AVISOS_RESPONSABLES_RIMAC = _compilar_rimac(MAPEO.get("Responsables", {}))
+TABLA_RESPONSABLES_PACIFICO, AVISOS_RESPONSABLES_PACIFICO = _compilar_pacifico(
+    MAPEO.get("Responsables_Pacifico", [])
+)
+reportar_avisos_responsables(AVISOS_RESPONSABLES_RIMAC, "Responsables")
+reportar_avisos_responsables(AVISOS_RESPONSABLES_PACIFICO, "Responsables_Pacifico")
+
+
+# ===================================================================
+# Asignación
+# ===================================================================
+
+def asignar_responsables_rimac(categoria: pd.Series) -> pd.Series:
+    """Responsable para toda la columna CATEGORÍA con un único map."""
+    return _normalizar_serie(categoria).map(TABLA_RESPONSABLES_RIMAC).fillna("")
+
+
+def asignar_responsables_pacifico(linea: pd.Series, producto: pd.Series) -> pd.Series:
+    """Responsable para todas las filas según (Linea de Negocio, Producto) con un único map."""
+    clave = _normalizar_serie(linea) + _SEP + _normalizar_serie(producto)
+    return clave.map(TABLA_RESPONSABLES_PACIFICO).fillna("")
@@ -0,0 +1,207 @@
+"""
+instrumentacion.py
+------------------
+Medición de cada etapa del pipeline y manifiesto de ejecución.
+
+Por etapa se registra:
+  - tiempo de reloj y tiempo de CPU del proceso
+  - pico de memoria residente (RSS)
+  - filas de entrada (archivos leídos y DataFrames recibidos) y de salida
+  - archivos leídos y escritos (ver registro_archivos_repository.py)
+  - estado de caché y error, si lo hubo
+
+El pico de RSS se mide por etapa en Linux (se reinicia con
+/proc/self/clear_refs antes de cada etapa). En otros sistemas se informa el
+pico del proceso completo hasta ese momento (con `resource` o, en Windows,
+con psutil si está instalado); `alcance_rss` indica cuál de los dos es.
+
+Las etapas que corren en procesos hijos se miden dentro del hijo
+(`ejecutar_medido`) y la medición vuelve junto con el resultado.
+"""
+
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from src.app.repository.registro_archivos_repository import iniciar_registro, tomar_registro
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_CLEAR_REFS = "/proc/self/clear_refs"
+_STATUS = "/proc/self/status"
+
+
+@dataclass
+class MedicionEtapa:
+    """Lo medido en una etapa (una entrada del manifiesto)."""
+    etapa: str
+    titulo: str = ""
+    inicio: str = ""
+    segundos: float = 0.0
+    cpu_segundos: float = 0.0
+    pico_rss_mb: float = None
+    alcance_rss: str = ""        # "etapa" | "proceso" | "" (no disponible)
+    filas_entrada: int = None
+    filas_salida: int = None
+    archivos_leidos: list = field(default_factory=list)
+    archivos_escritos: list = field(default_factory=list)
+    paralelo: bool = False       # se ejecutó en un proceso hijo
+    cache: str = ""
+    error: str = ""
+
+
+# ===================================================================
+# Memoria residente
+# ===================================================================
+
+def _reiniciar_pico_rss() -> bool:
+    """Reinicia el pico de RSS del proceso (solo Linux). True si se pudo."""
+    try:
+        with open(_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _pico_rss_linux():
+    try:
+        with open(_STATUS) as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024   # kB → MB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _pico_rss_proceso():
+    """Pico de RSS del proceso desde su inicio, en MB (None si no se puede medir)."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa kB y macOS bytes
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    return None
+
+
+def _filas(valor):
+    """Filas de un DataFrame (None si no es un DataFrame)."""
+    return len(valor) if hasattr(valor, "columns") else None
+
+
+# ===================================================================
+# Medición
+# ===================================================================
+
+@contextmanager
+def medir_etapa(etapa: str, titulo: str = "", kwargs: dict = None):
+    """
+    Mide el bloque como la etapa `etapa`. Entrega la MedicionEtapa para que
+    el llamador anote el resultado con `anotar_resultado`; al salir completa
+    tiempos, memoria y archivos.
+    """
+    medicion = MedicionEtapa(etapa, titulo, inicio=datetime.now().isoformat(timespec="seconds"))
+    iniciar_registro()
+    por_etapa = _reiniciar_pico_rss()
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield medicion
+    except Exception as e:
+        medicion.error = medicion.error or str(e)
+        raise
+    finally:
+        medicion.segundos = round(time.perf_counter() - inicio, 3)
+        medicion.cpu_segundos = round(time.process_time() - inicio_cpu, 3)
+
+        pico = _pico_rss_linux() if por_etapa else None
+        if pico is not None:
+            medicion.alcance_rss = "etapa"
+        else:
+            pico = _pico_rss_proceso()
+            medicion.alcance_rss = "proceso" if pico is not None else ""
+        medicion.pico_rss_mb = round(pico, 1) if pico is not None else None
+
+        leidos, escritos = tomar_registro()
+        medicion.archivos_leidos = leidos
+        medicion.archivos_escritos = escritos
+
+        filas = [f["filas"] for f in leidos if f["filas"] is not None]
+        filas += [n for n in (_filas(v) for v in (kwargs or {}).values()) if n is not None]
+        medicion.filas_entrada = sum(filas) if filas else None
+
+
+def anotar_resultado(medicion: MedicionEtapa, resultado) -> None:
+    medicion.filas_salida = _filas(resultado)
+
+
+def ejecutar_medido(funcion, etapa: str, **kwargs):
+    """
+    Ejecuta `funcion(**kwargs)` midiéndola; pensada para procesos hijos.
+    Devuelve (resultado, medición como dict).
+    """
+    with medir_etapa(etapa, kwargs=kwargs) as medicion:
+        medicion.paralelo = True
+        resultado = funcion(**kwargs)
+        anotar_resultado(medicion, resultado)
+    return resultado, asdict(medicion)
+
+
+# ===================================================================
+# Manifiesto
+# ===================================================================
+
+def construir_manifiesto(mediciones: list, inicio: datetime, opciones: dict = None, arranque: float = None) -> dict:
+    """
+    Manifiesto de la ejecución: entorno, opciones y una entrada por etapa.
+    `arranque` es el tiempo desde que arrancó el proceso hasta la primera etapa.
+    """
+    import pandas as pd
+
+    fin = datetime.now()
+    return {
+        "inicio": inicio.isoformat(timespec="seconds"),
+        "fin": fin.isoformat(timespec="seconds"),
+        "segundos": round((fin - inicio).total_seconds(), 3),
+        "arranque_segundos": round(arranque, 3) if arranque is not None else None,
+        "pico_rss_mb": _redondear(_pico_rss_proceso()),
+        "entorno": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "sistema": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "opciones": opciones or {},
+        "etapas": [asdict(m) if isinstance(m, MedicionEtapa) else m for m in mediciones],
+    }
+
+
+def _redondear(valor):
+    return round(valor, 1) if valor is not None else None
+
+
+def imprimir_resumen_etapas(mediciones: list) -> None:
+    """Tabla de tiempos, memoria y filas por etapa."""
+    if not mediciones:
+        return
+    print("\n[TIEMPOS] Resumen por etapa:")
+    for m in mediciones:
+        m = asdict(m) if isinstance(m, MedicionEtapa) else m
+        pico = f"{m['pico_rss_mb']:>8.1f} MB" if m["pico_rss_mb"] is not None else f"{'-':>11}"
+        filas = f"{m['filas_entrada'] if m['filas_entrada'] is not None else '-':>9} → {m['filas_salida'] if m['filas_salida'] is not None else '-':<9}"
+        estado = " [ERROR]" if m["error"] else ""
+        print(f"   {m['etapa']:<22} {m['segundos']:>8.2f} s  cpu {m['cpu_segundos']:>8.2f} s  rss {pico}  filas {filas}{estado}")
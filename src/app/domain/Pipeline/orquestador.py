@@ -0,0 +1,535 @@
+"""
+orquestador.py
+--------------
+Orquestador del pipeline de validaciones.
+
+Modela las etapas (preparaciones e integraciones) como un grafo de
+dependencias. Cada preparación se ejecuta UNA sola vez por invocación y su
+DataFrame preparado se entrega en memoria a todas las integraciones que lo
+necesitan, en lugar de que cada integración vuelva a preparar y releer
+SICS y SharePoint.
+
+GRAFO:
+  sics ─────────┬──► integracion_rimac ◄── rimac
+  sharepoint ───┤
+                └──► integracion_pacifico ◄── pacifico, anulados (opcional)
+
+Las preparaciones declaran sus archivos de entrada (elegidos desde el
+catálogo de entradas, ver catalogo_repository.py) y su sección de MAPEO;
+si ninguno cambió desde la última ejecución, su resultado se recupera de la
+caché de etapas (ver cache_repository.py) salvo que se fuerce el recálculo.
+SICS y SharePoint además alimentan el índice de pólizas (ver
+indice_polizas_repository.py): si está vigente para sus archivos de
+entrada, la etapa no se prepara ni se lee de la caché y las integraciones
+buscan Fin Vig y STATUS RENOVACION directamente en el índice.
+Las preparaciones que sí hay que recalcular se ejecutan en paralelo, en
+procesos separados (ver carga_paralela_repository.py).
+Un proceso de larga duración (ver vigilante.py) puede además conservar los
+resultados de las preparaciones en memoria entre ejecuciones: si la clave de
+sus entradas no cambió, se reutilizan sin leer la caché ni el índice.
+
+Cada etapa se mide (tiempo, CPU, memoria, filas y archivos; ver
+instrumentacion.py) y las mediciones quedan en EjecucionPipeline.mediciones.
+"""
+
+from dataclasses import dataclass, field
+from functools import partial
+from importlib import import_module
+from typing import Callable
+
+from src.app.repository.configuration_repository import (
+    get_sics_file,
+    get_sharepoint_file,
+    get_rimac_file,
+    get_pacifico_files,
+    INPUT_ANULADOS,
+)
+from src.app.repository.bloques_repository import bloques_activos
+from src.app.repository.catalogo_repository import refrescar_catalogo
+from src.app.repository.cache_repository import (
+    calcular_clave,
+    cargar_etapa,
+    cargar_ultima_etapa,
+    existe_etapa,
+    guardar_etapa,
+)
+from src.app.repository.indice_polizas_repository import abrir_indice, indice_disponible, indice_vigente
+from src.app.repository.lectura_repository import COLUMNAS_REQUERIDAS, lectura_completa_activa
+from src.app.repository.carga_paralela_repository import ejecutar_en_paralelo, workers_configurados
+from src.app.repository.persistencia_repository import persistencia_activa
+from src.app.repository.registro_archivos_repository import iniciar_registro, tomar_registro
+from src.app.domain.Integracion.busqueda_polizas import indexar_fuente
+from src.app.domain.Pipeline.instrumentacion import (
+    MedicionEtapa,
+    anotar_resultado,
+    ejecutar_medido,
+    imprimir_resumen_etapas,
+    medir_etapa,
+)
+
+
+@dataclass(frozen=True)
+class FuncionDiferida:
+    """
+    Función de etapa que se importa recién al ejecutarse: ejecutar solo
+    `prep sics` no carga los módulos de las integraciones. Se puede enviar
+    a los procesos hijos (solo guarda el módulo y el nombre).
+    """
+    modulo: str
+    nombre: str
+
+    def __call__(self, **kwargs):
+        return getattr(import_module(self.modulo), self.nombre)(**kwargs)
+
+
+@dataclass
+class Etapa:
+    """Nodo del grafo: una función y las etapas de las que depende."""
+    nombre: str
+    titulo: str
+    funcion: Callable
+    dependencias: tuple = ()
+    argumento: str = ""          # nombre del parámetro con el que se entrega su resultado
+    opcionales: tuple = field(default_factory=tuple)  # dependencias cuyo fallo no bloquea
+    entradas: Callable = None    # devuelve los archivos de entrada; None = etapa no cacheable
+    seccion_mapeo: str = ""      # sección de MAPEO que forma parte de la clave de caché
+    indice: str = ""             # columna que se guarda en el índice de pólizas ("" = sin índice)
+    por_bloques: bool = False    # admite el modo por bloques (su resultado es una BaseEnBloques)
+    copias: Callable = None      # escribe las copias opcionales en disco de un resultado que no se preparó ahora
+
+
+@dataclass
+class EjecucionPipeline:
+    """Resultado de una ejecución: DataFrames por etapa, estado de la caché y mediciones."""
+    resultados: dict = field(default_factory=dict)
+    cache: dict = field(default_factory=dict)   # etapa -> "HIT" | "MISS" | "FORZADA" | "ÍNDICE" | "ÚLTIMO" | "MEMORIA" | "SIN CACHÉ"
+    mediciones: dict = field(default_factory=dict)   # etapa -> MedicionEtapa
+
+
+_BASICOS = "src.app.domain.Basicos"
+_INTEGRACION = "src.app.domain.Integracion"
+
+ETAPAS = {
+    "sics": Etapa(
+        "sics", "Preparación de datos SICS", FuncionDiferida(f"{_BASICOS}.sics", "preparar_sics"),
+        argumento="sics_df", entradas=lambda: [get_sics_file()], seccion_mapeo="Tablero_SICS",
+        indice="Fin Vig",
+        copias=FuncionDiferida(f"{_BASICOS}.sics", "guardar_copias"),
+    ),
+    "sharepoint": Etapa(
+        "sharepoint", "Preparación de datos SharePoint", FuncionDiferida(f"{_BASICOS}.sharepoint", "preparar_sharepoint"),
+        argumento="share_df", entradas=lambda: [get_sharepoint_file()], seccion_mapeo="Tablero_Sharepoint",
+        indice="STATUS RENOVACION",
+        copias=FuncionDiferida(f"{_BASICOS}.sharepoint", "guardar_copias"),
+    ),
+    "rimac": Etapa(
+        "rimac", "Preparación de datos Rimac", FuncionDiferida(f"{_BASICOS}.rimac", "preparar_rimac"),
+        argumento="rimac_df", entradas=lambda: [get_rimac_file()], seccion_mapeo="Tablero_RIMAC",
+        copias=FuncionDiferida(f"{_BASICOS}.rimac", "guardar_copias"),
+    ),
+    "pacifico": Etapa(
+        "pacifico", "Preparación de datos Pacífico", FuncionDiferida(f"{_BASICOS}.pacifico", "preparar_pacifico"),
+        argumento="pac_df", entradas=get_pacifico_files, seccion_mapeo="tablero_PACIFICO",
+        por_bloques=True, copias=FuncionDiferida(f"{_BASICOS}.pacifico", "guardar_copias"),
+    ),
+    "anulados": Etapa(
+        "anulados", "Preparación de Anulados", FuncionDiferida(f"{_BASICOS}.anulados", "preparar_anulados"),
+        argumento="anul_df", entradas=lambda: [INPUT_ANULADOS], seccion_mapeo="Anulados",
+        copias=FuncionDiferida(f"{_BASICOS}.anulados", "guardar_copias"),
+    ),
+    "integracion_rimac": Etapa(
+        "integracion_rimac",
+        "Integración Rimac",
+        FuncionDiferida(f"{_INTEGRACION}.integracion_rimac", "integracion_rimac"),
+        dependencias=("sics", "sharepoint", "rimac"),
+    ),
+    "integracion_pacifico": Etapa(
+        "integracion_pacifico",
+        "Integración Pacífico",
+        FuncionDiferida(f"{_INTEGRACION}.integracion_pacifico", "integracion_pacifico"),
+        dependencias=("sics", "sharepoint", "pacifico", "anulados"),
+        opcionales=("anulados",),
+    ),
+}
+
+OBJETIVOS_POR_DEFECTO = ("integracion_rimac", "integracion_pacifico")
+
+
+# ===================================================================
+# Resolución del grafo
+# ===================================================================
+
+def ordenar_etapas(objetivos, etapas: dict = None) -> list:
+    """
+    Devuelve los nombres de etapa necesarios para los objetivos en orden
+    topológico (cada dependencia antes que quien la usa, sin repetir).
+    Lanza ValueError si hay una etapa desconocida o un ciclo.
+    """
+    etapas = etapas or ETAPAS
+    orden = []
+    visitando = set()
+
+    def visitar(nombre):
+        if nombre in orden:
+            return
+        if nombre not in etapas:
+            raise ValueError(f"Etapa desconocida: {nombre}")
+        if nombre in visitando:
+            raise ValueError(f"Ciclo de dependencias en la etapa: {nombre}")
+        visitando.add(nombre)
+        for dep in etapas[nombre].dependencias:
+            visitar(dep)
+        visitando.discard(nombre)
+        orden.append(nombre)
+
+    for objetivo in objetivos:
+        visitar(objetivo)
+    return orden
+
+
+def _es_fallo(resultado) -> bool:
+    """Una preparación falla si no devuelve datos (None o DataFrame vacío)."""
+    if resultado is None:
+        return True
+    return bool(getattr(resultado, "empty", False))
+
+
+# ===================================================================
+# Caché de etapas
+# ===================================================================
+
+def _clave_etapa(etapa: Etapa):
+    """Clave de caché de la etapa, o None si no es cacheable o faltan sus entradas."""
+    if etapa.entradas is None:
+        return None
+    try:
+        # La proyección de columnas (y sus tipos) también cambia el resultado de la etapa
+        proyeccion = None if lectura_completa_activa() else COLUMNAS_REQUERIDAS.get(etapa.nombre)
+        # En modo por bloques el resultado es otro (bloques en disco, no un DataFrame)
+        variante = "bloques" if etapa.por_bloques and bloques_activos() else None
+        return calcular_clave(etapa.entradas(), etapa.seccion_mapeo, proyeccion, variante, fuente=etapa.nombre)
+    except Exception:
+        return None
+
+
+def _buscar_en_cache(etapa: Etapa):
+    """Resultado cacheado de la etapa si sus entradas no cambiaron, o None."""
+    clave = _clave_etapa(etapa)
+    if clave is None:
+        return None
+    cacheado = cargar_etapa(etapa.nombre, clave)
+    if cacheado is not None and not getattr(cacheado, "vigente", True):
+        print(f"[WARN] Los bloques de '{etapa.titulo}' ya no están en disco: se recalcula")
+        return None
+    if cacheado is not None:
+        print(f"[CACHE] Entradas sin cambios: se reutiliza '{etapa.titulo}' ({len(cacheado)} filas)")
+    return cacheado
+
+
+def _guardar_en_cache(etapa: Etapa, resultado) -> None:
+    # La clave se calcula DESPUÉS de ejecutar: algunas preparaciones reescriben
+    # su archivo de entrada, y la próxima ejecución verá ese estado.
+    if not _es_fallo(resultado):
+        clave = _clave_etapa(etapa)
+        if clave is not None:
+            guardar_etapa(etapa.nombre, clave, resultado)
+            _actualizar_indice(etapa, clave, resultado)
+
+
+def _indice_vigente(etapa: Etapa, forzar: bool) -> bool:
+    """
+    True si la etapa alimenta el índice de pólizas y este corresponde a sus
+    entradas actuales. Con --persist-prepared no se usa: la copia del
+    preparado necesita el DataFrame completo (de la caché o de la preparación).
+    """
+    if etapa.copias is not None and persistencia_activa():
+        return False
+    return bool(etapa.indice) and not forzar and indice_vigente(etapa.nombre, _clave_etapa(etapa))
+
+
+def _actualizar_indice(etapa: Etapa, clave: str, resultado) -> None:
+    if etapa.indice and not indice_vigente(etapa.nombre, clave):
+        indexar_fuente(etapa.nombre, clave, resultado, etapa.indice)
+
+
+def _ejecutar_con_cache(etapa: Etapa, kwargs: dict, forzar: bool):
+    """
+    Ejecuta la etapa o recupera su resultado del índice de pólizas o de la
+    caché. Devuelve (resultado, estado).
+    """
+    if etapa.entradas is None:
+        return etapa.funcion(**kwargs), "SIN CACHÉ"
+
+    if _indice_vigente(etapa, forzar):
+        indice = abrir_indice(etapa.nombre)
+        print(f"[INDICE] Entradas sin cambios: '{etapa.titulo}' se consulta en el índice de pólizas ({len(indice)} filas)")
+        return indice, "ÍNDICE"
+
+    if not forzar:
+        cacheado = _buscar_en_cache(etapa)
+        if cacheado is not None:
+            # Un índice borrado o desactualizado se reconstruye desde la caché
+            _actualizar_indice(etapa, _clave_etapa(etapa), cacheado)
+            _guardar_copias(etapa, cacheado)
+            return cacheado, "HIT"
+
+    resultado = etapa.funcion(**kwargs)
+    _guardar_en_cache(etapa, resultado)
+    return resultado, "FORZADA" if forzar else "MISS"
+
+
+def _desde_memoria(etapa: Etapa, memoria: dict, forzar: bool):
+    """Resultado conservado en `memoria` ({etapa: (clave, resultado)}) si sus entradas no cambiaron, o None."""
+    if memoria is None or forzar or etapa.nombre not in memoria:
+        return None
+    clave, resultado = memoria[etapa.nombre]
+    if clave is None or clave != _clave_etapa(etapa):
+        return None
+    print(f"[MEMORIA] Entradas sin cambios: se reutiliza '{etapa.titulo}' ({len(resultado)} filas)")
+    return resultado
+
+
+def preparaciones_modificadas(nombres, memoria: dict, etapas: dict = None) -> list:
+    """Preparaciones de `nombres` cuyas entradas cambiaron respecto de lo conservado en `memoria`."""
+    etapas = etapas or ETAPAS
+    return [
+        n for n in nombres
+        if n not in memoria or memoria[n][0] is None or memoria[n][0] != _clave_etapa(etapas[n])
+    ]
+
+
+def _ultimo_resultado(etapa: Etapa):
+    """
+    Último resultado guardado de la preparación (índice de pólizas o caché),
+    sin revisar si sus archivos de entrada cambiaron.
+    """
+    if etapa.indice and indice_disponible(etapa.nombre):
+        indice = abrir_indice(etapa.nombre)
+        print(f"[INDICE] Se omite la preparación: '{etapa.titulo}' se consulta en el último índice ({len(indice)} filas)")
+        return indice
+    resultado = cargar_ultima_etapa(etapa.nombre)
+    if resultado is None or not getattr(resultado, "vigente", True):
+        raise RuntimeError(f"no hay un resultado anterior de '{etapa.titulo}'; ejecute antes la preparación")
+    print(f"[CACHE] Se omite la preparación: se usa el último resultado de '{etapa.titulo}' ({len(resultado)} filas)")
+    _guardar_copias(etapa, resultado)
+    return resultado
+
+
+def _guardar_copias(etapa: Etapa, resultado) -> None:
+    """
+    Copias opcionales en disco (--persist-prepared, --audit-xlsx) de un
+    resultado que no salió de ejecutar la etapa: la preparación las escribe
+    sola, la caché no.
+    """
+    if etapa.copias is None:
+        return
+    try:
+        etapa.copias(resultado=resultado)
+    except Exception as e:
+        print(f"[WARN] No se pudieron guardar las copias de '{etapa.titulo}': {e}")
+
+
+# ===================================================================
+# Ejecución en procesos separados
+# ===================================================================
+
+def _nivel_etapas(orden: list, etapas: dict) -> dict:
+    """Profundidad de cada etapa en el grafo (0 = sin dependencias)."""
+    nivel = {}
+    for nombre in orden:
+        deps = etapas[nombre].dependencias
+        nivel[nombre] = 1 + max(nivel[d] for d in deps) if deps else 0
+    return nivel
+
+
+def _ejecutar_en_procesos(nombres: list, etapas: dict, kwargs_por_etapa: dict, forzar: bool, memoria: dict = None) -> dict:
+    """
+    Ejecuta juntas, en procesos separados, las etapas indicadas que no se
+    pueden recuperar de la caché. Devuelve {nombre: (resultado, estado, salida, error, medicion)};
+    las etapas que no aparecen se ejecutan en serie en el recorrido normal.
+    Cada etapa se mide dentro de su proceso hijo.
+    """
+    pendientes = {}
+    for nombre in nombres:
+        etapa = etapas[nombre]
+        if etapa.entradas is not None:
+            clave = None if forzar else _clave_etapa(etapa)
+            if clave is not None and (
+                existe_etapa(nombre, clave)
+                or _indice_vigente(etapa, forzar)
+                or (memoria or {}).get(nombre, (None,))[0] == clave
+            ):
+                continue
+        pendientes[nombre] = (partial(ejecutar_medido, etapa.funcion, nombre), kwargs_por_etapa.get(nombre, {}))
+    if len(pendientes) < 2 or workers_configurados() <= 1:
+        return {}
+
+    print(f"\n[INFO] Ejecutando en paralelo: {', '.join(pendientes)} ({min(len(pendientes), workers_configurados())} procesos)")
+    ejecutadas = ejecutar_en_paralelo(pendientes)
+
+    precargadas = {}
+    for nombre, (medido, salida, error) in ejecutadas.items():
+        etapa = etapas[nombre]
+        if error:
+            resultado, medicion = None, MedicionEtapa(nombre, paralelo=True, error=error)
+        else:
+            resultado, datos = medido
+            medicion = MedicionEtapa(**datos)
+        medicion.titulo = etapa.titulo
+
+        if etapa.entradas is None:
+            estado = "SIN CACHÉ"
+        else:
+            estado = "FORZADA" if forzar else "MISS"
+            if not error:
+                # La caché se escribe aquí, en el proceso principal
+                iniciar_registro()
+                _guardar_en_cache(etapa, resultado)
+                medicion.archivos_escritos += tomar_registro()[1]
+        precargadas[nombre] = (resultado, estado, salida, error, medicion)
+    return precargadas
+
+
+def imprimir_reporte_cache(ejecucion: EjecucionPipeline) -> None:
+    """Muestra qué etapas se recuperaron de la caché y cuáles se recalcularon."""
+    if not ejecucion.cache:
+        return
+    print("\n[CACHE] Resumen de etapas:")
+    for nombre, estado in ejecucion.cache.items():
+        print(f"   {nombre:<22} → {estado}")
+
+
+# ===================================================================
+# Ejecución
+# ===================================================================
+
+def _bloqueantes(etapa: Etapa, fallidas: set) -> list:
+    return [d for d in etapa.dependencias if d in fallidas and d not in etapa.opcionales]
+
+
+def _argumentos(etapa: Etapa, etapas: dict, resultados: dict, fallidas: set) -> dict:
+    """Resultados de las dependencias, con el nombre de parámetro que espera la etapa."""
+    return {
+        etapas[d].argumento: resultados.get(d)
+        for d in etapa.dependencias
+        if etapas[d].argumento and d not in fallidas
+    }
+
+
+def ejecutar_pipeline(
+    objetivos=OBJETIVOS_POR_DEFECTO,
+    etapas: dict = None,
+    forzar: bool = False,
+    concurrente: bool = False,
+    omitir_preparaciones: bool = False,
+    memoria: dict = None,
+) -> EjecucionPipeline:
+    """
+    Ejecuta las etapas necesarias para los objetivos indicados.
+
+    - Cada etapa se ejecuta como máximo una vez.
+    - El resultado de cada preparación se pasa en memoria a sus dependientes.
+    - Las preparaciones cuyas entradas no cambiaron se recuperan de la caché,
+      salvo que `forzar` sea True.
+    - Las preparaciones sin dependencias que hay que recalcular se ejecutan
+      juntas en procesos separados (ver configurar_workers); su salida se
+      muestra luego en el orden normal de etapas.
+    - Con `concurrente`, primero se resuelven todas las preparaciones y luego
+      las etapas de un mismo nivel (las integraciones Rimac y Pacífico) se
+      ejecutan a la vez en procesos separados; la salida de cada una se
+      muestra como un bloque continuo.
+    - Si una dependencia obligatoria falla, las etapas que la usan se omiten;
+      el resto del grafo sigue ejecutándose (aislamiento de errores).
+    - Con `omitir_preparaciones`, las preparaciones no se ejecutan: se usa su
+      último resultado guardado (índice de pólizas o caché) aunque sus
+      archivos de entrada hayan cambiado.
+    - `memoria` ({etapa: (clave, resultado)}) conserva los resultados de las
+      preparaciones entre llamadas: las que no cambiaron se reutilizan desde
+      ahí y las recalculadas lo actualizan.
+
+    Devuelve un EjecucionPipeline con {nombre_etapa: resultado} (None para
+    etapas fallidas u omitidas) y el estado de caché de cada preparación.
+    """
+    etapas = etapas or ETAPAS
+    orden = ordenar_etapas(objetivos, etapas)
+    nivel = _nivel_etapas(orden, etapas)
+    # Las carpetas de entrada se recorren una vez por ejecución
+    refrescar_catalogo()
+    if concurrente:
+        # Por niveles: todas las preparaciones antes que cualquier integración
+        orden.sort(key=lambda n: nivel[n])
+    ejecucion = EjecucionPipeline()
+    resultados = ejecucion.resultados
+    fallidas = set()
+    niveles_lanzados = set()
+    precargadas = {} if omitir_preparaciones else _ejecutar_en_procesos(
+        [n for n in orden if nivel[n] == 0 and etapas[n].entradas is not None], etapas, {}, forzar, memoria
+    )
+
+    for i, nombre in enumerate(orden, start=1):
+        etapa = etapas[nombre]
+        if concurrente and nivel[nombre] > 0 and nivel[nombre] not in niveles_lanzados:
+            niveles_lanzados.add(nivel[nombre])
+            # Lanza a la vez esta etapa y las demás del mismo nivel (sus
+            # dependencias ya están resueltas porque el orden es por niveles)
+            lote = [
+                n for n in orden[i - 1:]
+                if nivel[n] == nivel[nombre] and not _bloqueantes(etapas[n], fallidas)
+            ]
+            precargadas.update(_ejecutar_en_procesos(
+                lote,
+                etapas,
+                {n: _argumentos(etapas[n], etapas, resultados, fallidas) for n in lote},
+                forzar,
+            ))
+
+        print(f"\n[ETAPA {i}/{len(orden)}] {etapa.titulo}")
+        print("-" * 70)
+
+        bloqueantes = _bloqueantes(etapa, fallidas)
+        if bloqueantes:
+            print(f"[ERROR] Se omite '{etapa.titulo}': fallaron las etapas {bloqueantes}")
+            resultados[nombre] = None
+            fallidas.add(nombre)
+            ejecucion.mediciones[nombre] = MedicionEtapa(
+                nombre, etapa.titulo, error=f"omitida: fallaron las etapas {bloqueantes}"
+            )
+            continue
+
+        kwargs = _argumentos(etapa, etapas, resultados, fallidas)
+        estado = ""
+
+        try:
+            if nombre in precargadas:
+                resultado, estado, salida, error, medicion = precargadas[nombre]
+                print(salida, end="")
+                if error:
+                    raise RuntimeError(error)
+            else:
+                with medir_etapa(nombre, etapa.titulo, kwargs) as medicion:
+                    resultado = _desde_memoria(etapa, memoria, forzar) if etapa.entradas is not None else None
+                    if resultado is not None:
+                        estado = "MEMORIA"
+                    elif omitir_preparaciones and etapa.entradas is not None:
+                        resultado, estado = _ultimo_resultado(etapa), "ÚLTIMO"
+                    else:
+                        resultado, estado = _ejecutar_con_cache(etapa, kwargs, forzar)
+                    anotar_resultado(medicion, resultado)
+            if etapa.entradas is not None:
+                ejecucion.cache[nombre] = estado
+        except Exception as e:
+            print(f"[ERROR] Ocurrió un error en '{etapa.titulo}': {e}")
+            resultado = None
+
+        resultados[nombre] = resultado
+        if _es_fallo(resultado):
+            fallidas.add(nombre)
+            medicion.error = medicion.error or "la etapa no devolvió datos"
+        elif memoria is not None and etapa.entradas is not None and estado not in ("MEMORIA", "ÚLTIMO"):
+            memoria[nombre] = (_clave_etapa(etapa), resultado)
+        medicion.cache = estado if etapa.entradas is not None else ""
+        ejecucion.mediciones[nombre] = medicion
+
+    imprimir_reporte_cache(ejecucion)
+    imprimir_resumen_etapas(list(ejecucion.mediciones.values()))
+    return ejecucion
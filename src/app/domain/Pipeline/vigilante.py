@@ -0,0 +1,235 @@
+"""
+vigilante.py
+------------
+Modo vigilancia: proceso de larga duración que observa las carpetas de
+entrada y vuelve a ejecutar solo las integraciones afectadas cuando llega
+un export nuevo (`python src/main.py watch`).
+
+  1. Detección: con watchdog (inotify en Linux) si está instalado; si no,
+     o con `sondeo=True`, recorriendo las carpetas cada `intervalo` segundos.
+  2. Espera de archivos completos: un archivo se procesa cuando su tamaño
+     y fecha no cambiaron durante `espera` segundos y ya se pueden leer sus
+     hojas (un .xlsx copiado a medias todavía no es un zip válido). Los
+     archivos de bloqueo de Excel (~$...) se ignoran. Las carpetas y la
+     fuente de cada archivo son las del catálogo de entradas.
+  3. Cada carpeta corresponde a una preparación; si la clave de sus entradas
+     no cambió (p. ej. el propio proceso reescribió el archivo) no se hace
+     nada. Si cambió, se ejecutan solo las integraciones que dependen de ella.
+  4. Los resultados de las preparaciones se conservan en memoria entre
+     ejecuciones (ver `memoria` en orquestador.ejecutar_pipeline): solo se
+     vuelve a preparar la fuente que cambió.
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.app.repository.catalogo_repository import (
+    CARPETAS_ENTRADA,
+    escanear_entradas,
+    fuente_de,
+    hojas,
+    refrescar_catalogo,
+)
+from src.app.domain.Pipeline.orquestador import (
+    OBJETIVOS_POR_DEFECTO,
+    ejecutar_pipeline,
+    ordenar_etapas,
+    preparaciones_modificadas,
+)
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+# Eventos de watchdog que indican un cambio de contenido (se ignoran "opened" y
+# "closed_no_write": el propio proceso abre los archivos para calcular su huella)
+_EVENTOS_DE_CAMBIO = {"created", "modified", "moved", "deleted", "closed"}
+
+INTERVALO_POR_DEFECTO = 1.0   # segundos entre revisiones
+ESPERA_POR_DEFECTO = 2.0      # segundos sin cambios para dar un archivo por completo
+
+
+def integraciones_afectadas(preparaciones, objetivos) -> list:
+    """Objetivos (integraciones) que dependen de alguna de las preparaciones indicadas."""
+    return [o for o in objetivos if set(ordenar_etapas([o])) & set(preparaciones)]
+
+
+# ===================================================================
+# Detección de cambios
+# ===================================================================
+
+def _firma(ruta: Path):
+    """(tamaño, mtime) del archivo, o None si no existe."""
+    try:
+        stat = ruta.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _foto_carpetas() -> dict:
+    """{ruta: firma} de los archivos de entrada de todas las carpetas vigiladas."""
+    return {archivo.ruta: archivo.firma for archivo in escanear_entradas().archivos}
+
+
+class _SondeoCarpetas:
+    """Detecta archivos nuevos, modificados o borrados comparando fotos de las carpetas."""
+    descripcion = "sondeo de carpetas"
+
+    def __init__(self):
+        self._foto = _foto_carpetas()
+
+    def cambios(self) -> set:
+        foto = _foto_carpetas()
+        cambiados = {r for r in foto.keys() | self._foto.keys() if foto.get(r) != self._foto.get(r)}
+        self._foto = foto
+        return cambiados
+
+    def detener(self) -> None:
+        pass
+
+
+class _EventosWatchdog:
+    """Acumula las rutas de los eventos de watchdog (inotify) hasta que se piden."""
+    descripcion = "watchdog"
+
+    def __init__(self):
+        self._rutas = set()
+        self._lock = threading.Lock()
+        self._observer = Observer()
+        for carpeta in CARPETAS_ENTRADA:
+            if carpeta.is_dir():
+                self._observer.schedule(self, str(carpeta), recursive=False)
+            else:
+                print(f"[WARN] No existe la carpeta de entrada {carpeta}: no se vigila")
+        self._observer.start()
+
+    def dispatch(self, evento) -> None:
+        # watchdog llama a dispatch() del manejador con cada evento
+        if evento.is_directory or evento.event_type not in _EVENTOS_DE_CAMBIO:
+            return
+        with self._lock:
+            self._rutas.add(Path(evento.src_path))
+            if getattr(evento, "dest_path", ""):
+                self._rutas.add(Path(evento.dest_path))
+
+    def cambios(self) -> set:
+        with self._lock:
+            rutas, self._rutas = self._rutas, set()
+        return rutas
+
+    def detener(self) -> None:
+        self._observer.stop()
+        self._observer.join()
+
+
+def _crear_detector(sondeo: bool):
+    if not sondeo and Observer is not None:
+        try:
+            return _EventosWatchdog()
+        except Exception as e:
+            print(f"[WARN] No se pudo iniciar watchdog, se usa sondeo de carpetas: {e}")
+    return _SondeoCarpetas()
+
+
+class _Pendientes:
+    """Archivos cambiados que esperan a terminar de copiarse."""
+
+    def __init__(self):
+        self._firmas = {}     # ruta -> (firma, momento del último cambio)
+        self.desde = None     # momento en que se detectó el primer cambio del lote
+
+    def registrar(self, rutas) -> None:
+        ahora = time.monotonic()
+        for ruta in rutas:
+            self._firmas[ruta] = (_firma(ruta), ahora)
+            self.desde = self.desde or ahora
+
+    def listos(self, espera: float):
+        """
+        Rutas del lote si todas están estables hace `espera` segundos (o fueron
+        borradas); si no, None. Devolverlas vacía el lote.
+        """
+        if not self._firmas:
+            return None
+        ahora = time.monotonic()
+        listo = True
+        for ruta, (firma, momento) in list(self._firmas.items()):
+            actual = _firma(ruta)
+            if actual != firma:
+                self._firmas[ruta] = (actual, ahora)
+                listo = False
+            elif actual is not None and (ahora - momento < espera or not hojas(ruta)):
+                listo = False
+        if not listo:
+            return None
+        rutas = set(self._firmas)
+        self._firmas.clear()
+        return rutas
+
+
+# ===================================================================
+# Bucle principal
+# ===================================================================
+
+def vigilar(
+    objetivos=OBJETIVOS_POR_DEFECTO,
+    forzar: bool = False,
+    concurrente: bool = False,
+    intervalo: float = INTERVALO_POR_DEFECTO,
+    espera: float = ESPERA_POR_DEFECTO,
+    sondeo: bool = False,
+    al_terminar=None,
+) -> None:
+    """
+    Ejecuta los objetivos una vez y luego, hasta Ctrl+C, los vuelve a ejecutar
+    (solo los afectados) cada vez que cambia un archivo de entrada.
+    `al_terminar(ejecucion, objetivos, inicio)` se llama después de cada ejecución.
+    """
+    memoria = {}
+    vigiladas = set(ordenar_etapas(objetivos))
+
+    def ejecutar(afectados, forzar_etapas=False):
+        inicio = datetime.now()
+        ejecucion = ejecutar_pipeline(afectados, forzar=forzar_etapas, concurrente=concurrente, memoria=memoria)
+        if al_terminar is not None:
+            al_terminar(ejecucion, afectados, inicio)
+        return ejecucion
+
+    ejecutar(tuple(objetivos), forzar)
+
+    detector = _crear_detector(sondeo)
+    pendientes = _Pendientes()
+    print(f"\n[INFO] Vigilando las carpetas de entrada ({detector.descripcion}); Ctrl+C para terminar")
+    for carpeta, preparacion in CARPETAS_ENTRADA.items():
+        print(f"   {preparacion:<12} {carpeta}")
+
+    try:
+        while True:
+            time.sleep(intervalo)
+            pendientes.registrar(r for r in detector.cambios() if fuente_de(r))
+            desde = pendientes.desde
+            rutas = pendientes.listos(espera)
+            if rutas is None:
+                continue
+            pendientes.desde = None
+
+            print(f"\n[INFO] {datetime.now():%H:%M:%S} Archivos nuevos o modificados: {', '.join(sorted(r.name for r in rutas))}")
+            # Un archivo nuevo puede cambiar cuál es el más reciente de su fuente
+            refrescar_catalogo()
+            modificadas = preparaciones_modificadas(sorted({fuente_de(r) for r in rutas} & vigiladas), memoria)
+            afectados = integraciones_afectadas(modificadas, objetivos)
+            if not afectados:
+                print("[INFO] El contenido de las entradas no cambió: no se vuelve a ejecutar nada")
+                continue
+
+            print(f"[INFO] Preparaciones modificadas: {', '.join(modificadas)} → se ejecuta: {', '.join(afectados)}")
+            ejecutar(tuple(afectados))
+            print(f"[OK] Reportes actualizados {time.monotonic() - desde:.1f} s después de detectar el cambio")
+    except KeyboardInterrupt:
+        print("\n[INFO] Vigilancia detenida")
+    finally:
+        detector.detener()
@@ -0,0 +1,254 @@
+"""
+bloques_repository.py
+---------------------
+Procesamiento por bloques de filas con memoria acotada (base Pacífico).
+
+En este modo la base Pacífico no se arma completa en memoria: los reportes
+se leen, limpian e integran de a bloques de filas (ver Basicos/pacifico.py
+e Integracion/integracion_pacifico.py). Este módulo reúne:
+
+  - La configuración: filas por bloque y techo de memoria (MB). El modo se
+    activa con `configurar_bloques()` o las variables de entorno
+    GESTOR_FILAS_POR_BLOQUE / GESTOR_MEMORIA_MAXIMA_MB.
+  - `AlmacenBloques`: bloques guardados en disco (pickle, uno por archivo)
+    que se vuelven a leer en orden, de a uno.
+  - `carpeta_bloques`: una carpeta por clave de entradas, para que cada
+    resultado cacheado apunte a sus propios bloques.
+  - `BaseEnBloques`: lo que devuelve la preparación en este modo (carpeta,
+    filas y columnas de la base) en lugar del DataFrame.
+  - `ControlMemoria`: mide la memoria residente del proceso después de cada
+    bloque y reduce el tamaño de los bloques siguientes si se acerca al techo.
+
+El techo vale para el proceso que procesa la base Pacífico; las demás
+preparaciones pueden correr a la vez en otros procesos (ver --workers).
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FILAS_POR_BLOQUE_DEFECTO = 50_000
+FILAS_POR_BLOQUE_MINIMO = 1_000
+
+# Fracción del techo a partir de la cual se achican los bloques
+_UMBRAL_REDUCCION = 0.85
+
+_STATUS = "/proc/self/status"
+
+
+def _entero_positivo(variable: str):
+    try:
+        valor = int(os.environ.get(variable, ""))
+    except ValueError:
+        return None
+    return valor if valor > 0 else None
+
+
+_FILAS_POR_BLOQUE = _entero_positivo("GESTOR_FILAS_POR_BLOQUE")
+_MEMORIA_MAXIMA_MB = _entero_positivo("GESTOR_MEMORIA_MAXIMA_MB")
+
+
+def configurar_bloques(filas_por_bloque: int = None, memoria_maxima_mb: int = None) -> None:
+    """
+    Activa el procesamiento por bloques si se indica alguno de los dos valores
+    (ambos None = desactivado).
+    """
+    global _FILAS_POR_BLOQUE, _MEMORIA_MAXIMA_MB
+    _FILAS_POR_BLOQUE = int(filas_por_bloque) if filas_por_bloque else None
+    _MEMORIA_MAXIMA_MB = int(memoria_maxima_mb) if memoria_maxima_mb else None
+
+
+def configuracion_bloques() -> tuple:
+    """(filas por bloque, techo de memoria en MB) tal como se configuraron."""
+    return _FILAS_POR_BLOQUE, _MEMORIA_MAXIMA_MB
+
+
+def bloques_activos() -> bool:
+    return bool(_FILAS_POR_BLOQUE or _MEMORIA_MAXIMA_MB)
+
+
+def filas_por_bloque() -> int:
+    return max(FILAS_POR_BLOQUE_MINIMO, _FILAS_POR_BLOQUE or FILAS_POR_BLOQUE_DEFECTO)
+
+
+def memoria_maxima_mb():
+    return _MEMORIA_MAXIMA_MB
+
+
+# ===================================================================
+# Memoria del proceso
+# ===================================================================
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso en MB (None si no se puede medir)."""
+    try:
+        with open(_STATUS) as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024   # kB → MB
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    return None
+
+
+class ControlMemoria:
+    """
+    Tamaño de bloque adaptado al techo de memoria: después de cada bloque se
+    mide el RSS y, si supera el umbral, los bloques siguientes usan la mitad
+    de filas (sin bajar de FILAS_POR_BLOQUE_MINIMO).
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.filas = self.filas_iniciales = filas_por_bloque()
+        self.techo = memoria_maxima_mb()
+        self.pico = rss_actual_mb() or 0.0
+        self.excedido = bool(self.techo) and self.pico > self.techo
+        if self.excedido:
+            print(f"[WARN] {nombre}: el proceso ya usa {self.pico:.0f} MB, por encima del techo de {self.techo} MB")
+
+    def revisar(self) -> None:
+        rss = rss_actual_mb()
+        if rss is None:
+            return
+        self.pico = max(self.pico, rss)
+        if not self.techo:
+            return
+        if rss > self.techo * _UMBRAL_REDUCCION and self.filas > FILAS_POR_BLOQUE_MINIMO:
+            gc.collect()
+            self.filas = max(FILAS_POR_BLOQUE_MINIMO, self.filas // 2)
+            print(f"[MEMORIA] {self.nombre}: {rss:.0f} MB de {self.techo} MB, bloques de {self.filas} filas")
+        if rss > self.techo and not self.excedido:
+            self.excedido = True
+            print(f"[WARN] {self.nombre}: el proceso usa {rss:.0f} MB, por encima del techo de {self.techo} MB")
+
+    def resumen(self) -> None:
+        techo = f", techo {self.techo} MB" if self.techo else ""
+        reducidos = f", reducidos a {self.filas}" if self.filas < self.filas_iniciales else ""
+        print(f"[MEMORIA] {self.nombre}: pico de {self.pico:.0f} MB (bloques de {self.filas_iniciales} filas{reducidos}{techo})")
+
+
+# ===================================================================
+# Bloques en disco
+# ===================================================================
+
+class AlmacenBloques:
+    """
+    Bloques (DataFrames) guardados en `carpeta`, uno por archivo, que se
+    leen en el mismo orden en que se agregaron. Con `temporal()` la carpeta
+    se borra al salir del bloque `with`.
+    """
+
+    def __init__(self, carpeta: Path, vaciar: bool = False):
+        self.carpeta = Path(carpeta)
+        if vaciar and self.carpeta.exists():
+            shutil.rmtree(self.carpeta)
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        self.partes = len(list(self.carpeta.glob("parte_*.pkl")))
+        self.filas = 0
+        self._filas_por_parte = []
+        self._temporal = False
+
+    @classmethod
+    def temporal(cls) -> "AlmacenBloques":
+        almacen = cls(tempfile.mkdtemp(prefix="gestor_bloques_"))
+        almacen._temporal = True
+        return almacen
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._temporal:
+            shutil.rmtree(self.carpeta, ignore_errors=True)
+        return False
+
+    def _ruta(self, i: int) -> Path:
+        return self.carpeta / f"parte_{i:05d}.pkl"
+
+    def agregar(self, df: pd.DataFrame) -> None:
+        df.to_pickle(self._ruta(self.partes))
+        self.partes += 1
+        self.filas += len(df)
+        self._filas_por_parte.append(len(df))
+
+    def recortar(self, partes: int) -> None:
+        """Descarta los bloques agregados después de los primeros `partes` (p. ej. de un archivo que falló)."""
+        while self.partes > partes:
+            self.partes -= 1
+            self._ruta(self.partes).unlink(missing_ok=True)
+            self.filas -= self._filas_por_parte.pop() if self._filas_por_parte else 0
+
+    def leer(self):
+        """Bloques en orden, de a uno."""
+        for i in range(self.partes):
+            yield pd.read_pickle(self._ruta(i))
+
+
+def carpeta_bloques(raiz: Path, clave: str, conservar: int) -> Path:
+    """
+    Carpeta de los bloques de una preparación: `raiz/<clave>`. Así una
+    entrada de la caché con otra clave (p. ej. la exportación anterior) no
+    ve bloques reescritos por esta. Se conservan las `conservar` carpetas más
+    recientes (incluida esta) y se borran los bloques sueltos del formato anterior.
+    """
+    raiz = Path(raiz)
+    carpeta = raiz / clave[:16]
+    if raiz.is_dir():
+        otras = sorted(
+            (c for c in raiz.iterdir() if c.is_dir() and c != carpeta),
+            key=lambda c: c.stat().st_mtime_ns, reverse=True,
+        )
+        for vieja in otras[max(conservar - 1, 0):]:
+            shutil.rmtree(vieja, ignore_errors=True)
+        for suelta in raiz.glob("parte_*.pkl"):
+            suelta.unlink(missing_ok=True)
+    return carpeta
+
+
+@dataclass(frozen=True)
+class BaseEnBloques:
+    """
+    Resultado de una preparación por bloques: en lugar del DataFrame, la
+    carpeta con sus bloques (ver AlmacenBloques). Ocupa lo mismo en memoria
+    cualquiera sea el tamaño de la base, y así se pasa entre etapas, procesos
+    y la caché de etapas.
+    """
+    carpeta: Path
+    filas: int
+    columns: tuple   # todas las columnas, en el orden en que aparecen (como pd.concat)
+    partes: int
+
+    def __len__(self) -> int:
+        return self.filas
+
+    @property
+    def empty(self) -> bool:
+        return self.filas == 0
+
+    @property
+    def vigente(self) -> bool:
+        """True si los bloques siguen en disco (ver carpeta_bloques: se descartan las carpetas viejas)."""
+        return self.carpeta.is_dir() and len(list(self.carpeta.glob("parte_*.pkl"))) == self.partes
+
+    def bloques(self):
+        """Bloques en orden, de a uno, con todas las columnas de la base."""
+        almacen = AlmacenBloques(self.carpeta)
+        for bloque in almacen.leer():
+            yield bloque.reindex(columns=list(self.columns))
+
+    def to_pickle(self, ruta) -> None:
+        # Para la caché de etapas (guardar_etapa): se guarda el manejador, no los datos
+        pd.to_pickle(self, ruta)
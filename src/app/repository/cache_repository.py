@@ -0,0 +1,165 @@
+"""
+cache_repository.py
+-------------------
+Caché de etapas de preparación basada en la huella (fingerprint) de sus entradas.
+
+La clave de cada etapa combina:
+  - la huella de cada archivo de entrada (tamaño, mtime y hash SHA-256 del
+    contenido; ver catalogo_repository.huella_archivo, que no vuelve a leer
+    un archivo que no cambió)
+  - la sección de MAPEO que usa la etapa
+  - las columnas que lee y sus tipos (MAPEO["Columnas_Requeridas"]), o
+    ninguna restricción en lectura completa
+  - su plan de columnas categóricas (MAPEO["Columnas_Categoricas"])
+  - la versión del código de preparación: un hash de las fuentes de
+    domain/Basicos, domain/Comun y lectura_repository.py, así una
+    actualización que cambia el resultado no sirve entradas viejas
+
+Si la clave no cambió desde la última ejecución, el DataFrame preparado se
+recupera desde CACHE_DIR en formato binario (pickle) en lugar de volver a
+parsear el Excel. Las entradas se guardan por clave (<etapa>-<clave>.pkl)
+y se conservan las ENTRADAS_POR_ETAPA más recientes de cada etapa.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from src.app.repository.catalogo_repository import huella_archivo
+from src.app.repository.configuration_repository import CACHE_DIR
+from src.app.repository.mapping_repository import MAPEO
+from src.app.repository.registro_archivos_repository import registrar_escritura, registrar_lectura
+
+# Subir este número invalida todas las entradas existentes (cambio de formato)
+VERSION_CACHE = 1
+
+# Entradas que se conservan por etapa: cada clave (proyección de columnas,
+# lectura completa, modo por bloques...) tiene la suya, así alternar entre
+# opciones no pisa la entrada de las demás
+ENTRADAS_POR_ETAPA = 3
+
+# Código que determina el resultado de las preparaciones (relativo a src/app)
+_APP_DIR = Path(__file__).resolve().parents[1]
+CODIGO_PREPARACION = ("domain/Basicos", "domain/Comun", "repository/lectura_repository.py")
+_VERSION_CODIGO = None
+
+
+def version_codigo() -> str:
+    """Hash de las fuentes de CODIGO_PREPARACION (se calcula una vez por proceso)."""
+    global _VERSION_CODIGO
+    if _VERSION_CODIGO is None:
+        h = hashlib.sha256()
+        for relativa in CODIGO_PREPARACION:
+            ruta = _APP_DIR / relativa
+            fuentes = sorted(ruta.rglob("*.py")) if ruta.is_dir() else [ruta]
+            for fuente in fuentes:
+                if fuente.is_file():
+                    h.update(str(fuente.relative_to(_APP_DIR)).encode("utf-8"))
+                    h.update(fuente.read_bytes())
+        _VERSION_CODIGO = h.hexdigest()
+    return _VERSION_CODIGO
+
+def calcular_clave(
+    archivos, seccion_mapeo: str = "", columnas=None, variante: str = None, fuente: str = None
+) -> str:
+    """
+    Clave de la etapa a partir de sus archivos de entrada, su sección de MAPEO
+    y las columnas que lee con sus tipos (None = todas, lectura completa),
+    junto con el plan de categóricas de `fuente` y la versión del código.
+    `variante` distingue resultados con otra forma para las mismas entradas
+    (p. ej. "bloques", ver bloques_repository); None no cambia la clave.
+    """
+    contenido = {
+        "version": VERSION_CACHE,
+        "codigo": version_codigo(),
+        "archivos": [huella_archivo(p) for p in sorted(archivos, key=lambda p: str(p))],
+        "mapeo": MAPEO.get(seccion_mapeo) if seccion_mapeo else None,
+        "columnas": columnas,
+        "categoricas": MAPEO.get("Columnas_Categoricas", {}).get(fuente) if fuente else None,
+    }
+    if variante is not None:
+        contenido["variante"] = variante
+    texto = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _rutas(nombre: str, clave: str) -> tuple:
+    base = CACHE_DIR / f"{nombre}-{clave[:16]}"
+    return base.with_suffix(".pkl"), base.with_suffix(".json")
+
+
+def _entradas(nombre: str) -> list:
+    """Metadatos (.json) de las entradas de la etapa, de la usada más recientemente a la más vieja."""
+    metas = [m for m in CACHE_DIR.glob(f"{nombre}-*.json") if m.with_suffix(".pkl").exists()]
+    return sorted(metas, key=lambda m: m.stat().st_mtime_ns, reverse=True)
+
+
+def _descartar_viejas(nombre: str) -> None:
+    """Deja solo las ENTRADAS_POR_ETAPA más nuevas de la etapa (y borra la entrada única del formato anterior)."""
+    for meta in _entradas(nombre)[ENTRADAS_POR_ETAPA:]:
+        meta.with_suffix(".pkl").unlink(missing_ok=True)
+        meta.unlink(missing_ok=True)
+    for anterior in (CACHE_DIR / f"{nombre}.pkl", CACHE_DIR / f"{nombre}.json"):
+        anterior.unlink(missing_ok=True)
+
+
+def existe_etapa(nombre: str, clave: str) -> bool:
+    """True si hay una entrada cacheada de la etapa con esa clave (sin cargar los datos)."""
+    ruta_datos, ruta_meta = _rutas(nombre, clave)
+    if not ruta_datos.exists() or not ruta_meta.exists():
+        return False
+    try:
+        return json.loads(ruta_meta.read_text(encoding="utf-8")).get("clave") == clave
+    except Exception:
+        return False
+
+
+def cargar_etapa(nombre: str, clave: str):
+    """Devuelve el DataFrame cacheado de la etapa si la clave coincide; si no, None."""
+    ruta_datos, ruta_meta = _rutas(nombre, clave)
+    if not ruta_datos.exists() or not ruta_meta.exists():
+        return None
+    try:
+        meta = json.loads(ruta_meta.read_text(encoding="utf-8"))
+        if meta.get("clave") != clave:
+            return None
+        df = pd.read_pickle(ruta_datos)
+        registrar_lectura(ruta_datos, len(df))
+        ruta_meta.touch()   # la más usada es la última en descartarse
+        return df
+    except Exception as e:
+        print(f"[WARN] Caché de '{nombre}' ilegible, se recalcula: {e}")
+        return None
+
+
+def cargar_ultima_etapa(nombre: str):
+    """Último DataFrame cacheado de la etapa sin comparar la clave (None si no hay)."""
+    try:
+        entradas = _entradas(nombre)
+    except OSError:
+        return None
+    if not entradas:
+        return None
+    ruta_datos = entradas[0].with_suffix(".pkl")
+    try:
+        df = pd.read_pickle(ruta_datos)
+        registrar_lectura(ruta_datos, len(df))
+        return df
+    except Exception as e:
+        print(f"[WARN] Caché de '{nombre}' ilegible: {e}")
+        return None
+
+
+def guardar_etapa(nombre: str, clave: str, df: pd.DataFrame) -> None:
+    """Guarda el DataFrame preparado de la etapa junto con su clave."""
+    ruta_datos, ruta_meta = _rutas(nombre, clave)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_pickle(ruta_datos)
+        ruta_meta.write_text(json.dumps({"clave": clave, "filas": len(df)}), encoding="utf-8")
+        registrar_escritura(ruta_datos, len(df))
+        _descartar_viejas(nombre)
+    except Exception as e:
+        print(f"[WARN] No se pudo guardar la caché de '{nombre}': {e}")
@@ -0,0 +1,196 @@
+"""
+carga_paralela_repository.py
+----------------------------
+Carga de libros Excel independientes en procesos separados.
+
+Leer un .xlsx con openpyxl consume CPU y usa un solo núcleo, así que los
+archivos que no dependen entre sí (los reportes Pacífico, o las fuentes
+SICS / SharePoint / Rimac / Pacífico / Anulados) se leen en un pool de
+procesos y los DataFrames vuelven al proceso principal.
+
+  - La cantidad de procesos se configura con `configurar_workers()` (o la
+    variable de entorno GESTOR_WORKERS). Con 1 proceso todo se hace en serie,
+    en el mismo proceso, igual que antes.
+  - Los errores se informan por archivo: un archivo que falla no detiene a
+    los demás.
+  - Las funciones que se envían a los procesos deben estar definidas a nivel
+    de módulo (se serializan con pickle).
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.app.repository.bloques_repository import configuracion_bloques, configurar_bloques
+from src.app.repository.incremental_repository import configurar_incremental, incremental_activo
+from src.app.repository.intermedio_repository import auditoria_xlsx_activa, configurar_auditoria_xlsx
+from src.app.repository.lectura_repository import configurar_lectura_completa, lectura_completa_activa
+from src.app.repository.persistencia_repository import (
+    configurar_persistencia,
+    esperar_persistencias,
+    persistencia_activa,
+)
+from src.app.repository.reporte_repository import configurar_motor_excel, motor_configurado
+
+
+def _workers_por_defecto() -> int:
+    try:
+        return max(1, int(os.environ.get("GESTOR_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+_WORKERS = _workers_por_defecto()
+
+
+def configurar_workers(cantidad: int) -> None:
+    """Cantidad máxima de procesos para la carga en paralelo (1 = en serie)."""
+    global _WORKERS
+    _WORKERS = max(1, int(cantidad))
+
+
+def workers_configurados() -> int:
+    return _WORKERS
+
+
+@dataclass
+class ResultadoCarga:
+    """Resultado de leer un archivo: el DataFrame o el error producido."""
+    archivo: Path
+    df: object = None
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def _configuracion_actual() -> dict:
+    """Opciones del proceso principal que deben valer también en los procesos hijos."""
+    return {
+        "auditoria_xlsx": auditoria_xlsx_activa(),
+        "persistir": persistencia_activa(),
+        "motor_excel": motor_configurado(),
+        "incremental": incremental_activo(),
+        "lectura_completa": lectura_completa_activa(),
+        "bloques": configuracion_bloques(),
+    }
+
+
+def _aplicar_configuracion(configuracion: dict) -> None:
+    configurar_auditoria_xlsx(configuracion["auditoria_xlsx"])
+    configurar_persistencia(configuracion["persistir"])
+    configurar_motor_excel(configuracion["motor_excel"])
+    configurar_incremental(configuracion["incremental"])
+    configurar_lectura_completa(configuracion["lectura_completa"])
+    configurar_bloques(*configuracion["bloques"])
+    # Un proceso hijo no abre su propio pool: la carga anidada va en serie
+    configurar_workers(1)
+
+
+def _leer_en_worker(lector, archivo, kwargs: dict, configuracion: dict):
+    _aplicar_configuracion(configuracion)
+    return lector(archivo, **kwargs)
+
+
+def cargar_en_paralelo(lector, archivos, workers: int = None, **kwargs) -> list:
+    """
+    Aplica `lector(archivo, **kwargs)` a cada archivo, en procesos separados
+    si hay más de un archivo y más de un worker disponible.
+
+    Devuelve una lista de ResultadoCarga en el mismo orden que `archivos`.
+    Los errores se informan con el nombre del archivo y quedan en `.error`.
+    """
+    archivos = [Path(a) for a in archivos]
+    workers = min(workers or _WORKERS, len(archivos))
+
+    if workers <= 1:
+        return [_leer_en_serie(lector, archivo, kwargs) for archivo in archivos]
+
+    print(f"[INFO] Leyendo {len(archivos)} archivos en paralelo ({workers} procesos)")
+    configuracion = _configuracion_actual()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = [
+                pool.submit(_leer_en_worker, lector, archivo, kwargs, configuracion)
+                for archivo in archivos
+            ]
+            resultados = []
+            for archivo, futuro in zip(archivos, futuros):
+                try:
+                    resultados.append(ResultadoCarga(archivo, df=futuro.result()))
+                except Exception as e:
+                    print(f"[ERROR] No se pudo leer {archivo.name}: {e}")
+                    resultados.append(ResultadoCarga(archivo, error=str(e)))
+            return resultados
+    except (OSError, NotImplementedError) as e:
+        # Entornos sin soporte de multiprocessing: se sigue en serie
+        print(f"[WARN] No se pudo iniciar el pool de procesos ({e}); lectura en serie")
+        return [_leer_en_serie(lector, archivo, kwargs) for archivo in archivos]
+
+
+def _leer_en_serie(lector, archivo: Path, kwargs: dict) -> ResultadoCarga:
+    try:
+        return ResultadoCarga(archivo, df=lector(archivo, **kwargs))
+    except Exception as e:
+        print(f"[ERROR] No se pudo leer {archivo.name}: {e}")
+        return ResultadoCarga(archivo, error=str(e))
+
+
+# ===================================================================
+# Etapas completas en procesos separados
+# ===================================================================
+
+def _ejecutar_en_worker(funcion, kwargs: dict, configuracion: dict):
+    """
+    Ejecuta `funcion(**kwargs)` en el proceso hijo capturando lo que imprime,
+    para que el proceso principal lo muestre en orden y sin mezclar líneas.
+    Devuelve (resultado, salida, error).
+    """
+    _aplicar_configuracion(configuracion)
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        try:
+            resultado = funcion(**kwargs)
+            error = ""
+        except Exception as e:
+            resultado, error = None, str(e)
+        # Las copias en segundo plano deben terminar antes de que el hijo responda
+        esperar_persistencias()
+    return resultado, salida.getvalue(), error
+
+
+def ejecutar_en_paralelo(tareas: dict, workers: int = None) -> dict:
+    """
+    Ejecuta funciones independientes en procesos separados.
+
+    `tareas` es {nombre: (funcion, kwargs)}. Devuelve {nombre: (resultado, salida, error)},
+    donde `salida` es lo que la función imprimió y `error` el mensaje de la
+    excepción (vacío si terminó bien). Devuelve {} si no corresponde paralelizar
+    (un solo worker o una sola tarea) o si el pool no se puede iniciar; en ese
+    caso el llamador ejecuta las tareas en serie.
+    """
+    workers = min(workers or _WORKERS, len(tareas))
+    if workers <= 1:
+        return {}
+
+    configuracion = _configuracion_actual()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = {
+                nombre: pool.submit(_ejecutar_en_worker, funcion, kwargs, configuracion)
+                for nombre, (funcion, kwargs) in tareas.items()
+            }
+            resultados = {}
+            for nombre, futuro in futuros.items():
+                try:
+                    resultados[nombre] = futuro.result()
+                except Exception as e:
+                    resultados[nombre] = (None, "", str(e))
+            return resultados
+    except (OSError, NotImplementedError) as e:
+        print(f"[WARN] No se pudo iniciar el pool de procesos ({e}); ejecución en serie")
+        return {}
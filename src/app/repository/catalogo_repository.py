@@ -0,0 +1,251 @@
+"""
+catalogo_repository.py
+----------------------
+Catálogo de los archivos de entrada.
+
+Las carpetas de entrada se recorren UNA vez por ejecución (os.scandir) y de
+cada archivo se guarda:
+  - su fuente, según la carpeta (sics, sharepoint, rimac, pacifico, anulados)
+  - su firma: tamaño y mtime
+  - la fecha del export tomada del nombre del archivo, si la trae
+    (p. ej. "2025-12-03T113410.405", "2025-12-03_11-30-32" o "20241022")
+
+Con eso, elegir el archivo de una fuente es una consulta al catálogo en
+lugar de un glob + stat por llamada (ver configuration_repository.get_*_file).
+El más reciente es el de fecha de export más nueva; la mtime solo desempata,
+o reemplaza a la fecha cuando el nombre no la trae. Así un export copiado
+tarde, que conserva una mtime vieja, ya no pierde frente a uno anterior.
+
+Las hojas de cada libro y la huella del contenido (SHA-256, ver
+cache_repository.calcular_clave) se calculan recién cuando se piden y se
+recuerdan mientras la firma del archivo no cambie.
+
+`refrescar_catalogo()` vuelve a recorrer las carpetas (al inicio de cada
+ejecución del pipeline y en el modo vigilancia).
+"""
+
+import hashlib
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from xml.etree import ElementTree
+
+from src.app.repository.configuration_repository import (
+    INPUT_ANULADOS,
+    PATH_PACIFICO_INPUT,
+    PATH_RIMAC_INPUT,
+    PATH_SHAREPOINT_INPUT,
+    PATH_SICS_INPUT,
+)
+
+# Carpeta de entrada → fuente (preparación que la lee)
+CARPETAS_ENTRADA = {
+    PATH_SICS_INPUT: "sics",
+    PATH_SHAREPOINT_INPUT: "sharepoint",
+    PATH_RIMAC_INPUT: "rimac",
+    PATH_PACIFICO_INPUT: "pacifico",
+    INPUT_ANULADOS.parent: "anulados",
+}
+
+EXTENSIONES_ENTRADA = (".xlsx", ".xls")
+
+# Fechas de export en el nombre del archivo, de la más a la menos precisa
+_PATRONES_FECHA = (
+    re.compile(r"(?P<a>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})T(?P<h>\d{2})(?P<mi>\d{2})(?P<s>\d{2})(?:\.(?P<f>\d{1,6}))?"),
+    re.compile(r"(?P<a>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})[_ ](?P<h>\d{2})-(?P<mi>\d{2})-(?P<s>\d{2})"),
+    re.compile(r"(?P<a>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})"),
+    re.compile(r"(?<!\d)(?P<a>\d{4})(?P<m>\d{2})(?P<d>\d{2})(?!\d)"),
+)
+
+_BLOQUE_HASH = 1024 * 1024
+
+_NS_HOJA = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet"
+
+
+def fecha_export(nombre: str):
+    """Fecha del export indicada en el nombre del archivo, o None si no trae una válida."""
+    for patron in _PATRONES_FECHA:
+        for m in patron.finditer(nombre):
+            g = m.groupdict(default=None)
+            try:
+                return datetime(
+                    int(g["a"]), int(g["m"]), int(g["d"]),
+                    int(g.get("h") or 0), int(g.get("mi") or 0), int(g.get("s") or 0),
+                    int((g.get("f") or "0").ljust(6, "0")),
+                )
+            except ValueError:
+                continue
+    return None
+
+
+def fuente_de(ruta) -> str:
+    """Fuente a la que pertenece el archivo `ruta`, o None si no es un archivo de entrada."""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() not in EXTENSIONES_ENTRADA or ruta.name.startswith(("~$", ".")):
+        return None
+    return CARPETAS_ENTRADA.get(ruta.parent)
+
+
+@dataclass(frozen=True)
+class ArchivoEntrada:
+    """Un archivo de entrada tal como se vio al recorrer las carpetas."""
+    ruta: Path
+    fuente: str
+    tamano: int
+    mtime_ns: int
+    fecha_export: datetime = None   # tomada del nombre (None si no trae)
+
+    @property
+    def firma(self) -> tuple:
+        return self.tamano, self.mtime_ns
+
+    @property
+    def orden(self) -> tuple:
+        """Clave para elegir el más reciente: fecha del export (o mtime) y luego mtime."""
+        fecha = self.fecha_export or datetime.fromtimestamp(self.mtime_ns / 1e9)
+        return fecha, self.mtime_ns
+
+
+class Catalogo:
+    """Archivos de entrada por fuente, con el más reciente de cada una ya resuelto."""
+
+    def __init__(self, archivos: list):
+        self.archivos = archivos
+        self._por_fuente = {}
+        for archivo in archivos:
+            self._por_fuente.setdefault(archivo.fuente, []).append(archivo)
+        self._mas_reciente = {
+            fuente: max(lista, key=lambda a: a.orden) for fuente, lista in self._por_fuente.items()
+        }
+
+    def archivos_de(self, fuente: str) -> list:
+        """Archivos de la fuente, en el orden en que se encontraron en la carpeta."""
+        return list(self._por_fuente.get(fuente, []))
+
+    def mas_reciente(self, fuente: str):
+        """ArchivoEntrada más reciente de la fuente, o None si no hay."""
+        return self._mas_reciente.get(fuente)
+
+
+def escanear_entradas() -> Catalogo:
+    """Recorre las carpetas de entrada (sin subcarpetas) y arma el catálogo."""
+    archivos = []
+    for carpeta, fuente in CARPETAS_ENTRADA.items():
+        try:
+            with os.scandir(carpeta) as entradas:
+                for entrada in entradas:
+                    if not entrada.is_file() or fuente_de(entrada.path) is None:
+                        continue
+                    stat = entrada.stat()
+                    archivos.append(ArchivoEntrada(
+                        Path(entrada.path), fuente, stat.st_size, stat.st_mtime_ns, fecha_export(entrada.name)
+                    ))
+        except OSError:
+            continue
+    return Catalogo(archivos)
+
+
+# ===================================================================
+# Catálogo de la ejecución
+# ===================================================================
+
+_CATALOGO = None
+
+
+def catalogo() -> Catalogo:
+    """Catálogo de la ejecución actual (se arma la primera vez que se pide)."""
+    global _CATALOGO
+    if _CATALOGO is None:
+        _CATALOGO = escanear_entradas()
+    return _CATALOGO
+
+
+def refrescar_catalogo() -> Catalogo:
+    """Vuelve a recorrer las carpetas de entrada."""
+    global _CATALOGO
+    _CATALOGO = escanear_entradas()
+    return _CATALOGO
+
+
+def archivo_mas_reciente(fuente: str) -> Path:
+    """
+    Archivo más reciente de la fuente según el catálogo.
+    Si no hay archivos compatibles, lanza FileNotFoundError.
+    """
+    archivo = catalogo().mas_reciente(fuente)
+    if archivo is None:
+        carpeta = next((c for c, f in CARPETAS_ENTRADA.items() if f == fuente), fuente)
+        raise FileNotFoundError(f"No se encontró ningún archivo en {carpeta}")
+    return archivo.ruta
+
+
+def archivos_de(fuente: str, extensiones: tuple = EXTENSIONES_ENTRADA) -> list:
+    """Rutas de todos los archivos de la fuente con las extensiones indicadas."""
+    return [a.ruta for a in catalogo().archivos_de(fuente) if a.ruta.suffix.lower() in extensiones]
+
+
+# ===================================================================
+# Datos que se calculan al pedirlos (y se recuerdan por firma)
+# ===================================================================
+
+_HUELLAS = {}   # ruta -> (firma, huella)
+_HOJAS = {}     # ruta -> (firma, hojas)
+
+
+def _firma_actual(path: Path) -> tuple:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def huella_archivo(path: Path) -> dict:
+    """
+    Devuelve tamaño, mtime y hash SHA-256 del contenido de un archivo. El
+    hash se recalcula solo si cambió la firma (tamaño o mtime) del archivo.
+    """
+    path = Path(path)
+    firma = _firma_actual(path)
+    previa = _HUELLAS.get(str(path))
+    if previa is not None and previa[0] == firma:
+        return dict(previa[1])
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(_BLOQUE_HASH), b""):
+            sha.update(bloque)
+    huella = {
+        "archivo": path.name,
+        "tamano": firma[0],
+        "mtime": firma[1],
+        "sha256": sha.hexdigest(),
+    }
+    _HUELLAS[str(path)] = (firma, huella)
+    return dict(huella)
+
+
+def _leer_hojas(path: Path) -> list:
+    if path.suffix.lower() == ".xlsx":
+        # Solo xl/workbook.xml: no se abre ninguna hoja
+        with zipfile.ZipFile(path) as libro:
+            raiz = ElementTree.fromstring(libro.read("xl/workbook.xml"))
+        return [hoja.get("name") for hoja in raiz.iter(_NS_HOJA)]
+    from src.app.repository.lectura_repository import abrir_libro
+    with abrir_libro(path) as libro:
+        return list(libro.sheet_names)
+
+
+def hojas(path: Path) -> list:
+    """Nombres de las hojas del libro ([] si el archivo no se puede leer, p. ej. copiado a medias)."""
+    path = Path(path)
+    try:
+        firma = _firma_actual(path)
+        previa = _HOJAS.get(str(path))
+        if previa is not None and previa[0] == firma:
+            return list(previa[1])
+        nombres = _leer_hojas(path)
+    except Exception:
+        return []
+    _HOJAS[str(path)] = (firma, nombres)
+    return list(nombres)
@@ -3,19 +3,24 @@ configuration_repository.py
 ----------------------------
 Define las rutas base y funciones para localizar los archivos más recientes
 de cada fuente (SICS, SharePoint, Rimac, Pacífico) sin depender de nombres específicos.
+Los archivos de entrada se eligen desde el catálogo de la ejecución (ver
+catalogo_repository.py): las carpetas se recorren una sola vez.
 
 FLUJO DE PROCESAMIENTO:
-  1. PreparaciónPacífico/ (INPUT)   → preparar_pacifico() → OUTPUT_PACIFICO/Base_Pacifico.xlsx
-  2. PreparaciónSics/ (INPUT)       → preparar_sics()     → output/
-  3. PreparaciónSharepoint/ (INPUT) → preparar_sharepoint() → output/
-  4. OUTPUT_PACIFICO/Base_Pacifico.xlsx + otros → integracion_pacifico() → OUTPUT_PACIFICO_INTEGRADO/
+  1. PreparaciónPacífico/ (INPUT)   → preparar_pacifico() → OUTPUT_PACIFICO/Base_Pacifico.parquet
+  2. PreparaciónSics/ (INPUT)       → preparar_sics()     → DataFrame en memoria (copia opcional en OUTPUT_SICS)
+  3. PreparaciónSharepoint/ (INPUT) → preparar_sharepoint() → DataFrame en memoria (copia opcional en OUTPUT_SHAREPOINT)
+  4. OUTPUT_PACIFICO/Base_Pacifico.parquet + otros → integracion_pacifico() → OUTPUT_PACIFICO_INTEGRADO/
 """
 
+import os
 from pathlib import Path
 
 # === RUTAS BASE ===
 BASE_DIR = Path(__file__).resolve().parents[3]  # Ajusta el nivel hasta llegar a GestorDeValidaciones
-DATA_DIR = BASE_DIR / "src" / "app" / "data"
+# GESTOR_DATA_DIR permite apuntar a otra carpeta de datos (p. ej. datos sintéticos
+# de los benchmarks); debe fijarse antes de importar los módulos del pipeline
+DATA_DIR = Path(os.environ.get("GESTOR_DATA_DIR") or BASE_DIR / "src" / "app" / "data")
 INPUT_DIR = DATA_DIR / "input"
 OUTPUT_DIR = DATA_DIR / "output"
 
@@ -32,10 +37,44 @@ OUTPUT_PACIFICO = OUTPUT_DIR / "Pacífico"
 OUTPUT_PACIFICO_INTEGRADO = OUTPUT_DIR / "PacíficoIntegrado"
 OUTPUT_PACIFICO_ANULADO = OUTPUT_PACIFICO / "PacificoAnulado"
 
+# Copias opcionales de SICS / SharePoint / Rimac preparados (el input no se modifica)
+OUTPUT_SICS = OUTPUT_DIR / "Sics"
+OUTPUT_SHAREPOINT = OUTPUT_DIR / "Sharepoint"
+OUTPUT_RIMAC_PREPARADO = OUTPUT_RIMAC / "RimacPreparado"
+
+# Manifiestos de ejecución (tiempos, memoria y archivos por etapa)
+OUTPUT_MANIFIESTOS = OUTPUT_DIR / "Manifiestos"
+
+# === RUTAS INTERNAS (caché de etapas) ===
+CACHE_DIR = DATA_DIR / "cache"
+
+
+# Formatos binarios de los intermedios, en orden de preferencia (ver intermedio_repository.py)
+EXTENSIONES_INTERMEDIO = (".parquet", ".pkl")
+
+
+def get_intermedio_file(folder: Path, nombre: str) -> Path:
+    """
+    Devuelve el intermedio `nombre` dentro de `folder`, prefiriendo el formato
+    binario (.parquet / .pkl; si hay más de uno, el más reciente). Si no
+    existe, recurre al Excel más reciente.
+    """
+    candidatos = [Path(folder) / f"{nombre}{ext}" for ext in EXTENSIONES_INTERMEDIO]
+    candidatos = [c for c in candidatos if c.exists()]
+    if candidatos:
+        return max(candidatos, key=lambda c: c.stat().st_mtime_ns)
+    return get_latest_file(folder)
+
 
 def get_pacifico_file() -> Path:
-    """Obtiene el archivo preparado de Pacífico (Base_Pacifico.xlsx) desde OUTPUT_PACIFICO."""
-    return get_latest_file(OUTPUT_PACIFICO)
+    """Obtiene el archivo preparado de Pacífico (Base_Pacifico) desde OUTPUT_PACIFICO."""
+    return get_intermedio_file(OUTPUT_PACIFICO, "Base_Pacifico")
+
+
+def get_anulados_preparado_file() -> Path:
+    """Obtiene el archivo de Anulados preparado desde OUTPUT_PACIFICO_ANULADO."""
+    return get_intermedio_file(OUTPUT_PACIFICO_ANULADO, "Anulados_preparado")
+
 
 def get_latest_file(folder: Path, extensions: tuple = (".xlsx", ".xls")) -> Path:
     """
@@ -54,25 +93,30 @@ def get_latest_file(folder: Path, extensions: tuple = (".xlsx", ".xls")) -> Path
 
 
 # === ACCESOS PARA ARCHIVOS DE ENTRADA (Preparación) ===
+# Importación diferida: catalogo_repository importa las rutas de este módulo
 
 def get_sics_file() -> Path:
-    """Obtiene el archivo más reciente en la carpeta de entrada SICS."""
-    return get_latest_file(PATH_SICS_INPUT)
+    """Obtiene el archivo más reciente (por fecha de export) en la carpeta de entrada SICS."""
+    from src.app.repository.catalogo_repository import archivo_mas_reciente
+    return archivo_mas_reciente("sics")
 
 
 def get_sharepoint_file() -> Path:
-    """Obtiene el archivo más reciente en la carpeta de entrada SharePoint."""
-    return get_latest_file(PATH_SHAREPOINT_INPUT)
+    """Obtiene el archivo más reciente (por fecha de export) en la carpeta de entrada SharePoint."""
+    from src.app.repository.catalogo_repository import archivo_mas_reciente
+    return archivo_mas_reciente("sharepoint")
 
 
 def get_rimac_file() -> Path:
-    """Obtiene el archivo más reciente en la carpeta de entrada Rimac."""
-    return get_latest_file(PATH_RIMAC_INPUT)
+    """Obtiene el archivo más reciente (por fecha de export) en la carpeta de entrada Rimac."""
+    from src.app.repository.catalogo_repository import archivo_mas_reciente
+    return archivo_mas_reciente("rimac")
 
 
 def get_pacifico_files() -> list[Path]:
     """Obtiene todos los archivos Pacífico encontrados en la carpeta de entrada (vigente y no vigente)."""
-    files = list(PATH_PACIFICO_INPUT.glob("*.xlsx"))
+    from src.app.repository.catalogo_repository import archivos_de
+    files = archivos_de("pacifico", extensiones=(".xlsx",))
     if not files:
         raise FileNotFoundError(f"No se encontraron archivos Pacífico en {PATH_PACIFICO_INPUT}")
     return files
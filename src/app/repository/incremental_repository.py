@@ -0,0 +1,67 @@
+"""
+incremental_repository.py
+-------------------------
+Estado de la integración incremental (ver Integracion/incremental.py).
+
+Por cada integración se guarda, en CACHE_DIR/incremental/<nombre>.pkl, el
+resultado de la última ejecución junto con las huellas por póliza de sus
+entradas y de su salida. La siguiente ejecución en modo incremental solo
+recalcula las pólizas cuya huella cambió.
+
+El modo se activa con `configurar_incremental()` o la variable de entorno
+GESTOR_INCREMENTAL=1.
+"""
+
+import os
+import pickle
+
+from src.app.repository.configuration_repository import CACHE_DIR
+from src.app.repository.registro_archivos_repository import registrar_escritura, registrar_lectura
+
+_INCREMENTAL = os.environ.get("GESTOR_INCREMENTAL", "") == "1"
+
+CARPETA_INCREMENTAL = CACHE_DIR / "incremental"
+
+
+def configurar_incremental(activo: bool) -> None:
+    """Activa o desactiva la integración incremental."""
+    global _INCREMENTAL
+    _INCREMENTAL = bool(activo)
+
+
+def incremental_activo() -> bool:
+    return _INCREMENTAL
+
+
+def _ruta(nombre: str):
+    return CARPETA_INCREMENTAL / f"{nombre}.pkl"
+
+
+def cargar_estado(nombre: str):
+    """Estado guardado de la integración `nombre` (dict), o None si no hay o es ilegible."""
+    ruta = _ruta(nombre)
+    if not ruta.exists():
+        return None
+    try:
+        with open(ruta, "rb") as f:
+            estado = pickle.load(f)
+    except Exception as e:
+        print(f"[WARN] Estado incremental de '{nombre}' ilegible, se recalcula todo: {e}")
+        return None
+    registrar_lectura(ruta, len(estado.get("resultado", [])))
+    return estado
+
+
+def guardar_estado(nombre: str, estado: dict) -> None:
+    """Guarda el estado de la integración `nombre` (reemplaza el anterior)."""
+    ruta = _ruta(nombre)
+    try:
+        CARPETA_INCREMENTAL.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_suffix(".tmp")
+        with open(temporal, "wb") as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Reemplazo atómico: una ejecución interrumpida no deja un estado a medias
+        os.replace(temporal, ruta)
+        registrar_escritura(ruta, len(estado.get("resultado", [])))
+    except Exception as e:
+        print(f"[WARN] No se pudo guardar el estado incremental de '{nombre}': {e}")
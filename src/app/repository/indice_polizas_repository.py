@@ -0,0 +1,190 @@
+"""
+indice_polizas_repository.py
+----------------------------
+Índice local de pólizas (SQLite) para las búsquedas de SICS y SharePoint.
+
+Por cada fuente indexada (sics, sharepoint) se guarda, por llave de póliza
+normalizada (Pacifico y Rimac), el valor que usan las integraciones
+(Fin Vig o STATUS RENOVACION), junto con la clave de caché de la
+preparación que lo generó (ver cache_repository.calcular_clave).
+
+  - Si la clave guardada coincide con la de los archivos de entrada actuales,
+    el índice está vigente y las integraciones consultan el índice sin
+    volver a preparar la fuente (ver Pipeline/orquestador.py).
+  - Cuando llega un nuevo export, el índice se actualiza por diferencia:
+    solo se escriben las pólizas nuevas o con valor distinto y se borran las
+    que ya no están.
+  - Las consultas son por lote: las llaves buscadas se cargan en una tabla
+    temporal y se cruzan con el índice en una sola consulta.
+
+El archivo vive en CACHE_DIR/indice_polizas.sqlite.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.app.repository.configuration_repository import CACHE_DIR
+from src.app.repository.registro_archivos_repository import registrar_escritura, registrar_lectura
+
+RUTA_INDICE = CACHE_DIR / "indice_polizas.sqlite"
+
+# Subir este número invalida los índices existentes (cambio de formato)
+VERSION_INDICE = 1
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS fuentes (
+    fuente TEXT PRIMARY KEY,
+    clave TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    valor TEXT NOT NULL,
+    filas INTEGER NOT NULL,
+    actualizado TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS polizas (
+    fuente TEXT NOT NULL,
+    sistema TEXT NOT NULL,
+    llave TEXT NOT NULL,
+    valor TEXT,
+    PRIMARY KEY (fuente, sistema, llave)
+) WITHOUT ROWID;
+"""
+
+
+@contextmanager
+def _conectar():
+    """Conexión al índice (crea el archivo y las tablas si no existen)."""
+    RUTA_INDICE.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(RUTA_INDICE, timeout=30)
+    try:
+        con.executescript(_ESQUEMA)
+        yield con
+    finally:
+        con.close()
+
+
+def _como_valor(valor):
+    """Valor a guardar: texto, o None para los nulos."""
+    return None if pd.isna(valor) else str(valor)
+
+
+# ===================================================================
+# Estado y actualización
+# ===================================================================
+
+def indice_vigente(fuente: str, clave: str) -> bool:
+    """True si el índice de la fuente se generó con la clave indicada."""
+    if clave is None or not RUTA_INDICE.exists():
+        return False
+    try:
+        with _conectar() as con:
+            fila = con.execute(
+                "SELECT clave, version FROM fuentes WHERE fuente = ?", (fuente,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"[WARN] Índice de pólizas ilegible, se prepara '{fuente}' desde el archivo: {e}")
+        return False
+    return fila is not None and fila[0] == clave and fila[1] == VERSION_INDICE
+
+
+def indice_disponible(fuente: str) -> bool:
+    """True si hay un índice de la fuente, sin importar de qué archivos se generó."""
+    if not RUTA_INDICE.exists():
+        return False
+    try:
+        with _conectar() as con:
+            fila = con.execute("SELECT version FROM fuentes WHERE fuente = ?", (fuente,)).fetchone()
+    except sqlite3.Error:
+        return False
+    return fila is not None and fila[0] == VERSION_INDICE
+
+
+def actualizar_indice(fuente: str, clave: str, columna: str, valores: dict, filas: int) -> None:
+    """
+    Actualiza el índice de la fuente con `valores` ({sistema: Series llave -> valor})
+    escribiendo solo las diferencias con lo que ya estaba guardado.
+    """
+    try:
+        with _conectar() as con, con:
+            altas = bajas = 0
+            for sistema, serie in valores.items():
+                previos = dict(con.execute(
+                    "SELECT llave, valor FROM polizas WHERE fuente = ? AND sistema = ?", (fuente, sistema)
+                ).fetchall())
+                nuevos = {str(k): _como_valor(v) for k, v in serie.items()}
+
+                cambios = [
+                    (fuente, sistema, llave, valor)
+                    for llave, valor in nuevos.items()
+                    if llave not in previos or previos[llave] != valor
+                ]
+                eliminadas = [(fuente, sistema, llave) for llave in previos.keys() - nuevos.keys()]
+
+                con.executemany("INSERT OR REPLACE INTO polizas VALUES (?, ?, ?, ?)", cambios)
+                con.executemany(
+                    "DELETE FROM polizas WHERE fuente = ? AND sistema = ? AND llave = ?", eliminadas
+                )
+                altas += len(cambios)
+                bajas += len(eliminadas)
+
+            con.execute(
+                "INSERT OR REPLACE INTO fuentes VALUES (?, ?, ?, ?, ?, ?)",
+                (fuente, clave, VERSION_INDICE, columna, int(filas), datetime.now().isoformat(timespec="seconds")),
+            )
+    except sqlite3.Error as e:
+        print(f"[WARN] No se pudo actualizar el índice de pólizas de '{fuente}': {e}")
+        return
+
+    registrar_escritura(RUTA_INDICE, altas + bajas)
+    print(f"[INDICE] {fuente}: {altas} pólizas nuevas o modificadas, {bajas} eliminadas")
+
+
+# ===================================================================
+# Consulta
+# ===================================================================
+
+@dataclass(frozen=True)
+class IndicePolizas:
+    """
+    Fuente ya indexada (sics o sharepoint). Las integraciones la reciben en
+    lugar del DataFrame preparado cuando el índice está vigente.
+    """
+    fuente: str
+    columna: str       # columna de valor indexada (Fin Vig, STATUS RENOVACION)
+    filas: int = 0     # filas del preparado que generó el índice
+
+    @property
+    def columns(self) -> list:
+        return ["Pacifico", "Rimac", self.columna]
+
+    def __len__(self) -> int:
+        return self.filas
+
+    def buscar(self, sistema: str, llaves: pd.Series) -> pd.Series:
+        """Valor indexado para cada llave de `llaves` (NaN si la póliza no está)."""
+        unicas = [(str(v),) for v in pd.unique(llaves.astype(object)) if not pd.isna(v)]
+        with _conectar() as con:
+            con.execute("CREATE TEMP TABLE consulta (llave TEXT PRIMARY KEY)")
+            con.executemany("INSERT OR IGNORE INTO consulta VALUES (?)", unicas)
+            encontradas = con.execute(
+                "SELECT p.llave, p.valor FROM consulta c"
+                " JOIN polizas p ON p.fuente = ? AND p.sistema = ? AND p.llave = c.llave",
+                (self.fuente, sistema),
+            ).fetchall()
+        registrar_lectura(RUTA_INDICE, len(encontradas))
+
+        mapa = {llave: valor if valor is not None else np.nan for llave, valor in encontradas}
+        return llaves.astype(object).map(mapa)
+
+
+def abrir_indice(fuente: str) -> IndicePolizas:
+    """IndicePolizas de la fuente (solo si `indice_vigente` o `indice_disponible` es True)."""
+    with _conectar() as con:
+        columna, filas = con.execute(
+            "SELECT valor, filas FROM fuentes WHERE fuente = ?", (fuente,)
+        ).fetchone()
+    return IndicePolizas(fuente, columna, filas)
@@ -0,0 +1,116 @@
+"""
+intermedio_repository.py
+------------------------
+Lectura y escritura de archivos intermedios (Base_Pacifico, Anulados_preparado).
+
+Los intermedios se guardan en formato columnar binario (Parquet) para que la
+integración los lea sin pasar por openpyxl y con los tipos de dato intactos.
+Excel queda solo para los reportes finales; si se activa la auditoría, se
+emite además una copia .xlsx de cada intermedio.
+
+Si pyarrow no está instalado (o una columna no es representable en Parquet),
+se usa pickle como formato binario de respaldo.
+"""
+
+import os
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from src.app.repository.bloques_repository import BaseEnBloques
+from src.app.repository.configuration_repository import EXTENSIONES_INTERMEDIO
+from src.app.repository.registro_archivos_repository import registrar_escritura, registrar_lectura
+from src.app.repository.reporte_repository import escribir_reporte, escribir_reporte_por_bloques
+
+try:
+    import pyarrow  # noqa: F401
+    _PARQUET_DISPONIBLE = True
+except ImportError:
+    _PARQUET_DISPONIBLE = False
+
+# Copia .xlsx adicional de los intermedios (para revisión manual)
+_AUDITORIA_XLSX = os.environ.get("GESTOR_INTERMEDIOS_XLSX", "") == "1"
+
+
+def configurar_auditoria_xlsx(activa: bool) -> None:
+    """Activa o desactiva la copia .xlsx de auditoría de los intermedios."""
+    global _AUDITORIA_XLSX
+    _AUDITORIA_XLSX = bool(activa)
+
+
+def auditoria_xlsx_activa() -> bool:
+    return _AUDITORIA_XLSX
+
+
+def guardar_intermedio(df: pd.DataFrame, carpeta: Path, nombre: str, hoja: str = "Sheet1") -> Path:
+    """
+    Guarda `df` como carpeta/nombre.parquet (o .pkl de respaldo) y, si la
+    auditoría está activa, también como carpeta/nombre.xlsx. Las copias de
+    `nombre` en otros formatos que quedaron de ejecuciones anteriores se
+    borran: get_intermedio_file nunca elige una versión vieja.
+    Devuelve la ruta del archivo binario escrito.
+    """
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+
+    df = df.copy()
+    df.columns = df.columns.map(str)
+
+    ruta = None
+    if _PARQUET_DISPONIBLE:
+        ruta = carpeta / f"{nombre}.parquet"
+        try:
+            df.to_parquet(ruta, index=False)
+        except Exception as e:
+            print(f"[WARN] No se pudo guardar {ruta.name} en Parquet, se usa pickle: {e}")
+            ruta.unlink(missing_ok=True)
+            ruta = None
+
+    if ruta is None:
+        ruta = carpeta / f"{nombre}.pkl"
+        df.reset_index(drop=True).to_pickle(ruta)
+    registrar_escritura(ruta, len(df))
+
+    anteriores = [f"{nombre}{ext}" for ext in EXTENSIONES_INTERMEDIO]
+    if not _AUDITORIA_XLSX:
+        anteriores.append(f"{nombre}.xlsx")
+    for anterior in anteriores:
+        if anterior != ruta.name:
+            (carpeta / anterior).unlink(missing_ok=True)
+
+    if _AUDITORIA_XLSX:
+        guardar_auditoria_xlsx(df, carpeta, nombre, hoja=hoja)
+
+    return ruta
+
+
+def guardar_auditoria_xlsx(datos, carpeta: Path, nombre: str, hoja: str = "Sheet1") -> Path:
+    """
+    Copia .xlsx de auditoría (carpeta/nombre.xlsx) de un intermedio, dado
+    como DataFrame o como BaseEnBloques (se escribe bloque a bloque).
+    """
+    ruta_xlsx = Path(carpeta) / f"{nombre}.xlsx"
+    if isinstance(datos, BaseEnBloques):
+        escribir_reporte_por_bloques(datos.bloques(), len(datos), ruta_xlsx, hoja=hoja)
+    else:
+        escribir_reporte(datos, ruta_xlsx, hoja=hoja)
+    print(f"[INFO] Copia de auditoría: {ruta_xlsx.name}")
+    return ruta_xlsx
+
+
+def leer_intermedio(path: Path) -> pd.DataFrame:
+    """Lee un intermedio según su extensión (.parquet, .pkl o Excel)."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext == ".parquet":
+        df = pd.read_parquet(path)
+    elif ext == ".pkl":
+        df = pd.read_pickle(path)
+    else:
+        engine = "xlrd" if ext == ".xls" else "openpyxl"
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            df = pd.read_excel(path, dtype=str, engine=engine)
+    registrar_lectura(path, len(df))
+    return df
@@ -0,0 +1,178 @@
+"""
+lectura_repository.py
+---------------------
+Lectura de libros Excel (.xlsx) fila a fila, en modo solo lectura y solo valores.
+
+Permite detectar encabezados y proyectar columnas mientras se recorre el
+archivo, sin construir primero un DataFrame completo con `header=None`.
+Los valores se entregan como texto con las mismas reglas que
+`pd.read_excel(..., dtype=str)`: enteros sin ".0", fechas como
+"YYYY-MM-DD HH:MM:SS", y celdas vacías o marcadores de NA como None.
+
+También permite elegir la hoja de un libro mirando solo sus metadatos
+(nombres y dimensiones) y leer esa hoja con el mismo libro abierto, sin
+abrir el archivo dos veces.
+
+Proyección de columnas: cada fuente declara en MAPEO["Columnas_Requeridas"]
+las columnas que usa y su tipo, y los lectores cargan solo esas. La lectura
+completa (todas las columnas, como antes) queda para auditoría: se activa
+con `configurar_lectura_completa()` o GESTOR_LECTURA_COMPLETA=1.
+"""
+
+import os
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+from src.app.repository.mapping_repository import MAPEO
+
+# Valores que pandas interpreta como NA por defecto al leer texto
+VALORES_NA = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null",
+}
+
+COLUMNAS_REQUERIDAS = MAPEO.get("Columnas_Requeridas", {})
+
+_LECTURA_COMPLETA = os.environ.get("GESTOR_LECTURA_COMPLETA", "") == "1"
+
+
+# ===================================================================
+# Proyección de columnas
+# ===================================================================
+
+def configurar_lectura_completa(activo: bool) -> None:
+    """Activa o desactiva la lectura de todas las columnas de las fuentes (auditoría)."""
+    global _LECTURA_COMPLETA
+    _LECTURA_COMPLETA = bool(activo)
+
+
+def lectura_completa_activa() -> bool:
+    return _LECTURA_COMPLETA
+
+
+def columnas_requeridas(fuente: str):
+    """
+    Columnas que se leen de la fuente (lista), o None si se leen todas:
+    en lectura completa o si la fuente no declara columnas.
+    """
+    if _LECTURA_COMPLETA or not COLUMNAS_REQUERIDAS.get(fuente):
+        return None
+    return list(COLUMNAS_REQUERIDAS[fuente])
+
+
+def tipos_requeridos(fuente: str) -> dict:
+    """`dtype` explícito por columna para la fuente (sin las de tipo inferido)."""
+    return {c: t for c, t in COLUMNAS_REQUERIDAS.get(fuente, {}).items() if t}
+
+
+def filtro_columnas(fuente: str):
+    """
+    `usecols` para pd.read_excel: acepta las columnas requeridas de la fuente
+    comparando el encabezado sin espacios. None (todas) en lectura completa.
+    """
+    columnas = columnas_requeridas(fuente)
+    if columnas is None:
+        return None
+    requeridas = set(columnas)
+    return lambda nombre: str(nombre).strip() in requeridas
+
+
+def valor_como_texto(valor):
+    """Convierte el valor de una celda a texto (o None si es vacío / NA)."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        if valor in VALORES_NA or valor in ERROR_CODES:
+            return None
+        return valor
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def iterar_filas_texto(path: Path, sheet_name=None):
+    """
+    Recorre la hoja (la primera si `sheet_name` es None) fila a fila y entrega
+    listas de valores como texto, sin las celdas vacías del final. Las filas
+    vacías al final de la hoja se omiten, igual que en `pd.read_excel`.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        wb = load_workbook(Path(path), read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name is not None else wb.worksheets[0]
+        ws.reset_dimensions()
+
+        vacias_pendientes = 0
+        for fila in ws.iter_rows(values_only=True):
+            valores = [valor_como_texto(v) for v in fila]
+            while valores and valores[-1] is None:
+                valores.pop()
+            if not valores:
+                # Solo se entregan si después aparece una fila con datos
+                vacias_pendientes += 1
+                continue
+            for _ in range(vacias_pendientes):
+                yield []
+            vacias_pendientes = 0
+            yield valores
+    finally:
+        wb.close()
+
+
+# ===================================================================
+# Selección de hoja con un solo libro abierto
+# ===================================================================
+
+@dataclass
+class InfoHoja:
+    """Metadatos de una hoja: nombre y rango usado (p. ej. "A1:N435"), si se conoce."""
+    nombre: str
+    dimension: str = ""
+
+
+def abrir_libro(path: Path) -> pd.ExcelFile:
+    """
+    Abre el libro una sola vez (openpyxl en modo solo lectura para .xlsx,
+    xlrd para .xls). Se usa como context manager y con `.parse()` se lee
+    la hoja elegida sobre el mismo libro abierto.
+    """
+    path = Path(path)
+    engine = "xlrd" if path.suffix.lower() == ".xls" else "openpyxl"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.ExcelFile(path, engine=engine)
+
+
+def _dimension_hoja(libro: pd.ExcelFile, nombre: str) -> str:
+    try:
+        if libro.engine == "openpyxl":
+            # En solo lectura viene de la etiqueta <dimension>: no se leen celdas
+            return libro.book[nombre].calculate_dimension()
+        hoja = libro.book.sheet_by_name(nombre)
+        return f"{hoja.nrows} filas x {hoja.ncols} columnas"
+    except Exception:
+        return ""
+
+
+def info_hojas(libro: pd.ExcelFile) -> list:
+    """Nombre y dimensiones de cada hoja del libro, sin cargar sus celdas."""
+    return [InfoHoja(nombre, _dimension_hoja(libro, nombre)) for nombre in libro.sheet_names]
+
+
+def resolver_hoja(libro: pd.ExcelFile, palabras_clave) -> InfoHoja:
+    """
+    Primera hoja cuyo nombre contiene alguna de las palabras clave (sin
+    distinguir mayúsculas); si ninguna coincide, la primera hoja del libro.
+    """
+    hojas = info_hojas(libro)
+    for hoja in hojas:
+        if any(k in hoja.nombre.lower() for k in palabras_clave):
+            return hoja
+    return hojas[0]
@@ -0,0 +1,21 @@
+"""
+manifiesto_repository.py
+------------------------
+Escritura del manifiesto de ejecución: un JSON por ejecución en
+OUTPUT_MANIFIESTOS con lo medido en cada etapa (ver Pipeline/instrumentacion.py).
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from src.app.repository.configuration_repository import OUTPUT_MANIFIESTOS
+
+
+def guardar_manifiesto(manifiesto: dict, carpeta: Path = None) -> Path:
+    """Guarda el manifiesto como manifiesto_<fecha-hora>.json y devuelve la ruta."""
+    carpeta = Path(carpeta or OUTPUT_MANIFIESTOS)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"manifiesto_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    ruta.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    return ruta
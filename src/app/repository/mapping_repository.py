@@ -404,6 +404,99 @@ MAPEO = {
         "Tablero	Observaciones",
         "Fin de Vigencia",
         "Situacion"
-    ]
+    ],
+    # Columnas que se leen de cada fuente y su tipo al leer (None: tipo inferido, p. ej. fechas).
+    # Son las que usan la preparación y la integración; el resto de columnas de los
+    # Tablero_* solo se lee en lectura completa (ver repository/lectura_repository.py)
+    "Columnas_Requeridas": {
+        "sics": {
+            "Póliza": "str", # Pacifico, Rimac
+            "Vig Hasta Póliza": None # Fin Vig
+        },
+        "sharepoint": {
+            "Pólizafinal": "str", # Pacifico, Rimac
+            "STATUS RENOVACION": "str"
+        },
+        "rimac": {
+            "RESPONSABLE DE PAGO": "str",
+            "NRO. POLIZA": "str",
+            "CATEGORÍA": "str",
+            "VENCIMIENTO": "str"
+        },
+        "pacifico": {
+            "Contratante": "str",
+            "Nro de Documento": "str",
+            "Linea de Negocio": "str",
+            "Producto": "str",
+            "Nro de Poliza/Contrato": "str",
+            "Fin de Vigencia": "str",
+            "Situacion": "str"
+        },
+        "anulados": {
+            "Nro de Poliza/Contrato": "str",
+            "Situacion": "str"
+        }
+    },
+    # Columnas de baja cardinalidad que se manejan como category (ver domain/Comun/tipos.py)
+    "Columnas_Categoricas": {
+        "sics": [
+            "Cod Cia",
+            "Aseguradora",
+            "Cod Ramo",
+            "Ramo / Producto",
+            "Unidad de Negocio",
+            "Fin Vig"
+        ],
+        "sharepoint": [
+            "ASEG.",
+            "RIESGO",
+            "PRODUCTO",
+            "Clasificación",
+            "Responsable",
+            "MES FV",
+            "RESULTADO DE ENTREGA",
+            "STATUS RENOVACION",
+            "MOTIVO",
+            "ASEGURADORA",
+            "RENOVADA",
+            "Cumple ANS"
+        ],
+        "rimac": [
+            "CATEGORÍA",
+            "MEDIO DE PAGO",
+            "ESTADO"
+        ],
+        "pacifico": [
+            "Tipo de Documento",
+            "Linea de Negocio",
+            "Producto",
+            "Estado",
+            "Situacion",
+            "TipoReporte"
+        ],
+        "anulados": [
+            "Producto",
+            "Situacion"
+        ],
+        "integracion_rimac": [
+            "CATEGORÍA",
+            "SICS",
+            "Tablero",
+            "Observaciones",
+            "Responsable",
+            "DentroRango"
+        ],
+        "integracion_pacifico": [
+            "Linea de Negocio",
+            "Producto",
+            "SICS",
+            "Tablero",
+            "Observaciones",
+            "Responsable",
+            "Situacion",
+            "DentroRango",
+            "Polizas Anulada"
+        ]
+    }
 
 }
@@ -0,0 +1,63 @@
+"""
+persistencia_repository.py
+--------------------------
+Guardado opcional y en segundo plano de los DataFrames preparados.
+
+Las preparaciones de SICS, SharePoint y Rimac ya no sobrescriben el archivo
+de entrada: devuelven el DataFrame en memoria. Si se pide una copia en disco,
+se escribe en un hilo aparte para no bloquear la integración; el proceso
+espera a que terminen todas las escrituras antes de salir.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.app.repository.registro_archivos_repository import registrar_escritura
+from src.app.repository.reporte_repository import escribir_reporte
+
+# Guardar copias de los preparados (desactivado por defecto)
+_PERSISTIR = os.environ.get("GESTOR_PERSISTIR_PREPARADOS", "") == "1"
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistencia")
+_pendientes = []
+
+
+def configurar_persistencia(activa: bool) -> None:
+    """Activa o desactiva el guardado de copias de los DataFrames preparados."""
+    global _PERSISTIR
+    _PERSISTIR = bool(activa)
+
+
+def persistencia_activa() -> bool:
+    return _PERSISTIR
+
+
+def _escribir_excel(df: pd.DataFrame, path: Path, sheet_name: str) -> Path:
+    escribir_reporte(df, path, hoja=sheet_name)
+    print(f"[OK] Copia del preparado guardada en: {path}")
+    return path
+
+
+def persistir_en_segundo_plano(df: pd.DataFrame, path: Path, sheet_name: str = "Sheet1"):
+    """
+    Programa la escritura de `df` en `path` (.xlsx) sin bloquear al llamador.
+    Se escribe una copia del DataFrame, así que el original puede seguir usándose.
+    Devuelve el Future de la escritura.
+    """
+    futuro = _executor.submit(_escribir_excel, df.copy(), Path(path), sheet_name)
+    registrar_escritura(path, len(df))
+    _pendientes.append(futuro)
+    return futuro
+
+
+def esperar_persistencias() -> None:
+    """Espera a que terminen todas las escrituras pendientes e informa los errores."""
+    while _pendientes:
+        futuro = _pendientes.pop(0)
+        try:
+            futuro.result()
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar una copia del preparado: {e}")
@@ -0,0 +1,60 @@
+"""
+registro_archivos_repository.py
+-------------------------------
+Registro de los archivos que lee y escribe la etapa en curso (para el
+manifiesto de ejecución, ver Pipeline/instrumentacion.py).
+
+Las funciones de lectura y escritura llaman a `registrar_lectura` /
+`registrar_escritura`; si no hay un registro abierto, no hacen nada.
+Solo se anota lo que hace el hilo que abrió el registro: las copias que
+escribe el hilo de persistencia en segundo plano se anotan al programarse
+(ver persistencia_repository.py), no cuando terminan.
+"""
+
+import threading
+from pathlib import Path
+
+_registro = None
+_hilo = None
+
+
+def iniciar_registro() -> None:
+    """Abre un registro vacío para el hilo actual (descarta el anterior)."""
+    global _registro, _hilo
+    _registro = {"leidos": {}, "escritos": {}}
+    _hilo = threading.get_ident()
+
+
+def tomar_registro() -> tuple:
+    """
+    Cierra el registro y devuelve (leidos, escritos): listas de
+    {"archivo": ruta, "filas": n o None} en el orden en que se registraron.
+    """
+    global _registro, _hilo
+    registro, _registro, _hilo = _registro, None, None
+    if registro is None:
+        return [], []
+    return (
+        [{"archivo": a, "filas": f} for a, f in registro["leidos"].items()],
+        [{"archivo": a, "filas": f} for a, f in registro["escritos"].items()],
+    )
+
+
+def _anotar(tipo: str, path, filas) -> None:
+    if _registro is None or threading.get_ident() != _hilo:
+        return
+    archivos = _registro[tipo]
+    clave = str(Path(path))
+    # Un segundo registro del mismo archivo solo completa la cantidad de filas
+    if filas is not None or clave not in archivos:
+        archivos[clave] = int(filas) if filas is not None else None
+
+
+def registrar_lectura(path, filas: int = None) -> None:
+    """Anota un archivo leído por la etapa en curso (y sus filas, si se conocen)."""
+    _anotar("leidos", path, filas)
+
+
+def registrar_escritura(path, filas: int = None) -> None:
+    """Anota un archivo escrito (o programado para escribirse) por la etapa en curso."""
+    _anotar("escritos", path, filas)
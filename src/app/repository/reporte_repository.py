@@ -0,0 +1,303 @@
+"""
+reporte_repository.py
+---------------------
+Escritura de reportes Excel (.xlsx) fila a fila, con memoria constante.
+
+`pd.ExcelWriter(engine="openpyxl")` arma el libro completo en memoria antes
+de guardarlo. Aquí las filas se escriben en streaming con uno de estos motores:
+
+  - "xlsxwriter": modo `constant_memory` (el más rápido; requiere el paquete
+    xlsxwriter, opcional).
+  - "openpyxl":   libro `write_only` de openpyxl (siempre disponible).
+  - "pandas":     el camino anterior con `pd.ExcelWriter` (referencia).
+
+Por defecto se usa xlsxwriter si está instalado y, si no, openpyxl en modo
+write_only. El motor se puede fijar con `configurar_motor_excel()` o la
+variable de entorno GESTOR_MOTOR_EXCEL.
+
+Todos los motores dejan el reporte listo para revisión: encabezado en
+negrita, fila de encabezado fija, autofiltro y ancho de columnas según el
+contenido. `escribir_libro` escribe varias hojas en el mismo archivo y
+`escribir_reporte_por_bloques` escribe una hoja a partir de bloques de filas
+sin juntarlos en un DataFrame.
+"""
+
+import os
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.app.repository.registro_archivos_repository import registrar_escritura
+
+try:
+    import xlsxwriter
+    _XLSXWRITER_DISPONIBLE = True
+except ImportError:
+    _XLSXWRITER_DISPONIBLE = False
+
+MOTORES_EXCEL = ("xlsxwriter", "openpyxl", "pandas")
+
+_MOTOR = os.environ.get("GESTOR_MOTOR_EXCEL", "") or None
+
+# Ancho de columna (en caracteres) y filas que se miran para calcularlo
+_ANCHO_MINIMO = 8
+_ANCHO_MAXIMO = 60
+_FILAS_MUESTRA_ANCHO = 1000
+
+# Filas que se convierten a valores de Python a la vez (acota la memoria extra)
+_FILAS_POR_BLOQUE = 10_000
+
+
+def configurar_motor_excel(motor: str = None) -> None:
+    """Fija el motor de escritura de reportes (None = elegir automáticamente)."""
+    global _MOTOR
+    if motor is not None and motor not in MOTORES_EXCEL:
+        raise ValueError(f"Motor Excel desconocido: {motor} (opciones: {', '.join(MOTORES_EXCEL)})")
+    _MOTOR = motor
+
+
+def motor_configurado():
+    """Motor fijado explícitamente (None si se elige automáticamente)."""
+    return _MOTOR
+
+
+def motor_excel() -> str:
+    """Motor que se usará para escribir reportes."""
+    if _MOTOR == "xlsxwriter" and not _XLSXWRITER_DISPONIBLE:
+        print("[WARN] xlsxwriter no está instalado; se usa openpyxl (write_only)")
+        return "openpyxl"
+    if _MOTOR:
+        return _MOTOR
+    return "xlsxwriter" if _XLSXWRITER_DISPONIBLE else "openpyxl"
+
+
+# ===================================================================
+# Preparación de los datos
+# ===================================================================
+
+def _valores_celda(serie: pd.Series) -> list:
+    """
+    Valores de la columna listos para la celda: nulos como None y tipos numpy
+    convertidos a int / float / str / datetime de Python.
+    """
+    valores = serie.astype(object).to_numpy()
+    nulos = serie.isna().to_numpy()
+    if nulos.any():
+        valores = valores.copy()
+        valores[nulos] = None
+    return [v.item() if isinstance(v, np.generic) else v for v in valores]
+
+
+def _filas_de_bloque(bloque: pd.DataFrame):
+    """Filas del bloque como tuplas de valores de celda."""
+    return zip(*[_valores_celda(bloque.iloc[:, j]) for j in range(bloque.shape[1])])
+
+
+def _iterar_filas(df: pd.DataFrame):
+    """Filas del DataFrame como tuplas de valores de celda, convertidas por bloques."""
+    for inicio in range(0, len(df), _FILAS_POR_BLOQUE):
+        yield from _filas_de_bloque(df.iloc[inicio:inicio + _FILAS_POR_BLOQUE])
+
+
+def _anchos(df: pd.DataFrame, encabezados: list) -> list:
+    """Ancho de cada columna según el encabezado y una muestra de valores."""
+    muestra = df.head(_FILAS_MUESTRA_ANCHO)
+    anchos = []
+    for j, encabezado in enumerate(encabezados):
+        valores = _valores_celda(muestra.iloc[:, j])
+        largo = max([len(encabezado)] + [len(str(v)) for v in valores if v is not None])
+        anchos.append(min(max(largo + 2, _ANCHO_MINIMO), _ANCHO_MAXIMO))
+    return anchos
+
+
+def _rango_autofiltro(n_columnas: int, n_filas: int) -> str:
+    from openpyxl.utils import get_column_letter
+    return f"A1:{get_column_letter(max(n_columnas, 1))}{n_filas + 1}"
+
+
+# ===================================================================
+# Motores
+# ===================================================================
+
+@dataclass
+class _Hoja:
+    """Hoja a escribir: formato, cantidad de filas y sus valores (tuplas, en orden)."""
+    nombre: str
+    encabezados: list
+    anchos: list
+    n_filas: int
+    filas: object          # iterable de tuplas de valores de celda
+    df: pd.DataFrame = None  # solo si la hoja viene de un DataFrame (motor "pandas")
+
+
+def _formato_hojas(hojas: dict) -> list:
+    """_Hoja de cada DataFrame de `hojas`."""
+    formato = []
+    for hoja, df in hojas.items():
+        encabezados = [str(c) for c in df.columns]
+        formato.append(_Hoja(hoja, encabezados, _anchos(df, encabezados), len(df), _iterar_filas(df), df))
+    return formato
+
+
+def _hoja_por_bloques(hoja: str, bloques, n_filas: int) -> _Hoja:
+    """
+    _Hoja que se va leyendo de `bloques` (DataFrames con las mismas columnas).
+    Solo se retienen los primeros bloques, hasta juntar la muestra con la que
+    se calcula el ancho de las columnas (igual que con el DataFrame completo).
+    """
+    bloques = iter(bloques)
+    muestra = []
+    for bloque in bloques:
+        muestra.append(bloque)
+        if sum(len(b) for b in muestra) >= _FILAS_MUESTRA_ANCHO:
+            break
+    if not muestra:
+        raise ValueError("no hay bloques para escribir")
+
+    primero = pd.concat(muestra, ignore_index=True) if len(muestra) > 1 else muestra[0]
+    encabezados = [str(c) for c in primero.columns]
+    anchos = _anchos(primero, encabezados)
+    del primero
+
+    def filas():
+        while muestra:
+            yield from _filas_de_bloque(muestra.pop(0))
+        for bloque in bloques:
+            yield from _filas_de_bloque(bloque)
+
+    return _Hoja(hoja, encabezados, anchos, n_filas, filas())
+
+
+def _escribir_xlsxwriter(path: Path, hojas: list) -> None:
+    libro = xlsxwriter.Workbook(
+        str(path),
+        {"constant_memory": True, "nan_inf_to_errors": True, "strings_to_urls": False},
+    )
+    try:
+        negrita = libro.add_format({"bold": True})
+        formato_fecha = libro.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        for hoja in hojas:
+            ws = libro.add_worksheet(hoja.nombre)
+            for j, ancho in enumerate(hoja.anchos):
+                ws.set_column(j, j, ancho)
+            ws.freeze_panes(1, 0)
+            if hoja.encabezados:
+                ws.autofilter(0, 0, hoja.n_filas, len(hoja.encabezados) - 1)
+
+            # constant_memory exige escribir fila por fila, en orden
+            ws.write_row(0, 0, hoja.encabezados, negrita)
+            for i, fila in enumerate(hoja.filas, start=1):
+                for j, valor in enumerate(fila):
+                    if isinstance(valor, datetime):
+                        ws.write_datetime(i, j, valor, formato_fecha)
+                    elif valor is not None:
+                        ws.write(i, j, valor)
+    finally:
+        libro.close()
+
+
+def _escribir_openpyxl(path: Path, hojas: list) -> None:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    libro = Workbook(write_only=True)
+    negrita = Font(bold=True)
+    for hoja in hojas:
+        ws = libro.create_sheet(hoja.nombre)
+
+        # En modo write_only el formato de hoja se define antes de la primera fila
+        for j, ancho in enumerate(hoja.anchos, start=1):
+            ws.column_dimensions[get_column_letter(j)].width = ancho
+        ws.freeze_panes = "A2"
+        if hoja.encabezados:
+            ws.auto_filter.ref = _rango_autofiltro(len(hoja.encabezados), hoja.n_filas)
+
+        fila_encabezado = []
+        for encabezado in hoja.encabezados:
+            celda = WriteOnlyCell(ws, value=encabezado)
+            celda.font = negrita
+            fila_encabezado.append(celda)
+        ws.append(fila_encabezado)
+
+        for fila in hoja.filas:
+            ws.append(fila)
+
+    libro.save(path)
+
+
+def _escribir_pandas(path: Path, hojas: list) -> None:
+    from openpyxl.utils import get_column_letter
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for hoja in hojas:
+            hoja.df.to_excel(writer, index=False, sheet_name=hoja.nombre)
+            ws = writer.sheets[hoja.nombre]
+            for j, ancho in enumerate(hoja.anchos, start=1):
+                ws.column_dimensions[get_column_letter(j)].width = ancho
+            ws.freeze_panes = "A2"
+            if hoja.encabezados:
+                ws.auto_filter.ref = _rango_autofiltro(len(hoja.encabezados), hoja.n_filas)
+
+
+def escribir_libro(hojas: dict, path: Path, motor: str = None) -> Path:
+    """
+    Escribe cada DataFrame de `hojas` ({nombre_hoja: df}, en ese orden) como
+    una hoja del .xlsx `path`, con el mismo formato que `escribir_reporte`.
+    Devuelve la ruta escrita.
+    """
+    path = _escribir(_formato_hojas(hojas), path, motor)
+    # Filas de la primera hoja (la principal del reporte)
+    registrar_escritura(path, len(next(iter(hojas.values()))) if hojas else 0)
+    return path
+
+
+def escribir_reporte_por_bloques(bloques, filas: int, path: Path, hoja: str = "Sheet1", motor: str = None) -> Path:
+    """
+    Como `escribir_reporte`, pero toma las filas de `bloques` (DataFrames con
+    las mismas columnas, en orden) sin juntarlos: en memoria queda un bloque
+    a la vez. `filas` es el total de filas (lo necesita el autofiltro). El
+    motor "pandas" necesita el DataFrame completo: se usa openpyxl.
+    Devuelve la ruta escrita.
+    """
+    motor = motor or motor_excel()
+    if motor == "pandas":
+        motor = "openpyxl"
+    path = _escribir([_hoja_por_bloques(hoja, bloques, filas)], path, motor)
+    registrar_escritura(path, filas)
+    return path
+
+
+def _escribir(formato: list, path: Path, motor: str = None) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    motor = motor or motor_excel()
+    if motor == "xlsxwriter" and not _XLSXWRITER_DISPONIBLE:
+        motor = "openpyxl"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if motor == "xlsxwriter":
+            _escribir_xlsxwriter(path, formato)
+        elif motor == "openpyxl":
+            _escribir_openpyxl(path, formato)
+        elif motor == "pandas":
+            _escribir_pandas(path, formato)
+        else:
+            raise ValueError(f"Motor Excel desconocido: {motor}")
+    return path
+
+
+def escribir_reporte(df: pd.DataFrame, path: Path, hoja: str = "Sheet1", motor: str = None) -> Path:
+    """
+    Escribe `df` (sin índice) en `path` como .xlsx, con encabezado fijo,
+    autofiltro y ancho de columnas. `motor` permite forzar uno de
+    MOTORES_EXCEL; por defecto se usa `motor_excel()`.
+    Devuelve la ruta escrita.
+    """
+    return escribir_libro({hoja: df}, path, motor=motor)
@@ -0,0 +1,139 @@
+"""
+benchmark_arranque.py
+---------------------
+Mide el tiempo de arranque de la línea de comandos (src/main.py) y lo
+compara con un presupuesto fijo.
+
+  - Cada comando se ejecuta en un proceso nuevo (como lo usa el operador),
+    varias veces, y se toma la mediana del tiempo de pared.
+  - Los comandos medidos solo analizan argumentos (`--help`): no deben
+    importar pandas ni las preparaciones (ver el encabezado de main.py).
+  - Además se cuenta, con `-X importtime`, si pandas llegó a importarse.
+
+Sale con código 1 si algún comando supera el presupuesto, para poder
+usarlo en CI.
+
+Uso:
+    python src/benchmarks/benchmark_arranque.py
+    python src/benchmarks/benchmark_arranque.py --repeticiones 20 --presupuesto 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+MAIN = project_root / "src" / "main.py"
+
+CARPETA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+# Presupuesto de arranque por comando (segundos, mediana)
+PRESUPUESTO_ARRANQUE = 0.3
+
+COMANDOS = {
+    "help": ["--help"],
+    "prep_help": ["prep", "--help"],
+    "integrate_help": ["integrate", "--help"],
+}
+
+
+def _commit_actual() -> str:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        )
+        return salida.stdout.strip()
+    except Exception:
+        return ""
+
+
+def _importa_pandas(argumentos: list) -> bool:
+    """True si el comando importa pandas (según `python -X importtime`)."""
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", str(MAIN), *argumentos],
+        capture_output=True, text=True,
+    )
+    return any(linea.rstrip().endswith("| pandas") for linea in salida.stderr.splitlines())
+
+
+def medir_comando(argumentos: list, repeticiones: int) -> dict:
+    """Mediana, mínimo y máximo (segundos) del tiempo de pared de `main.py <argumentos>`."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, str(MAIN), *argumentos], capture_output=True, check=True)
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "mediana": round(statistics.median(tiempos), 4),
+        "minimo": round(min(tiempos), 4),
+        "maximo": round(max(tiempos), 4),
+        "importa_pandas": _importa_pandas(argumentos),
+    }
+
+
+def _python_vacio(repeticiones: int) -> float:
+    """Mediana del arranque del intérprete sin hacer nada (referencia)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        tiempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tiempos), 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la línea de comandos frente a un presupuesto")
+    parser.add_argument("--repeticiones", type=int, default=10, help="Ejecuciones por comando (se toma la mediana)")
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_ARRANQUE,
+                        help=f"Segundos permitidos por comando (por defecto {PRESUPUESTO_ARRANQUE})")
+    parser.add_argument("--salida", type=Path, default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    referencia = _python_vacio(args.repeticiones)
+    print(f"[INFO] Arranque del intérprete (referencia): {referencia:.3f} s")
+
+    comandos = {}
+    excedidos = []
+    for nombre, argumentos in COMANDOS.items():
+        m = medir_comando(argumentos, args.repeticiones)
+        comandos[nombre] = {"argumentos": argumentos, **m}
+        estado = "OK" if m["mediana"] <= args.presupuesto and not m["importa_pandas"] else "EXCEDIDO"
+        if estado != "OK":
+            excedidos.append(nombre)
+        print(
+            f"   {' '.join(argumentos):<20} mediana {m['mediana']:.3f} s  "
+            f"(mín {m['minimo']:.3f} / máx {m['maximo']:.3f})  "
+            f"pandas: {'sí' if m['importa_pandas'] else 'no'}  [{estado}]"
+        )
+
+    resultado = {
+        "commit": _commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "presupuesto_segundos": args.presupuesto,
+        "interprete_segundos": referencia,
+        "comandos": comandos,
+    }
+
+    salida = args.salida or CARPETA_RESULTADOS / f"arranque_{resultado['commit'] or 'local'}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n[OK] Resultados guardados en: {salida}")
+
+    if excedidos:
+        print(f"[ERROR] Arranque fuera de presupuesto ({args.presupuesto} s): {', '.join(excedidos)}")
+        sys.exit(1)
+    print(f"[OK] Arranque dentro del presupuesto ({args.presupuesto} s)")
+
+
+if __name__ == "__main__":
+    main()
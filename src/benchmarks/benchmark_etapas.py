@@ -0,0 +1,225 @@
+"""
+benchmark_etapas.py
+-------------------
+Mide cada etapa del pipeline por separado sobre datos sintéticos
+(generador_datos.py): tiempo y pico de memoria (tracemalloc) de cada
+`preparar_*` y de cada `integracion_*`, y guarda el resultado en JSON
+para comparar entre commits.
+
+  - Las preparaciones leen de la carpeta generada (GESTOR_DATA_DIR) y se
+    miden de a una, en el mismo proceso (sin pool de procesos ni caché).
+  - Las integraciones reciben los DataFrames preparados en memoria, igual
+    que en el orquestador; sus reportes quedan en la carpeta generada.
+  - El tiempo y la memoria se miden en pasadas separadas (tracemalloc hace
+    mucho más lenta la ejecución); `--sin-memoria` omite la segunda pasada.
+
+Uso:
+    python src/benchmarks/benchmark_etapas.py --tamano 100k
+    python src/benchmarks/benchmark_etapas.py --datos /tmp/datos --comparar resultados/anterior.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Solo módulos que no fijan rutas: GESTOR_DATA_DIR se define después de leer los argumentos
+from src.benchmarks.generador_datos import ARCHIVO_PARAMETROS, agregar_argumentos, generar_datos
+
+CARPETA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+
+# Variación (en %) a partir de la cual una comparación se marca
+_UMBRAL_VARIACION = 10
+
+
+def _etapas():
+    """(nombre, tipo, función, dependencias) en orden de ejecución."""
+    from src.app.domain.Basicos.anulados import preparar_anulados
+    from src.app.domain.Basicos.pacifico import preparar_pacifico
+    from src.app.domain.Basicos.rimac import preparar_rimac
+    from src.app.domain.Basicos.sharepoint import preparar_sharepoint
+    from src.app.domain.Basicos.sics import preparar_sics
+    from src.app.domain.Integracion.integracion_pacifico import integracion_pacifico
+    from src.app.domain.Integracion.integracion_rimac import integracion_rimac
+
+    return [
+        ("preparar_sics", "preparacion", preparar_sics, {}),
+        ("preparar_sharepoint", "preparacion", preparar_sharepoint, {}),
+        ("preparar_rimac", "preparacion", preparar_rimac, {}),
+        ("preparar_pacifico", "preparacion", preparar_pacifico, {}),
+        ("preparar_anulados", "preparacion", preparar_anulados, {}),
+        ("integracion_rimac", "integracion", integracion_rimac, {
+            "sics_df": "preparar_sics", "share_df": "preparar_sharepoint", "rimac_df": "preparar_rimac",
+        }),
+        ("integracion_pacifico", "integracion", integracion_pacifico, {
+            "sics_df": "preparar_sics", "share_df": "preparar_sharepoint",
+            "pac_df": "preparar_pacifico", "anul_df": "preparar_anulados",
+        }),
+    ]
+
+
+def _commit_actual() -> str:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        )
+        return salida.stdout.strip()
+    except Exception:
+        return ""
+
+
+def _argumentos(dependencias: dict, resultados: dict) -> dict:
+    # Copias nuevas en cada pasada: las integraciones modifican columnas de sus entradas
+    return {
+        parametro: resultados[etapa].copy() if resultados.get(etapa) is not None else None
+        for parametro, etapa in dependencias.items()
+    }
+
+
+def _ejecutar(funcion, kwargs: dict):
+    """Ejecuta la etapa en silencio. Devuelve (resultado, segundos, error)."""
+    salida = io.StringIO()
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(salida):
+            resultado = funcion(**kwargs)
+        error = "" if resultado is not None and not getattr(resultado, "empty", False) else "sin resultado"
+    except Exception as e:
+        resultado, error = None, str(e)
+    return resultado, time.perf_counter() - inicio, error
+
+
+def medir_etapas(memoria: bool = True) -> list:
+    """Mide todas las etapas en orden; las integraciones usan los resultados medidos antes."""
+    from src.app.domain.Comun.tipos import memoria_mb
+    from src.app.repository.persistencia_repository import esperar_persistencias
+
+    resultados = {}
+    mediciones = []
+    for nombre, tipo, funcion, dependencias in _etapas():
+        resultado, segundos, error = _ejecutar(funcion, _argumentos(dependencias, resultados))
+        medicion = {"etapa": nombre, "tipo": tipo, "segundos": round(segundos, 3)}
+
+        if memoria and not error:
+            kwargs = _argumentos(dependencias, resultados)
+            tracemalloc.start()
+            _ejecutar(funcion, kwargs)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            medicion["pico_mb"] = round(pico / (1024 * 1024), 1)
+
+        if error:
+            medicion["error"] = error
+        else:
+            medicion["filas"] = len(resultado)
+            medicion["memoria_df_mb"] = round(memoria_mb(resultado), 1)
+        resultados[nombre] = resultado if not error else None
+        mediciones.append(medicion)
+        _imprimir_medicion(medicion)
+
+    esperar_persistencias()
+    return mediciones
+
+
+def _imprimir_medicion(m: dict) -> None:
+    if "error" in m:
+        print(f"   {m['etapa']:<22} [ERROR] {m['error']}")
+        return
+    pico = f"pico {m['pico_mb']:>8.1f} MB" if "pico_mb" in m else ""
+    print(f"   {m['etapa']:<22} {m['segundos']:>8.2f} s   {pico}   {m['filas']:>9} filas   df {m['memoria_df_mb']:.1f} MB")
+
+
+def comparar(actual: dict, anterior: dict) -> None:
+    """Muestra la variación de tiempo y memoria por etapa frente a otra ejecución."""
+    previas = {m["etapa"]: m for m in anterior.get("etapas", [])}
+    print(f"\n[INFO] Comparación con {anterior.get('commit') or 'ejecución anterior'} ({anterior.get('fecha', '')}):")
+    if anterior.get("parametros", {}).get("filas") != actual.get("parametros", {}).get("filas"):
+        print("[WARN] Las ejecuciones usan tamaños distintos; la comparación es solo orientativa.")
+
+    for m in actual["etapas"]:
+        previa = previas.get(m["etapa"])
+        if previa is None or "error" in m or "error" in previa:
+            continue
+        partes = []
+        for campo, unidad in (("segundos", "s"), ("pico_mb", "MB")):
+            if campo in m and campo in previa and previa[campo]:
+                variacion = 100 * (m[campo] - previa[campo]) / previa[campo]
+                marca = " ◄" if abs(variacion) >= _UMBRAL_VARIACION else ""
+                partes.append(f"{previa[campo]:.2f} → {m[campo]:.2f} {unidad} ({variacion:+.0f}%){marca}")
+        print(f"   {m['etapa']:<22} " + "   ".join(partes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapa del pipeline sobre datos sintéticos")
+    parser.add_argument("--datos", type=Path, default=None,
+                        help="Carpeta ya generada (si no se indica, se genera una temporal)")
+    agregar_argumentos(parser)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria (una sola pasada)")
+    parser.add_argument("--salida", type=Path, default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        datos = args.datos or Path(tmp)
+        os.environ["GESTOR_DATA_DIR"] = str(datos)
+
+        if args.datos is None or not (datos / ARCHIVO_PARAMETROS).exists():
+            print(f"[INFO] Generando datos sintéticos ({args.tamano} filas) en {datos} ...")
+            parametros = generar_datos(
+                datos, args.tamano, args.tasa_match, args.tasa_duplicados, args.distribucion, args.semilla
+            )["parametros"]
+            print(f"[OK] Datos generados en {parametros['segundos']} s")
+        else:
+            parametros = json.loads((datos / ARCHIVO_PARAMETROS).read_text(encoding="utf-8"))
+            print(f"[INFO] Usando datos existentes en {datos} ({parametros['filas']} filas)")
+
+        # Medición en un solo proceso: sin pool, sin copias en segundo plano ni auditoría
+        from src.app.repository.carga_paralela_repository import configurar_workers
+        from src.app.repository.intermedio_repository import configurar_auditoria_xlsx
+        from src.app.repository.persistencia_repository import configurar_persistencia
+        configurar_workers(1)
+        configurar_auditoria_xlsx(False)
+        configurar_persistencia(False)
+
+        print("\n[INFO] Midiendo etapas:")
+        etapas = medir_etapas(memoria=not args.sin_memoria)
+
+    import pandas as pd
+    resultado = {
+        "commit": _commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+        "parametros": parametros,
+        "etapas": etapas,
+    }
+
+    salida = args.salida or CARPETA_RESULTADOS / f"etapas_{parametros['filas']}_{resultado['commit'] or 'local'}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n[OK] Resultados guardados en: {salida}")
+
+    if args.comparar:
+        try:
+            comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")))
+        except Exception as e:
+            print(f"[ERROR] No se pudo comparar con {args.comparar}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+benchmark_reporte.py
+--------------------
+Compara los motores de escritura de reportes (reporte_repository.py):
+tiempo de escritura y pico de memoria (tracemalloc) por motor.
+
+Uso:
+    python src/benchmarks/benchmark_reporte.py [--filas 50000] [--motores pandas openpyxl xlsxwriter]
+
+El DataFrame de prueba tiene la forma del reporte Pacífico integrado
+(14 columnas de texto y una numérica).
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.app.repository.reporte_repository import MOTORES_EXCEL, escribir_reporte
+
+
+def generar_reporte(filas: int, semilla: int = 0) -> pd.DataFrame:
+    """DataFrame sintético con columnas y cardinalidades parecidas al reporte Pacífico."""
+    rng = np.random.default_rng(semilla)
+
+    def elegir(opciones):
+        return rng.choice(np.array(opciones, dtype=object), size=filas)
+
+    meses = [f"{a}-{m:02d}" for a in (2025, 2026) for m in range(1, 13)]
+    return pd.DataFrame({
+        "Contratante": [f"CLIENTE {i:07d} S.A.C." for i in rng.integers(0, filas, filas)],
+        "Tipo de Documento": elegir(["RUC", "DNI", "CE"]),
+        "Nro de Documento": rng.integers(10**7, 10**11, filas).astype(str),
+        "Linea de Negocio": elegir(["Vida Ley", "Riesgos Generales", "Salud", "Vehiculos"]),
+        "Producto": elegir(["Vida Ley Empleados", "SEGURO PATRIMONIAL", "EPS", "AUTOS"]),
+        "Nro de Poliza/Contrato": rng.integers(10**6, 10**8, filas).astype(str),
+        "Inicio de Vigencia": elegir([f"{m}-01" for m in meses]),
+        "Fin de Vigencia": elegir([f"{m}-01" for m in meses]),
+        "Situacion": elegir(["VIGENTE", "ANULADA", "NO RENOVADA", "RENOVADA"]),
+        "SICS": elegir(meses + ["No Encontrado"]),
+        "Tablero": elegir(["RENOVADA", "EN PROCESO", "No Encontrado"]),
+        "Observaciones": elegir(["Sin SICS ni Tablero", "Falta SICS", "SICS al día"]),
+        "Responsable": elegir(["Jesus", "Thalia", "Briyan", ""]),
+        "OBS": rng.integers(1, 4, filas),
+        "DentroRango": elegir(["Sí", "No"]),
+    })
+
+
+def medir(df: pd.DataFrame, motor: str, carpeta: Path) -> dict:
+    """
+    Escribe el DataFrame con el motor indicado y devuelve segundos, pico de
+    memoria y tamaño. El tiempo y la memoria se miden en pasadas separadas
+    (tracemalloc hace mucho más lenta la escritura).
+    """
+    path = carpeta / f"reporte_{motor}.xlsx"
+    inicio = time.perf_counter()
+    escribir_reporte(df, path, hoja="Benchmark", motor=motor)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    escribir_reporte(df, path, hoja="Benchmark", motor=motor)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "motor": motor,
+        "segundos": round(segundos, 2),
+        "pico_mb": round(pico / (1024 * 1024), 1),
+        "archivo_mb": round(path.stat().st_size / (1024 * 1024), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de motores de escritura de reportes Excel")
+    parser.add_argument("--filas", type=int, default=50_000)
+    parser.add_argument("--motores", nargs="+", choices=MOTORES_EXCEL, default=list(MOTORES_EXCEL))
+    args = parser.parse_args(argv)
+
+    df = generar_reporte(args.filas)
+    print(f"[INFO] Reporte de prueba: {len(df)} filas x {len(df.columns)} columnas")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for motor in args.motores:
+            try:
+                r = medir(df, motor, Path(tmp))
+            except Exception as e:
+                print(f"[ERROR] {motor}: {e}")
+                continue
+            print(f"   {r['motor']:<11} {r['segundos']:>7.2f} s   pico {r['pico_mb']:>7.1f} MB   archivo {r['archivo_mb']:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
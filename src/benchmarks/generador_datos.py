@@ -0,0 +1,411 @@
+"""
+generador_datos.py
+------------------
+Genera libros sintéticos con la forma de las entradas reales del pipeline:
+
+  input/PreparaciónSics/        PolizaPorFiltro - <fecha>_SICS.xlsx
+  input/PreparaciónSharepoint/  Tablero de renovaciones <fecha>.xlsx   (hoja "Tablero")
+  input/PreparaciónRimac/       PagosVencidos - <fecha>_RIMAC.xlsx     (hoja "PagosVencidos")
+  input/PreparaciónPacífico/    Reporte-polizas-Vigentes / NoVigentes  (con filas de título)
+  input/PreparaciónPacífico/Anulados/Anulados.xlsx
+
+La carpeta generada se usa como carpeta de datos del pipeline con la
+variable de entorno GESTOR_DATA_DIR (ver configuration_repository.py).
+
+Parámetros:
+  - filas:           filas del reporte Pacífico y del SICS; SharePoint y Rimac
+                     tienen la mitad y Anulados un 5 % (SICS y SharePoint
+                     crecen si no alcanzan para las pólizas coincidentes).
+  - tasa_match:      fracción de pólizas Pacífico / Rimac que aparecen en SICS
+                     y en SharePoint (el resto queda como "No Encontrado").
+  - tasa_duplicados: fracción de filas que repiten una póliza ya usada
+                     (en Rimac repiten responsable, póliza y categoría).
+  - distribucion:    reparto de las fechas de vencimiento:
+                       "uniforme"  entre 3 años atrás y 2 años adelante
+                       "reciente"  alrededor de hoy (±2 meses)
+                       "vencida"   mayormente en los meses pasados
+
+Uso:
+    python src/benchmarks/generador_datos.py --destino /tmp/datos --tamano 100k
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.app.repository.mapping_repository import MAPEO
+from src.app.repository.reporte_repository import escribir_reporte
+
+TAMANOS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DISTRIBUCIONES = ("uniforme", "reciente", "vencida")
+
+ARCHIVO_PARAMETROS = "parametros_generacion.json"
+
+_STATUS_RENOVACION = ("01 - RENOVADA", "02 - EN PROCESO", "03 - PENDIENTE", "04 - NO RENOVADA")
+_SITUACIONES = ("Vigente ", "Anulada ", "No Renovada ", "Renovada ")
+_ASEGURADORAS = (("25", "PACIFICO SEGUROS"), ("16", "RIMAC SEGUROS"), ("30", "LA POSITIVA"), ("41", "MAPFRE"))
+
+
+# ===================================================================
+# Utilidades
+# ===================================================================
+
+def _elegir(rng, opciones, n: int) -> np.ndarray:
+    return rng.choice(np.array(opciones, dtype=object), size=n)
+
+
+def _con_duplicados(rng, unicos: np.ndarray, filas: int, tasa: float) -> np.ndarray:
+    """
+    `filas` valores tomados de `unicos`: cada valor distinto aparece al menos
+    una vez y una fracción `tasa` de las filas repite alguno ya usado.
+    """
+    n_repetidas = min(int(filas * tasa), max(filas - 1, 0))
+    base = unicos[: filas - n_repetidas]
+    repetidas = base[rng.integers(0, len(base), n_repetidas)] if len(base) else base[:0]
+    return rng.permutation(np.concatenate([base, repetidas]))
+
+
+def _numeros_unicos(rng, n: int, desde: int, rango: int) -> np.ndarray:
+    """`n` enteros distintos en [desde, desde + rango)."""
+    rango = max(rango, 2 * n)
+    return desde + rng.choice(rango, size=n, replace=False)
+
+
+def _fechas(rng, n: int, distribucion: str, hoy: pd.Timestamp) -> pd.DatetimeIndex:
+    if distribucion == "uniforme":
+        dias = rng.integers(-3 * 365, 2 * 365, n)
+    elif distribucion == "reciente":
+        dias = np.round(rng.normal(0, 60, n)).astype(int)
+    elif distribucion == "vencida":
+        dias = 15 - np.round(rng.exponential(180, n)).astype(int)
+    else:
+        raise ValueError(f"Distribución de fechas desconocida: {distribucion} (opciones: {', '.join(DISTRIBUCIONES)})")
+    return pd.DatetimeIndex(hoy.normalize() + pd.to_timedelta(dias, unit="D"))
+
+
+def _nombres(rng, n: int, sufijos=("S.A.C.", "S.A.", "E.I.R.L.", "")) -> np.ndarray:
+    """Razones sociales repetidas como en los reportes reales (un cliente, varias pólizas)."""
+    pool = np.array(
+        [f"EMPRESA {i:06d} {s}".strip() for i, s in zip(range(max(n // 3, 1)), _elegir(rng, sufijos, max(n // 3, 1)))],
+        dtype=object,
+    )
+    return pool[rng.integers(0, len(pool), n)]
+
+
+def _coincidentes(rng, llaves: np.ndarray, tasa: float) -> np.ndarray:
+    """Fracción `tasa` de las llaves, elegidas al azar."""
+    n = int(round(len(llaves) * tasa))
+    return rng.permutation(llaves)[:n]
+
+
+def _escribir_con_titulo(df: pd.DataFrame, path: Path, hoja: str, titulo: str, filas_vacias: int = 3) -> None:
+    """Escribe como los reportes Pacífico: título, filas vacías y luego encabezado y datos."""
+    from openpyxl import Workbook
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    libro = Workbook(write_only=True)
+    ws = libro.create_sheet(hoja)
+    ws.append([titulo])
+    for _ in range(filas_vacias):
+        ws.append([])
+    ws.append([str(c) for c in df.columns])
+    valores = df.astype(object).where(df.notna(), None)
+    for fila in valores.itertuples(index=False, name=None):
+        ws.append(fila)
+    libro.save(path)
+
+
+# ===================================================================
+# Fuentes
+# ===================================================================
+
+def _llaves_pacifico(rng, filas: int) -> np.ndarray:
+    return _numeros_unicos(rng, filas, 100_000_000, 1_900_000_000).astype(str).astype(object)
+
+
+def _llaves_rimac(rng, filas: int) -> np.ndarray:
+    numeros = _numeros_unicos(rng, filas, 1_000_000, 8_000_000)
+    prefijos = _elegir(rng, ["E", "S", ""], filas)
+    return np.array([f"{p}{n:07d}" if p else str(n % 100_000) for p, n in zip(prefijos, numeros)], dtype=object)
+
+
+def generar_pacifico(rng, llaves: np.ndarray, filas: int, tasa_duplicados: float, distribucion: str, hoy) -> pd.DataFrame:
+    polizas = _con_duplicados(rng, llaves, filas, tasa_duplicados)
+    pares = MAPEO["Responsables_Pacifico"]
+    elegidos = rng.integers(0, len(pares) + 1, filas)   # el último índice: producto sin responsable
+    lineas = np.array([p["Linea"] for p in pares] + ["Linea Nueva"], dtype=object)[elegidos]
+    productos = np.array([p["Producto"] for p in pares] + ["Producto Nuevo"], dtype=object)[elegidos]
+
+    fin = _fechas(rng, filas, distribucion, hoy)
+    inicio = fin - pd.DateOffset(years=1)
+    primas = np.round(rng.lognormal(6, 1.2, filas), 2)
+    # Algunas primas llegan como texto con separador de miles o como "--"
+    primas_texto = np.where(
+        rng.random(filas) < 0.1, "--",
+        np.where(primas >= 1000, [f"{p:,.2f}" for p in primas], primas.astype(str)),
+    )
+    estado = np.where(fin >= hoy.normalize(), "Vigente", "No Vigente")
+
+    return pd.DataFrame({
+        "Contratante": _nombres(rng, filas),
+        "Tipo de Documento": _elegir(rng, ["RUC", "DNI", "CE"], filas),
+        "Nro de Documento": rng.integers(10**7, 10**11, filas).astype(str),
+        "Linea de Negocio": lineas,
+        "Producto": productos,
+        "Nro de Poliza/Contrato": polizas,
+        "Renovacion": rng.integers(0, 5, filas),
+        "Inicio de Vigencia": inicio.strftime("%Y-%m-%d"),
+        "Fin de Vigencia": fin.strftime("%Y-%m-%d"),
+        "Prima Bruta Dolares": primas_texto,
+        "Prima Bruta Soles": np.where(rng.random(filas) < 0.5, 0, primas),
+        "Estado": estado,
+        "Situacion": _elegir(rng, _SITUACIONES, filas),
+    })
+
+
+def generar_rimac(rng, llaves: np.ndarray, filas: int, tasa_duplicados: float, distribucion: str, hoy) -> pd.DataFrame:
+    categorias = [c for lista in MAPEO["Responsables"].values() for c in lista] + ["CATEGORIA NUEVA"]
+    n_unicas = filas - int(filas * tasa_duplicados)
+    unicas = pd.DataFrame({
+        "RESPONSABLE DE PAGO": _nombres(rng, n_unicas),
+        "NRO. POLIZA": llaves[rng.integers(0, len(llaves), n_unicas)],
+        "CATEGORÍA": _elegir(rng, categorias, n_unicas),
+    })
+    # Duplicados exactos de (responsable, póliza, categoría), como los que elimina preparar_rimac
+    df = unicas.iloc[_con_duplicados(rng, np.arange(n_unicas), filas, tasa_duplicados)].reset_index(drop=True)
+
+    df["DOCUMENTO"] = rng.integers(10**6, 10**8, filas).astype(str)
+    df["MEDIO DE PAGO"] = _elegir(rng, ["DEBITO AUTOMATICO", "VENTANILLA", "TRANSFERENCIA"], filas)
+    df["MONTO"] = np.round(rng.lognormal(5, 1, filas), 2)
+    df["CUOTA"] = rng.integers(1, 13, filas)
+    df["VENCIMIENTO"] = _fechas(rng, filas, distribucion, hoy).strftime("%Y-%m-%d")
+    df["ESTADO"] = _elegir(rng, ["VENCIDO", "POR VENCER"], filas)
+    return df
+
+
+def generar_sics(rng, pacifico: np.ndarray, rimac: np.ndarray, filas: int, tasa_match: float,
+                 tasa_duplicados: float, distribucion: str, hoy) -> pd.DataFrame:
+    """Pólizas SICS: una fracción `tasa_match` de las llaves Pacífico y Rimac, y el resto ajenas."""
+    match_pac = _coincidentes(rng, pacifico, tasa_match)
+    match_rim = _coincidentes(rng, rimac, tasa_match)
+    # En SICS las pólizas Rimac suelen venir con prefijo de ramo ("RT-E0002259")
+    con_prefijo = rng.random(len(match_rim)) < 0.5
+    match_rim = np.where(con_prefijo, [f"RT-{p}" for p in match_rim], match_rim)
+
+    n_unicas = max(filas - int(filas * tasa_duplicados), len(match_pac) + len(match_rim))
+    n_ajenas = n_unicas - len(match_pac) - len(match_rim)
+    ajenas = np.array([f"SX{n:08d}" for n in _numeros_unicos(rng, n_ajenas, 0, 90_000_000)], dtype=object)
+    llaves = rng.permutation(np.concatenate([match_pac, match_rim, ajenas]).astype(object))
+    filas = max(filas, n_unicas)
+    polizas = _con_duplicados(rng, llaves, filas, tasa_duplicados)
+
+    hasta = _fechas(rng, filas, distribucion, hoy)
+    desde = hasta - pd.DateOffset(years=1)
+    cias = rng.integers(0, len(_ASEGURADORAS), filas)
+    nombres = _nombres(rng, filas, sufijos=("", ""))
+
+    return pd.DataFrame({
+        "Cod Cia": np.array([c for c, _ in _ASEGURADORAS], dtype=object)[cias],
+        "Aseguradora": np.array([a for _, a in _ASEGURADORAS], dtype=object)[cias],
+        "Cod Ramo": _elegir(rng, ["000", "001", "012", "031"], filas),
+        "Ramo / Producto": _elegir(rng, ["SOAT00", "RT00", "VL00", "EPS00"], filas),
+        "Póliza": polizas,
+        "Nit / CC": rng.integers(10**7, 10**11, filas).astype(str),
+        "Nombre / Razón Social Tomador": nombres,
+        "Nombre / Razón Social Asegurado": nombres,
+        "Nombre / Razon Social Beneficiario": nombres,
+        "Vig Desde Póliza": desde.strftime("%d/%m/%Y"),
+        "Vig Hasta Póliza": hasta.strftime("%d/%m/%Y"),
+        "No. Certificado": rng.integers(0, 3, filas),
+        "Vlr Prima": rng.integers(0, 5000, filas),
+        "Fecha Inclusión": desde.strftime("%d/%m/%Y"),
+        "Fecha Exclusión": None,
+        "Placa": None,
+        "Chasis": None,
+        "Unidad de Negocio": _elegir(rng, ["C-AON-LC- LIND", "C-AON-LC- CRS", "CARRIBAS- RL"], filas),
+        "Documento Tomador": None,
+    })
+
+
+def generar_sharepoint(rng, pacifico: np.ndarray, rimac: np.ndarray, filas: int, tasa_match: float,
+                       tasa_duplicados: float, distribucion: str, hoy) -> pd.DataFrame:
+    """Tablero SharePoint: `Pólizafinal` con la misma tasa de coincidencia que SICS."""
+    match_pac = _coincidentes(rng, pacifico, tasa_match)
+    match_rim = _coincidentes(rng, rimac, tasa_match)
+    n_unicas = max(filas - int(filas * tasa_duplicados), len(match_pac) + len(match_rim))
+    n_ajenas = n_unicas - len(match_pac) - len(match_rim)
+    ajenas = np.array([f"TX{n:08d}" for n in _numeros_unicos(rng, n_ajenas, 0, 90_000_000)], dtype=object)
+    llaves = rng.permutation(np.concatenate([match_pac, match_rim, ajenas]).astype(object))
+    filas = max(filas, n_unicas)
+    polizas = _con_duplicados(rng, llaves, filas, tasa_duplicados)
+
+    fin = _fechas(rng, filas, distribucion, hoy)
+    return pd.DataFrame({
+        "FUENTE": _elegir(rng, ["SICS", "MANUAL"], filas),
+        "ESTADO": _elegir(rng, ["Vigente", "No Vigente"], filas),
+        "NIT": rng.integers(10**4, 10**11, filas).astype(str),
+        "CLIENTE": _nombres(rng, filas),
+        "ASEG.": _elegir(rng, ["PACIFICO", "RIMAC", "PROTECTA", "SANITAS"], filas),
+        "RIESGO": _elegir(rng, ["Riesgos Humanos", "Riesgos Generales", "Vehiculos"], filas),
+        "PRODUCTO": _elegir(rng, ["SCTR - PENSION", "SCTR - SALUD", "VIDA LEY", "EPS"], filas),
+        "NRO_POLIZA": polizas,
+        "Fecha Fin vigencia": fin,
+        "Clasificación": _elegir(rng, ["Cliente Arribas", "Cliente AON"], filas),
+        "Responsable": _elegir(rng, ["Jesus", "Thalia", "Briyan", "Cesar"], filas),
+        "MES FV": fin.month,
+        "RESULTADO DE ENTREGA": _elegir(rng, ["PENDIENTE", "A TIEMPO", "FUERA DE PLAZO"], filas),
+        "STATUS RENOVACION": _elegir(rng, _STATUS_RENOVACION, filas),
+        "F. Venc. SICS": fin.strftime("%d/%m/%Y"),
+        "Pólizafinal": polizas,
+    })
+
+
+def generar_anulados(rng, pacifico_df: pd.DataFrame, filas: int, tasa_duplicados: float) -> pd.DataFrame:
+    muestra = pacifico_df.iloc[rng.integers(0, len(pacifico_df), max(filas, 1))]
+    polizas = _con_duplicados(rng, muestra["Nro de Poliza/Contrato"].unique(), len(muestra), tasa_duplicados)
+    return pd.DataFrame({
+        "Contratante": muestra["Contratante"].to_numpy(),
+        "Nro de Documento": muestra["Nro de Documento"].to_numpy(),
+        "Producto": muestra["Producto"].to_numpy(),
+        "Nro de Poliza/Contrato": polizas,
+        "Tablero": _elegir(rng, ["No Encontrado", "03 - PENDIENTE", ""], len(muestra)),
+        "Observaciones": _elegir(rng, ["Jesus", "3. Por renovar en Pacifico", ""], len(muestra)),
+        "Fin de Vigencia": muestra["Fin de Vigencia"].to_numpy(),
+        "Situacion": _elegir(rng, ["MES VENCIDO", "EN CONSULTA", "RENOVACION MENSUAL"], len(muestra)),
+    })
+
+
+# ===================================================================
+# Generación completa
+# ===================================================================
+
+def generar_datos(
+    destino: Path,
+    filas: int = TAMANOS["10k"],
+    tasa_match: float = 0.8,
+    tasa_duplicados: float = 0.05,
+    distribucion: str = "uniforme",
+    semilla: int = 0,
+) -> dict:
+    """
+    Escribe el juego de entradas sintéticas bajo `destino/input` y devuelve
+    {fuente: ruta} más los parámetros usados (también en ARCHIVO_PARAMETROS).
+    """
+    if distribucion not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución de fechas desconocida: {distribucion} (opciones: {', '.join(DISTRIBUCIONES)})")
+    # Import diferido: configuration_repository fija sus rutas al importarse y
+    # benchmark_etapas.py define GESTOR_DATA_DIR después de leer sus argumentos
+    from src.app.repository.configuration_repository import (
+        DATA_DIR,
+        INPUT_ANULADOS,
+        PATH_PACIFICO_INPUT,
+        PATH_RIMAC_INPUT,
+        PATH_SHAREPOINT_INPUT,
+        PATH_SICS_INPUT,
+    )
+
+    def _relativa(path: Path) -> Path:
+        return Path(path).relative_to(DATA_DIR)
+
+    destino = Path(destino)
+    rng = np.random.default_rng(semilla)
+    hoy = pd.Timestamp.today()
+    marca = hoy.strftime("%Y-%m-%dT%H%M%S")
+
+    llaves_pac = _llaves_pacifico(rng, filas)
+    llaves_rim = _llaves_rimac(rng, max(filas // 2, 1))
+
+    archivos = {}
+    inicio = time.perf_counter()
+
+    pacifico = generar_pacifico(rng, llaves_pac, filas, tasa_duplicados, distribucion, hoy)
+    vigente = pacifico["Estado"] == "Vigente"
+    for nombre, parte in (("Vigentes", pacifico[vigente]), ("NoVigentes", pacifico[~vigente])):
+        path = destino / _relativa(PATH_PACIFICO_INPUT) / f"Reporte-polizas-{nombre}-{marca}.xlsx"
+        _escribir_con_titulo(parte, path, "reporte", "Reporte Polizas y Contratos")
+        archivos[f"pacifico_{nombre.lower()}"] = path
+
+    rimac = generar_rimac(rng, llaves_rim, max(filas // 2, 1), tasa_duplicados, distribucion, hoy)
+    archivos["rimac"] = escribir_reporte(
+        rimac, destino / _relativa(PATH_RIMAC_INPUT) / f"PagosVencidos - {marca}_RIMAC.xlsx", hoja="PagosVencidos"
+    )
+
+    sics = generar_sics(rng, llaves_pac, llaves_rim, filas, tasa_match, tasa_duplicados, distribucion, hoy)
+    archivos["sics"] = escribir_reporte(
+        sics, destino / _relativa(PATH_SICS_INPUT) / f"PolizaPorFiltro - {marca}_SICS.xlsx"
+    )
+
+    share = generar_sharepoint(rng, llaves_pac, llaves_rim, max(filas // 2, 1), tasa_match, tasa_duplicados, distribucion, hoy)
+    archivos["sharepoint"] = escribir_reporte(
+        share, destino / _relativa(PATH_SHAREPOINT_INPUT) / f"Tablero de renovaciones {marca}.xlsx", hoja="Tablero"
+    )
+
+    anulados = generar_anulados(rng, pacifico, max(filas // 20, 1), tasa_duplicados)
+    archivos["anulados"] = escribir_reporte(anulados, destino / _relativa(INPUT_ANULADOS), hoja="Hoja1")
+
+    parametros = {
+        "filas": filas,
+        "tasa_match": tasa_match,
+        "tasa_duplicados": tasa_duplicados,
+        "distribucion": distribucion,
+        "semilla": semilla,
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "segundos": round(time.perf_counter() - inicio, 1),
+        "filas_por_fuente": {
+            "pacifico": len(pacifico),
+            "sics": len(sics),
+            "sharepoint": len(share),
+            "rimac": len(rimac),
+            "anulados": len(anulados),
+        },
+    }
+    (destino / ARCHIVO_PARAMETROS).write_text(json.dumps(parametros, indent=2, ensure_ascii=False), encoding="utf-8")
+    return {"archivos": archivos, "parametros": parametros}
+
+
+def tamano_filas(valor: str) -> int:
+    """'10k' / '100k' / '1m' o un número de filas."""
+    valor = str(valor).lower()
+    if valor in TAMANOS:
+        return TAMANOS[valor]
+    return int(valor.replace("_", ""))
+
+
+def agregar_argumentos(parser: argparse.ArgumentParser) -> None:
+    """Opciones de generación compartidas con benchmark_etapas.py."""
+    parser.add_argument("--tamano", type=tamano_filas, default=TAMANOS["10k"],
+                        help="Filas: 10k, 100k, 1m o un número (por defecto 10k)")
+    parser.add_argument("--tasa-match", type=float, default=0.8)
+    parser.add_argument("--tasa-duplicados", type=float, default=0.05)
+    parser.add_argument("--distribucion", choices=DISTRIBUCIONES, default="uniforme")
+    parser.add_argument("--semilla", type=int, default=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera entradas sintéticas del pipeline de validaciones")
+    parser.add_argument("--destino", type=Path, required=True, help="Carpeta de datos a crear")
+    agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    print(f"[INFO] Generando {args.tamano} filas en {args.destino} ...")
+    generado = generar_datos(
+        args.destino, args.tamano, args.tasa_match, args.tasa_duplicados, args.distribucion, args.semilla
+    )
+    for fuente, path in generado["archivos"].items():
+        print(f"   {fuente:<20} {path}")
+    print(f"[OK] Datos generados en {generado['parametros']['segundos']} s")
+    print(f"     Usar con: GESTOR_DATA_DIR={args.destino}")
+
+
+if __name__ == "__main__":
+    main()
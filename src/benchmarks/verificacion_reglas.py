@@ -0,0 +1,257 @@
+"""
+verificacion_reglas.py
+----------------------
+Comprueba que las reglas por columnas de Integracion/reglas.py dan el mismo
+resultado que las versiones fila a fila originales (el oráculo), sobre
+bases aleatorias con los casos borde de las entradas reales:
+
+  - OBS Rimac / Pacífico contra `calc_obs` / `calc_obs_pacifico` aplicadas
+    con `df.apply(..., axis=1)`: "No Encontrado" con o sin espacios y en
+    otras mayúsculas, "nan", vacíos, nulos, fechas YYYY-MM y YYYY-MM-DD,
+    textos que no son fechas.
+  - DentroRango Rimac / Pacífico contra `regla_dentro_de_rango(_pacifico)`:
+    responsable JESUS (con espacios / minúsculas), Situaciones excluidas,
+    años de Fin de Vigencia fuera de la ventana o ilegibles, y fechas de
+    corrida en los bordes de mes y de año (ventanas de ±30 días).
+  - Paso 8 de Pacífico (pólizas duplicadas) contra
+    `reconciliar_duplicados_referencia`, en una sola pasada
+    (`reconciliar_duplicados_pacifico`) y por bloques de tamaño aleatorio
+    (estado por póliza + `aplicar_estado_duplicados`): pólizas con OBS 2 y
+    3, con todos los OBS en 1 con y sin "Sí", repetidas en bloques
+    distintos, sin número de póliza, y OBS como número o como texto.
+
+Cada regla se verifica con columnas de texto y con columnas categóricas
+(ver Comun/tipos.py). Termina con código 1 si alguna fila difiere.
+
+Uso:
+    python src/benchmarks/verificacion_reglas.py [--filas 20000] [--semillas 5]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parents[2]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.app.domain.Integracion.reglas import (
+    aplicar_estado_duplicados,
+    calc_obs,
+    calc_obs_pacifico,
+    calc_obs_pacifico_vectorizado,
+    calc_obs_vectorizado,
+    combinar_estados_duplicados,
+    dentro_rango_pacifico,
+    dentro_rango_rimac,
+    estado_duplicados_pacifico,
+    reconciliar_duplicados_pacifico,
+    reconciliar_duplicados_referencia,
+    regla_dentro_de_rango,
+    regla_dentro_de_rango_pacifico,
+    VentanaRango,
+)
+
+# Filas sobre las que se compara el Paso 8 (la referencia es cuadrática)
+FILAS_REFERENCIA_DUPLICADOS = 4_000
+
+# Valores "sin dato" tal como llegan de los matches y de los reportes
+_SIN_DATO = ["No Encontrado", " No Encontrado ", "no encontrado", "NO ENCONTRADO", "", "  ", "nan", "NaN", np.nan, None]
+_NO_FECHAS = ["abc", "2025", "2025-1", "25-10", "-", "0"]
+_RESPONSABLES = ["Jesus", "JESUS", " jesus ", "Jesús", "Thalia", "Briyan", "", np.nan]
+_SITUACIONES = [
+    "Vigente ", "Renovada", "Anulada ", "ANULADA", " no renovada", "Vigencia Anterior",
+    "VIGENCIA  ANTERIOR", "Anulado", "", np.nan,
+]
+
+
+# ===================================================================
+# Datos aleatorios
+# ===================================================================
+
+def _meses(rng, filas: int, alrededor: pd.Timestamp) -> np.ndarray:
+    """
+    Fechas alrededor de `alrededor` como 'YYYY-MM' o 'YYYY-MM-DD', a veces con
+    espacios: la mitad a ±18 meses y la otra mitad a ±45 días (bordes de la ventana).
+    """
+    dias = np.where(rng.random(filas) < 0.5, rng.integers(-540, 540, filas), rng.integers(-45, 45, filas))
+    fechas = (alrededor + pd.to_timedelta(dias, unit="D")).strftime("%Y-%m-%d").to_numpy(dtype=object)
+    cortas = rng.random(filas) < 0.5
+    fechas[cortas] = [f[:7] for f in fechas[cortas]]
+    espacios = rng.random(filas) < 0.1
+    fechas[espacios] = [f" {f} " for f in fechas[espacios]]
+    return fechas
+
+
+def _elegir(rng, filas: int, opciones) -> np.ndarray:
+    opciones = np.array(opciones, dtype=object)
+    return opciones[rng.integers(0, len(opciones), filas)]
+
+
+def _mezclar(rng, filas: int, validos: np.ndarray, tasa_sin_dato: float, otros=()) -> np.ndarray:
+    """Columna con `validos` y, en la proporción indicada, valores sin dato u `otros`."""
+    valores = validos.copy()
+    especiales = np.array(_SIN_DATO + list(otros), dtype=object)
+    marca = rng.random(filas) < tasa_sin_dato
+    valores[marca] = especiales[rng.integers(0, len(especiales), int(marca.sum()))]
+    return valores
+
+
+def _duplicados(rng, filas: int):
+    """
+    Pólizas (unas 3 filas por póliza en las filas que recorre la referencia,
+    algunas sin número) con OBS según un patrón por póliza: todos 1, mezcla
+    de 2 y 3, o al azar entre 1, 2 y 3.
+    """
+    polizas = max(1, min(filas, FILAS_REFERENCIA_DUPLICADOS) // 3)
+    poliza = rng.integers(0, polizas, filas)
+    patron = rng.integers(0, 3, polizas)[poliza]
+    obs = np.select(
+        [patron == 0, patron == 1],
+        [np.ones(filas, dtype="int64"), rng.integers(2, 4, filas)],
+        default=rng.integers(1, 4, filas),
+    )
+    numero = np.array([f"{p:08d}" for p in poliza], dtype=object)
+    numero[rng.random(filas) < 0.02] = np.nan
+    return numero, obs.astype("int64")
+
+
+def generar_base(filas: int, semilla: int, hoy: pd.Timestamp) -> pd.DataFrame:
+    """Base con las columnas que usan las reglas de integración."""
+    rng = np.random.default_rng(semilla)
+    tablero = ["01 - RENOVADA", "02 - EN PROCESO", "03 - PENDIENTE"]
+    poliza, obs = _duplicados(rng, filas)
+    return pd.DataFrame({
+        "Nro de Poliza/Contrato": poliza,
+        "OBS": obs,
+        "DentroRango": _elegir(rng, filas, ["Sí", "No", "No"]),
+        "SICS": _mezclar(rng, filas, _meses(rng, filas, hoy), 0.35, _NO_FECHAS),
+        "Tablero": _mezclar(rng, filas, _elegir(rng, filas, tablero), 0.5),
+        "VENCIMIENTO": _mezclar(rng, filas, _meses(rng, filas, hoy), 0.1, _NO_FECHAS),
+        "Fin de Vigencia": _mezclar(rng, filas, _meses(rng, filas, hoy), 0.1, _NO_FECHAS),
+        "Responsable": _elegir(rng, filas, _RESPONSABLES),
+        "Situacion": _elegir(rng, filas, _SITUACIONES),
+    })
+
+
+def variantes(base: pd.DataFrame):
+    """La base con columnas de texto y con columnas categóricas (OBS queda numérico)."""
+    yield "texto", base
+    yield "categórica", base.astype({c: "category" for c in base.columns if base[c].dtype == object})
+
+
+# ===================================================================
+# Verificaciones
+# ===================================================================
+
+def _diferencias(nombre: str, esperado: pd.Series, obtenido: pd.Series, base: pd.DataFrame) -> int:
+    esperado = pd.Series(esperado, index=base.index)
+    obtenido = pd.Series(obtenido, index=base.index)
+    distintas = esperado.astype(str) != obtenido.astype(str)
+    n = int(distintas.sum())
+    if n:
+        muestra = base.loc[distintas].head(5).assign(esperado=esperado[distintas], obtenido=obtenido[distintas])
+        print(f"[ERROR] {nombre}: {n} filas distintas\n{muestra.to_string()}")
+    return n
+
+
+def verificar_obs(base: pd.DataFrame, hoy: pd.Timestamp) -> tuple:
+    esperado_rimac = base.apply(lambda r: calc_obs(r["VENCIMIENTO"], r["SICS"], r["Tablero"]), axis=1)
+    esperado_pac = base.apply(
+        lambda r: calc_obs_pacifico(r["Fin de Vigencia"], r["SICS"], r["Tablero"]), axis=1
+    )
+    return (
+        _diferencias("OBS Rimac", esperado_rimac,
+                     calc_obs_vectorizado(base["VENCIMIENTO"], base["SICS"], base["Tablero"]), base)
+        + _diferencias("OBS Pacífico", esperado_pac,
+                       calc_obs_pacifico_vectorizado(base["Fin de Vigencia"], base["SICS"], base["Tablero"]), base)
+    ), len(base)
+
+
+def verificar_dentro_rango(base: pd.DataFrame, hoy: pd.Timestamp) -> tuple:
+    ventana = VentanaRango.desde(hoy)
+    obtenido_rimac = dentro_rango_rimac(base["SICS"], base["Tablero"], base["Responsable"], ventana)
+    obtenido_pac = dentro_rango_pacifico(
+        base["SICS"], base["Tablero"], base["Responsable"], base["Situacion"], base["Fin de Vigencia"], ventana
+    )
+    return (
+        _diferencias("DentroRango Rimac", base.apply(regla_dentro_de_rango(hoy), axis=1), obtenido_rimac, base)
+        + _diferencias("DentroRango Pacífico", base.apply(regla_dentro_de_rango_pacifico(hoy), axis=1),
+                       obtenido_pac, base)
+    ), len(base)
+
+
+def _por_bloques(base: pd.DataFrame, rng) -> pd.Series:
+    """Paso 8 como en el modo por bloques: estado de toda la base y luego bloque a bloque."""
+    cortes = np.sort(rng.choice(np.arange(1, len(base)), size=min(20, len(base) - 1), replace=False))
+    bloques = np.split(np.arange(len(base)), cortes)
+    columnas = ["Nro de Poliza/Contrato", "OBS", "DentroRango"]
+
+    estado = None
+    for posiciones in bloques:
+        b = base.iloc[posiciones]
+        estado = combinar_estados_duplicados(estado, estado_duplicados_pacifico(*(b[c] for c in columnas),
+                                                                                inicio=int(posiciones[0])))
+    partes = [
+        aplicar_estado_duplicados(*(base.iloc[p][c] for c in columnas), estado, inicio=int(p[0]))
+        for p in bloques
+    ]
+    return pd.concat(partes)
+
+
+def verificar_duplicados(base: pd.DataFrame, hoy: pd.Timestamp) -> tuple:
+    # La referencia es O(filas × pólizas): se verifica sobre las primeras filas
+    # y se le pasa la base como texto, igual que en la integración original
+    base = base.head(FILAS_REFERENCIA_DUPLICADOS)
+    rng = np.random.default_rng(len(base))
+    errores = 0
+    for obs in ("número", "texto"):
+        datos = base if obs == "número" else base.assign(OBS=base["OBS"].astype(str))
+        esperado = reconciliar_duplicados_referencia(datos.astype(object))
+        obtenido = reconciliar_duplicados_pacifico(datos["Nro de Poliza/Contrato"], datos["OBS"], datos["DentroRango"])
+        errores += _diferencias(f"Paso 8 (OBS {obs})", esperado, obtenido, datos)
+        errores += _diferencias(f"Paso 8 por bloques (OBS {obs})", esperado, _por_bloques(datos, rng), datos)
+    return errores, len(base)
+
+
+# Cada verificación recibe (base, fecha de corrida) y devuelve (filas distintas, filas comparadas)
+VERIFICACIONES = {
+    "obs": verificar_obs,
+    "dentro_rango": verificar_dentro_rango,
+    "duplicados": verificar_duplicados,
+}
+
+# Fechas de corrida: inicio y fin de mes y de año (las ventanas son ±30 días)
+FECHAS = [pd.Timestamp(f) for f in ("2025-01-01", "2025-01-31", "2025-03-01", "2025-06-15", "2025-12-31")]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Equivalencia de las reglas por columnas con las fila a fila")
+    parser.add_argument("--filas", type=int, default=20_000)
+    parser.add_argument("--semillas", type=int, default=5)
+    parser.add_argument("--reglas", nargs="+", choices=list(VERIFICACIONES), default=list(VERIFICACIONES))
+    args = parser.parse_args(argv)
+
+    errores = 0
+    for semilla in range(args.semillas):
+        hoy = FECHAS[semilla % len(FECHAS)]
+        base = generar_base(args.filas, semilla, hoy)
+        for variante, datos in variantes(base):
+            for regla in args.reglas:
+                n, filas = VERIFICACIONES[regla](datos, hoy)
+                errores += n
+                estado = "[OK]" if n == 0 else "[ERROR]"
+                print(f"{estado} {regla:<12} semilla {semilla}  {variante:<10} {hoy:%Y-%m-%d}  {filas} filas")
+
+    if errores:
+        print(f"[ERROR] {errores} diferencias en total")
+        return 1
+    print("[OK] Las reglas por columnas coinciden con las fila a fila")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
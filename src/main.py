@@ -1,8 +1,25 @@
 # main_integraciones.py
+#
+# Uso:
+#   python src/main.py                          (igual que "all")
+#   python src/main.py all [--skip-prep]        preparaciones + integraciones Rimac y Pacífico
+#   python src/main.py prep [sics ...]          solo las preparaciones indicadas (todas si no se indica)
+#   python src/main.py integrate pacifico       solo la integración indicada (y sus preparaciones)
+#   python src/main.py integrate rimac --skip-prep
+#   python src/main.py watch [pacifico ...]     vigila las carpetas de entrada y re-ejecuta lo afectado
+#
+# Los módulos pesados (pandas, preparaciones, integraciones) se importan
+# recién al ejecutar un comando: `--help` y los errores de argumentos
+# responden sin cargarlos (ver src/benchmarks/benchmark_arranque.py).
 
+import argparse
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
+_INICIO_PROCESO = time.perf_counter()
+
 # ---------------------------------------------------------
 # Ajustar sys.path para poder importar usando "src.app."
 # ---------------------------------------------------------
@@ -10,38 +27,318 @@ project_root = Path(__file__).resolve().parents[1]
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-# Importar los procesos de integración
-from src.app.domain.Integracion.integracion_rimac import integracion_rimac
-from src.app.domain.Integracion.integracion_pacifico import integracion_pacifico
+# Etapas que se pueden elegir desde la línea de comandos (nombre → etapa del orquestador)
+PREPARACIONES = {
+    "sics": "sics",
+    "sharepoint": "sharepoint",
+    "rimac": "rimac",
+    "pacifico": "pacifico",
+    "anulados": "anulados",
+}
+INTEGRACIONES = {
+    "rimac": "integracion_rimac",
+    "pacifico": "integracion_pacifico",
+}
 
+_NOMBRES = {
+    "sics": "SICS",
+    "sharepoint": "SHAREPOINT",
+    "rimac": "RIMAC",
+    "pacifico": "PACÍFICO",
+    "anulados": "ANULADOS",
+}
 
-def main():
-    print("\n" + "=" * 80)
-    print("   INICIO DEL PROCESO DE INTEGRACIÓN (RIMAC + PACÍFICO)")
-    print("=" * 80)
 
-    # -----------------------------------------------------
-    # 1) Integración Rimac
-    # -----------------------------------------------------
-    try:
-        print("\n[ BLOQUE 1/2 ] Integración Rimac")
-        print("-" * 80)
-        integracion_rimac()
-    except Exception as e:
-        print(f"\n[ERROR] Ocurrió un error en la integración de Rimac: {e}")
+def _agregar_opciones(parser, con_valores_por_defecto: bool = True) -> None:
+    """
+    Opciones comunes. Se aceptan antes o después del comando: en los
+    subcomandos no tienen valor por defecto para no pisar las del comando principal.
+    """
+    def defecto(valor):
+        return valor if con_valores_por_defecto else argparse.SUPPRESS
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=defecto(False),
+        help="Ignora la caché de etapas y vuelve a ejecutar todas las preparaciones",
+    )
+    parser.add_argument(
+        "--audit-xlsx",
+        action="store_true",
+        default=defecto(False),
+        help="Además del formato columnar, guarda los intermedios (Base_Pacifico, Anulados) en .xlsx",
+    )
+    parser.add_argument(
+        "--persist-prepared",
+        action="store_true",
+        default=defecto(False),
+        help="Guarda en output/ una copia .xlsx de SICS, SharePoint y Rimac preparados (en segundo plano)",
+    )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        default=defecto(False),
+        help="Prepara las fuentes una vez y ejecuta las integraciones Rimac y Pacífico en paralelo",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=defecto(None),
+        help="Procesos para leer los libros en paralelo (por defecto, todos los núcleos; 1 = en serie)",
+    )
+    parser.add_argument(
+        "--excel-engine",
+        default=defecto(None),
+        help="Motor para escribir los reportes .xlsx: xlsxwriter, openpyxl o pandas "
+             "(por defecto xlsxwriter si está instalado, si no openpyxl write_only)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=defecto(False),
+        help="Recalcula solo las pólizas que cambiaron desde la ejecución anterior y agrega la hoja Delta al reporte",
+    )
+    parser.add_argument(
+        "--full-read",
+        action="store_true",
+        default=defecto(False),
+        help="Lee todas las columnas de las fuentes (auditoría); por defecto solo las de MAPEO['Columnas_Requeridas']",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=defecto(None),
+        help="Procesa la base Pacífico por bloques de N filas, sin cargarla completa en memoria",
+    )
+    parser.add_argument(
+        "--max-ram",
+        type=int,
+        default=defecto(None),
+        help="Techo de memoria (MB) para la base Pacífico: activa el proceso por bloques y los achica al acercarse",
+    )
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Integración de pólizas Rimac + Pacífico")
+    _agregar_opciones(parser)
+
+    comunes = argparse.ArgumentParser(add_help=False)
+    _agregar_opciones(comunes, con_valores_por_defecto=False)
+
+    comandos = parser.add_subparsers(dest="comando", metavar="{all,prep,integrate,watch}")
+
+    todo = comandos.add_parser(
+        "all", parents=[comunes], help="Preparaciones e integraciones Rimac y Pacífico (por defecto)"
+    )
+    todo.add_argument(
+        "--skip-prep",
+        action="store_true",
+        help="No ejecuta las preparaciones: usa su último resultado guardado (índice de pólizas o caché)",
+    )
+
+    prep = comandos.add_parser("prep", parents=[comunes], help="Solo las preparaciones indicadas")
+    # Sin `choices`: argparse rechaza la lista vacía con nargs="*" (se valida en _objetivos)
+    prep.add_argument(
+        "fuentes",
+        nargs="*",
+        metavar="fuente",
+        help=f"Fuentes a preparar: {', '.join(PREPARACIONES)} (todas si no se indica)",
+    )
+
+    integrar = comandos.add_parser(
+        "integrate", parents=[comunes], help="Solo las integraciones indicadas (y sus preparaciones)"
+    )
+    integrar.add_argument(
+        "integraciones",
+        nargs="+",
+        choices=list(INTEGRACIONES),
+        metavar="integracion",
+        help=f"Integraciones a ejecutar: {', '.join(INTEGRACIONES)}",
+    )
+    integrar.add_argument(
+        "--skip-prep",
+        action="store_true",
+        help="No ejecuta las preparaciones: usa su último resultado guardado (índice de pólizas o caché)",
+    )
+
+    vigilar = comandos.add_parser(
+        "watch", parents=[comunes],
+        help="Vigila las carpetas de entrada y re-ejecuta las integraciones afectadas por cada archivo nuevo",
+    )
+    vigilar.add_argument(
+        "integraciones",
+        nargs="*",
+        metavar="integracion",
+        help=f"Integraciones a mantener actualizadas: {', '.join(INTEGRACIONES)} (todas si no se indica)",
+    )
+    vigilar.add_argument(
+        "--intervalo",
+        type=float,
+        default=1.0,
+        help="Segundos entre revisiones de las carpetas (por defecto 1)",
+    )
+    vigilar.add_argument(
+        "--espera",
+        type=float,
+        default=2.0,
+        help="Segundos sin cambios para dar un archivo por copiado por completo (por defecto 2)",
+    )
+    vigilar.add_argument(
+        "--sondeo",
+        action="store_true",
+        help="Revisa las carpetas por sondeo aunque watchdog esté instalado",
+    )
+    return parser
+
 
-    # -----------------------------------------------------
-    # 2) Integración Pacífico
-    # -----------------------------------------------------
+def _objetivos(parser, args) -> tuple:
+    """(etapas objetivo del orquestador, título para los mensajes)."""
+    if args.comando == "prep":
+        invalidas = [f for f in args.fuentes if f not in PREPARACIONES]
+        if invalidas:
+            parser.error(f"prep: fuente inválida {invalidas} (opciones: {', '.join(PREPARACIONES)})")
+        fuentes = list(dict.fromkeys(args.fuentes)) or list(PREPARACIONES)
+        titulo = "PREPARACIÓN (" + " + ".join(_NOMBRES[f] for f in fuentes) + ")"
+        return tuple(PREPARACIONES[f] for f in fuentes), titulo
+    if args.comando in ("integrate", "watch"):
+        invalidas = [i for i in args.integraciones if i not in INTEGRACIONES]
+        if invalidas:
+            parser.error(f"{args.comando}: integración inválida {invalidas} (opciones: {', '.join(INTEGRACIONES)})")
+        integraciones = list(dict.fromkeys(args.integraciones)) or list(INTEGRACIONES)
+    else:
+        integraciones = list(INTEGRACIONES)
+    if args.comando == "watch":
+        titulo = "VIGILANCIA (" + " + ".join(_NOMBRES[i] for i in integraciones) + ")"
+        return tuple(INTEGRACIONES[i] for i in integraciones), titulo
+    titulo = "INTEGRACIÓN (" + " + ".join(_NOMBRES[i] for i in integraciones) + ")"
+    return tuple(INTEGRACIONES[i] for i in integraciones), titulo
+
+
+def _configurar(parser, args) -> None:
+    """Aplica las opciones globales (importa los módulos de configuración recién aquí)."""
+    from src.app.repository.bloques_repository import configurar_bloques
+    from src.app.repository.carga_paralela_repository import configurar_workers
+    from src.app.repository.incremental_repository import configurar_incremental
+    from src.app.repository.intermedio_repository import configurar_auditoria_xlsx
+    from src.app.repository.lectura_repository import configurar_lectura_completa
+    from src.app.repository.persistencia_repository import configurar_persistencia
+    from src.app.repository.reporte_repository import MOTORES_EXCEL, configurar_motor_excel
+
+    if args.excel_engine and args.excel_engine not in MOTORES_EXCEL:
+        parser.error(f"--excel-engine: motor inválido '{args.excel_engine}' (opciones: {', '.join(MOTORES_EXCEL)})")
+    for opcion, valor in (("--chunk-rows", args.chunk_rows), ("--max-ram", args.max_ram)):
+        if valor is not None and valor <= 0:
+            parser.error(f"{opcion}: debe ser un número positivo")
+
+    if args.audit_xlsx:
+        configurar_auditoria_xlsx(True)
+    if args.persist_prepared:
+        configurar_persistencia(True)
+    if args.excel_engine:
+        configurar_motor_excel(args.excel_engine)
+    if args.workers is not None:
+        configurar_workers(args.workers)
+    if args.incremental:
+        configurar_incremental(True)
+    if args.full_read:
+        configurar_lectura_completa(True)
+    if args.chunk_rows or args.max_ram:
+        configurar_bloques(args.chunk_rows, args.max_ram)
+
+
+def _guardar_manifiesto(args, ejecucion, objetivos, inicio, arranque=None, skip_prep=False) -> None:
+    """Espera las copias en segundo plano y guarda el manifiesto de la ejecución."""
+    from src.app.domain.Pipeline.instrumentacion import construir_manifiesto
+    from src.app.repository.bloques_repository import bloques_activos, filas_por_bloque, memoria_maxima_mb
+    from src.app.repository.carga_paralela_repository import workers_configurados
+    from src.app.repository.manifiesto_repository import guardar_manifiesto
+    from src.app.repository.persistencia_repository import esperar_persistencias
+    from src.app.repository.reporte_repository import motor_excel
+
+    # Esperar a que terminen las copias de preparados que se escriben en segundo plano
+    esperar_persistencias()
+
+    # Manifiesto de la ejecución (tiempos, memoria, filas y archivos por etapa)
     try:
-        print("\n[ BLOQUE 2/2 ] Integración Pacífico")
-        print("-" * 80)
-        integracion_pacifico()
+        manifiesto = construir_manifiesto(
+            list(ejecucion.mediciones.values()),
+            inicio,
+            opciones={
+                "comando": args.comando,
+                "objetivos": list(objetivos),
+                "skip_prep": skip_prep,
+                "force": args.force,
+                "concurrent": args.concurrent,
+                "audit_xlsx": args.audit_xlsx,
+                "persist_prepared": args.persist_prepared,
+                "workers": workers_configurados(),
+                "excel_engine": motor_excel(),
+                "incremental": args.incremental,
+                "full_read": args.full_read,
+                "chunk_rows": filas_por_bloque() if bloques_activos() else None,
+                "max_ram_mb": memoria_maxima_mb(),
+            },
+            arranque=arranque,
+        )
+        print(f"\n[OK] Manifiesto de ejecución: {guardar_manifiesto(manifiesto)}")
     except Exception as e:
-        print(f"\n[ERROR] Ocurrió un error en la integración de Pacífico: {e}")
+        print(f"[WARN] No se pudo guardar el manifiesto de ejecución: {e}")
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    args.comando = args.comando or "all"
+    skip_prep = getattr(args, "skip_prep", False)
+    objetivos, titulo = _objetivos(parser, args)
+
+    # Importaciones pesadas: solo cuando hay algo que ejecutar
+    _configurar(parser, args)
+    from src.app.domain.Pipeline.orquestador import ejecutar_pipeline
+
+    arranque = time.perf_counter() - _INICIO_PROCESO
+    inicio = datetime.now()
+    print("\n" + "=" * 80)
+    print(f"   INICIO DEL PROCESO DE {titulo}")
+    print("=" * 80)
+    print(f"[INFO] Arranque: {arranque:.2f} s")
+
+    if args.comando == "watch":
+        # Proceso de larga duración: cada archivo nuevo re-ejecuta solo lo
+        # afectado, con las preparaciones sin cambios conservadas en memoria
+        from src.app.domain.Pipeline.vigilante import vigilar
+        vigilar(
+            objetivos,
+            forzar=args.force,
+            concurrente=args.concurrent,
+            intervalo=args.intervalo,
+            espera=args.espera,
+            sondeo=args.sondeo,
+            al_terminar=lambda ejecucion, afectados, inicio_ejecucion: _guardar_manifiesto(
+                args, ejecucion, afectados, inicio_ejecucion
+            ),
+        )
+    else:
+        # -----------------------------------------------------
+        # Cada preparación (SICS, SharePoint, Rimac, Pacífico, Anulados)
+        # se ejecuta una sola vez y se comparte en memoria con las
+        # integraciones que la necesitan. Un error en una rama
+        # no detiene a la otra. Las preparaciones cuyas entradas no
+        # cambiaron se recuperan del índice de pólizas o de la caché
+        # (salvo --force); con --skip-prep no se ejecutan. Con
+        # --concurrent, las integraciones corren a la vez.
+        # -----------------------------------------------------
+        ejecucion = ejecutar_pipeline(
+            objetivos,
+            forzar=args.force,
+            concurrente=args.concurrent,
+            omitir_preparaciones=skip_prep,
+        )
+        _guardar_manifiesto(args, ejecucion, objetivos, inicio, arranque, skip_prep)
 
     print("\n" + "=" * 80)
-    print("   FIN DEL PROCESO DE INTEGRACIÓN (RIMAC + PACÍFICO)")
+    print(f"   FIN DEL PROCESO DE {titulo}")
     print("=" * 80 + "\n")
 
 